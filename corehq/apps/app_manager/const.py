@@ -61,3 +61,6 @@ MOBILE_UCR_VERSIONS = [MOBILE_UCR_VERSION_1, MOBILE_UCR_MIGRATING_TO_2, MOBILE_U
 
 TARGET_COMMCARE = 'commcare'
 TARGET_COMMCARE_LTS = 'commcare_lts'
+
+# forms are compiled concurrently when building an app
+MAX_FORM_BUILD_WORKERS = 4
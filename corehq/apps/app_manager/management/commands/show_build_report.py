@@ -0,0 +1,49 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from corehq.apps.app_manager.dbaccessors import get_app
+
+
+class Command(BaseCommand):
+    help = """
+    Shows which files of a build were rebuilt or reused from the previous build,
+    which changed since the previous build and how long each form took to build.
+    Example: ./manage.py show_build_report my-domain <build_id>
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('domain')
+        parser.add_argument('build_id')
+
+    def handle(self, domain, build_id, **options):
+        build = get_app(domain, build_id)
+        if not build.copy_of:
+            raise CommandError("{} is not a build".format(build_id))
+        report = build.get_build_report()
+        if report is None:
+            raise CommandError("Build {} has no build report".format(build_id))
+
+        print("Version {} (previous version {})".format(build.version, report['previous_version']))
+        for section in ['rebuilt', 'reused', 'changed', 'removed']:
+            paths = report[section]
+            if paths is None:
+                print("\n{}: unknown".format(section.title()))
+                continue
+            print("\n{} ({}):".format(section.title(), len(paths)))
+            for path in paths:
+                print("    {}".format(path))
+
+        timings = report.get('timings') or {}
+        totals = defaultdict(float)
+        print("\nTimings:")
+        for path, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+            print("    {:.3f}s {}".format(seconds, path))
+            profile = path.split('/')[0] if path.count('/') > 1 else 'default'
+            totals[profile] += seconds
+        for profile, seconds in sorted(totals.items()):
+            print("Total for {} profile: {:.3f}s".format(profile, seconds))
@@ -14,6 +14,7 @@ import json
 import types
 import re
 import datetime
+import time
 import uuid
 from collections import defaultdict, namedtuple, Counter
 from functools import wraps
@@ -22,10 +23,12 @@ from mimetypes import guess_type
 from six.moves.urllib.request import urlopen
 from six.moves.urllib.parse import urljoin
 
+from concurrent import futures
 from couchdbkit import MultipleResultsFound
 import itertools
 from lxml import etree
 from django.core.cache import cache
+from django.db import connections
 from django.utils.translation import override, ugettext as _, ugettext
 from django.utils.translation import ugettext_lazy
 from couchdbkit.exceptions import BadValueError
@@ -68,6 +71,7 @@ from corehq.const import USER_DATE_FORMAT, USER_TIME_FORMAT
 from corehq.apps.analytics.tasks import track_workflow, send_hubspot_form, HUBSPOT_SAVED_APP_FORM_ID
 from corehq.apps.app_manager.feature_support import CommCareFeatureSupportMixin
 from corehq.apps.app_manager.tasks import prune_auto_generated_builds
+from corehq.sql_db.util import in_transaction
 from corehq.util.quickcache import quickcache
 from corehq.util.soft_assert import soft_assert
 from corehq.util.timezones.conversions import ServerTime
@@ -187,6 +191,8 @@ ANDROID_LOGO_PROPERTY_MAPPING = {
 }
 
 
+BUILD_REPORT_ATTACHMENT = 'build_report.json'
+
 LATEST_APK_VALUE = 'latest'
 LATEST_APP_VALUE = 0
 
@@ -1204,6 +1210,20 @@ class FormBase(DocumentSchema):
         self.add_stuff_to_xform(xform, build_profile_id)
         return xform.render()
 
+    def iter_rendered_xforms(self, build_profile_ids):
+        """Render the form for each of the build profiles
+
+        The source is parsed once and a copy of the parsed tree is
+        transformed for each build profile.
+
+        :returns: generator of ``(build_profile_id, rendered_xform)``
+        """
+        source = XForm(self.source)
+        for build_profile_id in build_profile_ids:
+            xform = XForm(deepcopy(source.xml))
+            self.add_stuff_to_xform(xform, build_profile_id)
+            yield build_profile_id, xform.render()
+
     @quickcache(['self.source', 'langs', 'include_triggers', 'include_groups', 'include_translations'])
     def get_questions(self, langs, include_triggers=False,
                       include_groups=False, include_translations=False):
@@ -5173,7 +5193,7 @@ class ApplicationBase(VersionedDoc, SnapshotMixin,
             settings['Build-Number'] = self.version
         return settings
 
-    def create_build_files(self, build_profile_id=None):
+    def create_build_files(self, build_profile_id=None, previous_version=None):
         built_on = datetime.datetime.utcnow()
         all_files = self.create_all_files(build_profile_id)
         self.date_created = built_on
@@ -5187,6 +5207,64 @@ class ApplicationBase(VersionedDoc, SnapshotMixin,
         for filepath in all_files:
             self.lazy_put_attachment(all_files[filepath],
                                      'files/%s' % filepath)
+        if build_profile_id is None:
+            report = self._make_build_report(all_files, previous_version)
+        else:
+            report = self.get_build_report()
+            if report is not None:
+                report.setdefault('timings', {}).update(self._get_build_timings(all_files))
+        if report is not None:
+            self.lazy_put_attachment(json.dumps(report), BUILD_REPORT_ATTACHMENT,
+                                     content_type='application/json')
+
+    def create_build_files_for_profiles(self, build_profile_ids):
+        for build_profile_id in build_profile_ids:
+            self.create_build_files(build_profile_id=build_profile_id)
+
+    def get_build_report(self):
+        """
+        :returns: what was rebuilt and what changed in this build, or ``None``
+        for builds made before build reports were saved
+        """
+        try:
+            report = self.lazy_fetch_attachment(BUILD_REPORT_ATTACHMENT)
+        except (ResourceNotFound, KeyError):
+            return None
+        if isinstance(report, bytes):
+            report = report.decode('utf-8')
+        return json.loads(report)
+
+    def _make_build_report(self, all_files, previous_version):
+        def _hash(content):
+            if isinstance(content, six.text_type):
+                content = content.encode('utf-8')
+            return hashlib.md5(content).hexdigest()
+
+        file_hashes = {path: _hash(content) for path, content in all_files.items()}
+        reused = set(self._reused_build_files) & set(file_hashes)
+        report = {
+            'previous_version': previous_version.version if previous_version else None,
+            'files': file_hashes,
+            'reused': sorted(reused),
+            'rebuilt': sorted(set(file_hashes) - reused),
+            'changed': None,
+            'removed': None,
+            'timings': self._get_build_timings(all_files),
+        }
+        previous_report = previous_version.get_build_report() if previous_version else None
+        if previous_report:
+            previous_hashes = previous_report['files']
+            report['changed'] = sorted(
+                path for path, file_hash in file_hashes.items()
+                if previous_hashes.get(path) != file_hash
+            )
+            report['removed'] = sorted(set(previous_hashes) - set(file_hashes))
+        return report
+
+    def _get_build_timings(self, all_files):
+        """:returns: the seconds taken to generate each of the build files that were timed"""
+        timings = self._build_timings or {}
+        return {path: timings[path] for path in all_files if path in timings}
 
     def create_jadjar_from_build_files(self, save=False):
         self.validate_jar_path()
@@ -5357,7 +5435,7 @@ class ApplicationBase(VersionedDoc, SnapshotMixin,
             force_new_forms = True
         copy.set_form_versions(previous_version, force_new_forms)
         copy.set_media_versions(previous_version)
-        copy.create_build_files()
+        copy.create_build_files(previous_version=previous_version)
 
         # since this hard to put in a test
         # I'm putting this assert here if copy._id is ever None
@@ -5410,6 +5488,11 @@ class ApplicationBase(VersionedDoc, SnapshotMixin,
 
     bulk_save = save_docs
 
+    # paths of build files copied from the previous build rather than generated
+    _reused_build_files = ()
+    # seconds taken to generate build files, by path
+    _build_timings = None
+
     def set_form_versions(self, previous_version, force_new_version=False):
         # by default doing nothing here is fine.
         pass
@@ -5605,6 +5688,8 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
             form = self.get_module(module_id).get_form(form_id)
         return form.validate_form().render_xform(build_profile_id).encode('utf-8')
 
+    _previous_form_sources = None
+
     def set_form_versions(self, previous_version, force_new_version=False):
         """
         Set the 'version' property on each form as follows to the current app version if the form is new
@@ -5613,6 +5698,9 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
         def _hash(val):
             return hashlib.md5(val).hexdigest()
 
+        # compiled forms which have not changed since the last build
+        # are reused by create_all_files rather than compiled again
+        self._previous_form_sources = {}
         if previous_version:
             for form_stuff in self.get_forms(bare=False):
                 filename = 'files/%s' % self.get_form_filename(**form_stuff)
@@ -5635,6 +5723,8 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
                         my_hash = _hash(self.fetch_xform(form=form))
                         if previous_hash != my_hash:
                             form.version = None
+                        else:
+                            self._previous_form_sources[form.unique_id] = previous_source
                 else:
                     form.version = None
 
@@ -5866,6 +5956,8 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
     def get_form_filename(cls, type=None, form=None, module=None):
         return 'modules-%s/forms-%s.xml' % (module.id, form.id)
 
+    _prerendered_form_files = None
+
     def create_all_files(self, build_profile_id=None):
         prefix = '' if not build_profile_id else build_profile_id + '/'
         files = {
@@ -5912,20 +6004,94 @@ class Application(ApplicationBase, TranslationMixin, HQMediaMixin):
         for lang in ['default'] + langs_for_build:
             files["{prefix}{lang}/app_strings.txt".format(
                 prefix=prefix, lang=lang)] = self.create_app_strings(lang, build_profile_id)
-        for form_stuff in self.get_forms(bare=False):
-            def exclude_form(form):
-                return isinstance(form, ShadowForm) or form.is_a_disabled_release_form()
 
-            if not exclude_form(form_stuff['form']):
-                filename = prefix + self.get_form_filename(**form_stuff)
-                form = form_stuff['form']
-                try:
-                    files[filename] = self.fetch_xform(form=form, build_profile_id=build_profile_id)
-                except XFormValidationFailed:
-                    raise XFormException(_('Unable to validate the forms due to a server error. '
-                                           'Please try again later.'))
-                except XFormException as e:
-                    raise XFormException(_('Error in form "{}": {}').format(trans(form.name), six.text_type(e)))
+        prerendered_form_files = self._prerendered_form_files or {}
+        if build_profile_id in prerendered_form_files:
+            form_files = prerendered_form_files.pop(build_profile_id)
+        else:
+            form_files = self._create_form_files([build_profile_id])[build_profile_id]
+        for filename, xml in form_files.items():
+            files[prefix + filename] = xml
+        return files
+
+    def create_build_files_for_profiles(self, build_profile_ids):
+        """Create the build files of several build profiles, compiling all of
+        their forms in one pass so that each form's source is only parsed once
+        """
+        self._prerendered_form_files = self._create_form_files(build_profile_ids)
+        try:
+            super(Application, self).create_build_files_for_profiles(build_profile_ids)
+        finally:
+            self._prerendered_form_files = None
+
+    def _create_form_files(self, build_profile_ids):
+        """Compile the forms for each of the build profiles
+
+        Forms are compiled concurrently and the time taken to compile each
+        form for each build profile is kept in ``_build_timings``.
+
+        :returns: ``{build_profile_id: {filename: xml}}``
+        """
+        def exclude_form(form):
+            return isinstance(form, ShadowForm) or form.is_a_disabled_release_form()
+
+        # the previous build's forms were compiled without a build profile
+        previous_form_sources = self._previous_form_sources or {}
+        if self._build_timings is None:
+            self._build_timings = {}
+        if not self._reused_build_files:
+            self._reused_build_files = []
+
+        def compile_form(form_stuff):
+            form = form_stuff['form']
+            filename = self.get_form_filename(**form_stuff)
+            profile_ids = build_profile_ids
+            compiled = []
+            if None in build_profile_ids and form.unique_id in previous_form_sources:
+                compiled.append((None, filename, previous_form_sources[form.unique_id], None))
+                profile_ids = [id_ for id_ in build_profile_ids if id_ is not None]
+            if not profile_ids:
+                return compiled
+            try:
+                start = time.time()
+                form.validate_form()
+                for build_profile_id, xml in form.iter_rendered_xforms(profile_ids):
+                    end = time.time()
+                    compiled.append((build_profile_id, filename, xml.encode('utf-8'), end - start))
+                    start = end
+            except XFormValidationFailed:
+                raise XFormException(_('Unable to validate the forms due to a server error. '
+                                       'Please try again later.'))
+            except XFormException as e:
+                raise XFormException(_('Error in form "{}": {}').format(trans(form.name), six.text_type(e)))
+            return compiled
+
+        def compile_form_in_thread(form_stuff):
+            try:
+                return compile_form(form_stuff)
+            finally:
+                connections.close_all()
+
+        forms = [form_stuff for form_stuff in self.get_forms(bare=False)
+                 if not exclude_form(form_stuff['form'])]
+        max_workers = min(MAX_FORM_BUILD_WORKERS, len(forms))
+        if max_workers <= 1 or in_transaction():
+            # other threads' connections wouldn't see uncommitted changes
+            results = [compile_form(form_stuff) for form_stuff in forms]
+        else:
+            with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map returns results in the order of the forms
+                results = list(executor.map(compile_form_in_thread, forms))
+
+        files = {build_profile_id: {} for build_profile_id in build_profile_ids}
+        for compiled in results:
+            for build_profile_id, filename, xml, seconds in compiled:
+                prefix = '' if not build_profile_id else build_profile_id + '/'
+                files[build_profile_id][filename] = xml
+                if seconds is None:
+                    self._reused_build_files.append(prefix + filename)
+                else:
+                    self._build_timings[prefix + filename] = seconds
         return files
 
     get_modules = IndexedSchema.Getter('modules')
@@ -39,13 +39,12 @@ def make_async_build(app, username, release=False, comment=None):
 @task(queue='background_queue', ignore_result=True)
 def create_build_files_for_all_app_profiles(domain, build_id):
     app = get_app(domain, build_id)
-    build_profiles = app.build_profiles
-    save_app = False
-    for profile in build_profiles:
-        if not app.has_attachment('files/{id}/profile.xml'.format(id=profile)):
-            app.create_build_files(build_profile_id=profile)
-            save_app = True
-    if save_app:
+    missing_profiles = [
+        profile for profile in app.build_profiles
+        if not app.has_attachment('files/{id}/profile.xml'.format(id=profile))
+    ]
+    if missing_profiles:
+        app.create_build_files_for_profiles(missing_profiles)
         app.save()
 
 
@@ -13,7 +13,7 @@ from django.test import TestCase, SimpleTestCase
 
 from corehq.apps.app_manager.dbaccessors import get_app, get_built_app_ids_for_app_id
 from corehq.apps.app_manager.models import Application, DetailColumn, import_app, APP_V1, ApplicationBase, Module, \
-    ReportModule, ReportAppConfig
+    ReportModule, ReportAppConfig, BuildProfile
 from corehq.apps.app_manager.tasks import make_async_build, prune_auto_generated_builds
 from corehq.apps.app_manager.tests.util import add_build, patch_default_builds
 from corehq.apps.app_manager.util import add_odk_profile_after_build, purge_report_from_mobile_ucr
@@ -218,6 +218,50 @@ class AppManagerTest(TestCase):
         self._check_has_build_files(copy, self.min_paths)
         self._check_legacy_odk_files(copy)
 
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def testBuildReusesUnchangedForms(self, mock):
+        app = import_app(self._yesno_source, self.domain)
+        build1 = app.make_build()
+        build1.save()
+        report = build1.get_build_report()
+        self.assertEqual(report['reused'], [])
+        self.assertIn('modules-0/forms-0.xml', report['rebuilt'])
+        self.assertIsNone(report['changed'])
+
+        app.save()
+        build2 = app.make_build(previous_version=build1)
+        build2.save()
+        report = Application.get(build2.get_id).get_build_report()
+        self.assertEqual(report['previous_version'], build1.version)
+        self.assertIn('modules-0/forms-0.xml', report['reused'])
+        self.assertNotIn('modules-0/forms-0.xml', report['rebuilt'])
+        self.assertNotIn('modules-0/forms-0.xml', report['changed'])
+        self.assertEqual(report['removed'], [])
+        self.assertEqual(
+            build2.fetch_attachment('files/modules-0/forms-0.xml'),
+            build1.fetch_attachment('files/modules-0/forms-0.xml'),
+        )
+
+    @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
+    def testCreateBuildFilesForProfiles(self, mock):
+        self.app.langs = ['en', 'fra']
+        self.app.build_profiles['en-id'] = BuildProfile(langs=['en'], name='en-profile')
+        self.app.build_profiles['fra-id'] = BuildProfile(langs=['fra'], name='fra-profile')
+        copy = self.app.make_build()
+        copy.save()
+
+        copy.create_build_files_for_profiles(['en-id', 'fra-id'])
+        copy.save()
+        copy = Application.get(copy.get_id)
+        for profile_id in ['en-id', 'fra-id']:
+            for form in copy.get_forms():
+                path = '{}/{}'.format(profile_id, copy.get_form_filename(module=form.get_module(), form=form))
+                self.assertEqual(
+                    copy.fetch_attachment('files/' + path),
+                    copy.fetch_xform(form=form, build_profile_id=profile_id),
+                )
+                self.assertIn(path, copy.get_build_report()['timings'])
+
     @patch('corehq.apps.app_manager.models.validate_xform', return_value=None)
     def testPruneAutoGeneratedBuilds(self, mock):
         # Build #1, manually generated
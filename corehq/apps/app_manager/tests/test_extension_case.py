@@ -167,7 +167,7 @@ class CaseBlockIndexRelationshipTest(SimpleTestCase, TestXmlMixin):
         parent_node = self.xform.data_node
         action = next(self.form.actions.get_open_actions())
         case_id = session_var(action.case_session_var)
-        subcase_node = _make_elem('{x}subcase_0')
+        subcase_node = _make_elem('{x}subcase_0', namespaces=self.xform.namespaces)
         parent_node.append(subcase_node)
         subcase_node.insert(0, self.subcase_block.elem)
         self.subcase_block.add_create_block(
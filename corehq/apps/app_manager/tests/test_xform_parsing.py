@@ -1,10 +1,12 @@
 # coding=utf-8
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from concurrent import futures
 from django.test import SimpleTestCase
+from six.moves import range
 from corehq.apps.app_manager.tests.util import TestXmlMixin
 from corehq.apps.app_manager.xform import XForm, XFormException, ItextValue, \
-    WrappedNode, validate_xform
+    WrappedNode, validate_xform, _make_elem, namespaces
 
 
 class XFormParsingTest(SimpleTestCase, TestXmlMixin):
@@ -44,6 +46,43 @@ class XFormParsingTest(SimpleTestCase, TestXmlMixin):
         self.assertXmlEqual(original.render(), self.get_xml('itext_form_normalized'))
 
 
+XFORM_WITH_XMLNS = """<h:html xmlns:h="http://www.w3.org/1999/xhtml" xmlns="http://www.w3.org/2002/xforms">
+    <h:head>
+        <model>
+            <instance>
+                <data xmlns="{xmlns}">
+                    <case/>
+                </data>
+            </instance>
+        </model>
+    </h:head>
+    <h:body/>
+</h:html>"""
+
+
+class XFormNamespacesTest(SimpleTestCase):
+
+    def test_xmlns_not_shared(self):
+        first = XForm(XFORM_WITH_XMLNS.format(xmlns='http://example.com/first'))
+        second = XForm(XFORM_WITH_XMLNS.format(xmlns='http://example.com/second'))
+        self.assertEqual('http://example.com/first', first.case_node.tag_xmlns)
+        self.assertEqual('http://example.com/second', second.case_node.tag_xmlns)
+        self.assertNotIn('x', namespaces)
+
+    def test_forms_built_concurrently(self):
+        def build(index):
+            xmlns = 'http://example.com/form{}'.format(index)
+            xform = XForm(XFORM_WITH_XMLNS.format(xmlns=xmlns))
+            question = _make_elem('{x}question', namespaces=xform.namespaces)
+            xform.data_node.append(question)
+            return xmlns, xform.case_node.tag_xmlns, xform.data_node.find('{x}question').tag_xmlns
+
+        with futures.ThreadPoolExecutor(max_workers=4) as executor:
+            for xmlns, case_xmlns, question_xmlns in executor.map(build, range(50)):
+                self.assertEqual(xmlns, case_xmlns)
+                self.assertEqual(xmlns, question_xmlns)
+
+
 class ItextValueTest(SimpleTestCase):
 
     def _test(self, escaped_itext, expected):
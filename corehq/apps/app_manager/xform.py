@@ -61,7 +61,7 @@ hashtag_replacements = [
 ]
 
 
-def _make_elem(tag, attr=None):
+def _make_elem(tag, attr=None, namespaces=namespaces):
     attr = attr or {}
     return ET.Element(
         tag.format(**namespaces),
@@ -174,7 +174,7 @@ class WrappedNode(object):
 
     def xpath(self, xpath, *args, **kwargs):
         if self.xml is not None:
-            return [WrappedNode(n) for n in self.xml.xpath(
+            return [WrappedNode(n, self.namespaces) for n in self.xml.xpath(
                     xpath.format(**self.namespaces), *args, **kwargs)]
         else:
             return []
@@ -182,13 +182,13 @@ class WrappedNode(object):
     def find(self, xpath, *args, **kwargs):
         if self.xml is not None:
             return WrappedNode(self.xml.find(
-                xpath.format(**self.namespaces), *args, **kwargs))
+                xpath.format(**self.namespaces), *args, **kwargs), self.namespaces)
         else:
-            return WrappedNode(None)
+            return WrappedNode(None, self.namespaces)
 
     def findall(self, xpath, *args, **kwargs):
         if self.xml is not None:
-            return [WrappedNode(n) for n in self.xml.findall(
+            return [WrappedNode(n, self.namespaces) for n in self.xml.findall(
                     xpath.format(**self.namespaces), *args, **kwargs)]
         else:
             return []
@@ -198,7 +198,7 @@ class WrappedNode(object):
             return
         formatted_xpath = xpath.format(**self.namespaces)
         for n in self.xml.iterfind(formatted_xpath, *args, **kwargs):
-            yield WrappedNode(n)
+            yield WrappedNode(n, self.namespaces)
 
     def findtext(self, xpath, *args, **kwargs):
         if self.xml is not None:
@@ -211,7 +211,7 @@ class WrappedNode(object):
         if self.xml is not None:
             tags = [t.format(self.namespaces) for t in tags]
             for n in self.xml.iterancestors(tag.format(**self.namespaces), *tags):
-                yield WrappedNode(n)
+                yield WrappedNode(n, self.namespaces)
 
     @property
     def attrib(self):
@@ -600,7 +600,8 @@ class XForm(WrappedNode):
         super(XForm, self).__init__(*args, **kwargs)
         if self.exists():
             xmlns = self.data_node.tag_xmlns
-            self.namespaces.update(x="{%s}" % xmlns)
+            # a copy so that forms being built at the same time don't share the form's xmlns
+            self.namespaces = dict(self.namespaces, x="{%s}" % xmlns)
         self.has_casedb = False
         # A dictionary mapping case types to sets of scheduler case properties
         # updated by the form
@@ -1293,7 +1294,7 @@ class XForm(WrappedNode):
 
         if 'usercase_update' in actions and actions['usercase_update'].update:
             self.add_usercase_bind(usercase_path)
-            usercase_block = _make_elem('{x}commcare_usercase')
+            usercase_block = _make_elem('{x}commcare_usercase', namespaces=self.namespaces)
             case_block = CaseBlock(self, usercase_path)
             case_block.add_update_block(actions['usercase_update'].update)
             usercase_block.append(case_block.elem)
@@ -1476,7 +1477,9 @@ class XForm(WrappedNode):
                 def make_delegation_stub_case_block():
                     path = 'cc_delegation_stub/'
                     DELEGATION_ID = 'delegation_id'
-                    outer_block = _make_elem('{x}cc_delegation_stub', {DELEGATION_ID: ''})
+                    outer_block = _make_elem(
+                        '{x}cc_delegation_stub', {DELEGATION_ID: ''}, namespaces=self.namespaces
+                    )
                     delegation_case_block = CaseBlock(self, path)
                     delegation_case_block.add_close_block('true()')
                     session_delegation_id = "instance('commcaresession')/session/data/%s" % DELEGATION_ID
@@ -1562,7 +1565,7 @@ class XForm(WrappedNode):
                     case_id = session_var(form.session_var_for_action(subcase))
 
                 if nest:
-                    subcase_node = _make_elem('{x}%s' % subcase.form_element_name)
+                    subcase_node = _make_elem('{x}%s' % subcase.form_element_name, namespaces=self.namespaces)
                     parent_node.append(subcase_node)
                     path = '%s%s/' % (base_path, subcase.form_element_name)
                 else:
@@ -1720,7 +1723,7 @@ class XForm(WrappedNode):
         def create_case_block(action, bind_case_id_xpath=None):
             tag = action.form_element_name
             path = tag + '/'
-            base_node = _make_elem("{{x}}{0}".format(tag))
+            base_node = _make_elem("{{x}}{0}".format(tag), namespaces=self.namespaces)
             self.data_node.append(base_node)
             case_block = CaseBlock(self, path=path)
 
@@ -1815,7 +1818,7 @@ class XForm(WrappedNode):
                 name = action.form_element_name
                 path = '%s%s/' % (base_path, name)
                 if create_subcase_node:
-                    subcase_node = _make_elem('{x}%s' % name)
+                    subcase_node = _make_elem('{x}%s' % name, namespaces=self.namespaces)
                     parent_node.append(subcase_node)
                 else:
                     subcase_node = None
@@ -1904,7 +1907,7 @@ class XForm(WrappedNode):
                 prev_node = base_node
                 node = None
                 for node_name in path.split('/'):
-                    node = _make_elem('{x}%s' % node_name)
+                    node = _make_elem('{x}%s' % node_name, namespaces=self.namespaces)
                     prev_node.append(node)
                     prev_node = node
                 return node
@@ -1914,7 +1917,7 @@ class XForm(WrappedNode):
                 base_node = self.data_node.find(node_xpath)
             else:
                 base_node = self.data_node
-            parent_base = _make_elem('{x}parents')
+            parent_base = _make_elem('{x}parents', namespaces=self.namespaces)
             base_node.append(parent_base)
             for parent_path, updates in sorted(updates_by_case.items()):
                 node = make_nested_subnode(parent_base, parent_path)
@@ -0,0 +1,101 @@
+"""Short lived cache of case search results
+
+Results are cached by domain, case type and the search criteria, including
+any blacklisted owner ids so that owner exclusion stays in the ES query.
+Each domain and case type has a generation number that is part of the cache
+key and which the case search pillow increments when it indexes a case of
+that type, so that cached results are not served once the cases they were
+built from have changed. Generations are only created by searches, so
+indexing cases of a type nobody is searching for doesn't touch the cache.
+
+The cache helps when the same search is repeated within a minute (users
+paging back to the search screen, retries, several users in a project
+running the same search) for case types that change less often than that.
+For case types updated more than about once a minute most entries are
+invalidated before they are reused. The hit rate is reported as the
+``commcare.case_search.cache.hit`` and ``.miss`` datadog counters.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+from corehq.apps.case_search.models import (
+    CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY,
+    SEARCH_QUERY_ADDITION_KEY,
+    CaseSearchQueryAddition,
+)
+from corehq.util.datadog.gauges import datadog_counter
+
+CASE_SEARCH_CACHE_TIMEOUT = 60  # seconds
+GENERATION_TIMEOUT = 24 * 60 * 60
+
+
+def get_search_results_cache_key(domain, case_type, criteria):
+    """
+    Get the key once per search and use it for both the lookup and storing the
+    results so that results are not stored under a generation that was
+    incremented while they were being built.
+
+    :param criteria: the search criteria, not including the case type
+    """
+    criteria = dict(criteria)
+    blacklisted_owner_ids = criteria.get(CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY)
+    if blacklisted_owner_ids is not None:
+        criteria[CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY] = sorted(set(blacklisted_owner_ids.split(' ')))
+    query_addition_id = criteria.get(SEARCH_QUERY_ADDITION_KEY)
+    query_addition = None
+    if query_addition_id:
+        query_addition = (CaseSearchQueryAddition.objects
+                          .filter(id=query_addition_id, domain=domain)
+                          .values_list('query_addition', flat=True)
+                          .first())
+    key = json.dumps(
+        [domain, case_type, sorted(criteria.items()), query_addition, _get_generations(domain, case_type)],
+        sort_keys=True,
+    )
+    return 'case-search-results.{}'.format(hashlib.md5(key.encode('utf-8')).hexdigest())
+
+
+def get_cached_search_results(cache_key):
+    """
+    :returns: list of rendered case XML or ``None``
+    """
+    results = cache.get(cache_key)
+    datadog_counter('commcare.case_search.cache.{}'.format('miss' if results is None else 'hit'))
+    return results
+
+
+def set_cached_search_results(cache_key, results):
+    cache.set(cache_key, results, CASE_SEARCH_CACHE_TIMEOUT)
+
+
+def invalidate_search_results(domain, case_type=None):
+    """Stop serving cached results for the case type, or all case types
+    in the domain if ``case_type`` is ``None``
+    """
+    try:
+        cache.incr(_get_generation_key(domain, case_type))
+    except ValueError:
+        pass  # nothing has been cached since the generation was created
+
+
+def _get_generations(domain, case_type):
+    keys = [_get_generation_key(domain, None), _get_generation_key(domain, case_type)]
+    generations = cache.get_many(keys)
+    missing = [key for key in keys if key not in generations]
+    if missing:
+        # start from the time so a generation that expired is not reused
+        for key in missing:
+            cache.add(key, int(time.time()), GENERATION_TIMEOUT)
+        generations = cache.get_many(keys)
+    return [generations.get(key) for key in keys]
+
+
+def _get_generation_key(domain, case_type):
+    key = json.dumps([domain, case_type])
+    return 'case-search-generation.{}'.format(hashlib.md5(key.encode('utf-8')).hexdigest())
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 
 import re
+from collections import namedtuple
 
 import six
 from django.utils.translation import ugettext as _
@@ -20,6 +21,7 @@ from corehq.apps.es.case_search import (
     exact_case_property_text_query,
     reverse_index_case_query,
 )
+from dimagi.utils.chunked import chunked
 
 
 class CaseFilterError(Exception):
@@ -68,61 +70,176 @@ NEQ = "!="
 
 ALL_OPERATORS = [EQ, NEQ] + list(OPERATOR_MAPPING.keys()) + list(COMPARISON_MAPPING.keys())
 
+# the most case ids a single related case lookup may load
+MAX_RELATED_CASE_IDS = 100000
+RELATED_CASE_ID_CHUNK_SIZE = 10000
 
-def build_filter_from_ast(domain, node):
-    """Builds an ES filter from an AST provided by eulxml.xpath.parse
-    """
 
-    def _walk_related_cases(node):
-        """Return a query that will fulfill the filter on the related case.
+RelatedCaseLookupStep = namedtuple('RelatedCaseLookupStep', 'description count chunks cached')
 
-        :param node: a node returned from eulxml.xpath.parse of the form `parent/grandparent/property = 'value'`
 
-        Since ES has no way of performing joins, we filter down in stages:
-        1. Find the ids of all cases where the condition is met
-        2. Walk down the case hierarchy, finding all related cases with the right identifier to the ids
-        found in (1).
-        3. Return the lowest of these ids as an related case query filter
-        """
+class RelatedCaseQueryPlanner(object):
+    """Resolves related case lookups like `parent/grandparent/property = 'value'`
 
-        # fetch the ids of the highest level cases that match the case_property
-        # i.e. all the cases which have `property = 'value'`
-        ids = _parent_property_lookup(node)
+    Since ES has no way of performing joins, we filter down in stages:
 
-        # get the related case path we need to walk, i.e. `parent/grandparent/property`
-        n = node.left
-        while _is_related_case_lookup(n):
-            # This walks down the tree and finds case ids that match each identifier
-            # This is basically performing multiple "joins" to find related cases since ES
-            # doesn't have a way to relate models together
+    1. Find the ids of all cases where the condition is met (the grandparents)
+    2. Walk down the case hierarchy, finding the ids of all cases that index
+       the cases found in the previous step (the parents)
+    3. For the last step filter on cases that index the lowest of these ids.
+       If there are more than ``chunk_size`` of these ids the cases at the
+       next level down are counted and, if there are far fewer of them than
+       ids, they are looked up as well and filtered on by their ids.
 
-            # Get the path to the related case, e.g. `parent/grandparent`
-            # On subsequent run throughs, it walks down the tree (e.g. n = [parent, /, grandparent])
-            n = n.left
-            identifier = serialize(n.right)  # the identifier at this step, e.g. `grandparent`
+    ID lists are fetched ``chunk_size`` ids at a time and a lookup that
+    finds more than ``max_ids`` cases is an error rather than loading them
+    all into memory.
 
-            # get the ids of the cases that point at the previous level's cases
-            # this has the potential of being a very large list
-            ids = _child_case_lookup(ids, identifier=identifier)
+    The ids found at each level are kept so that the same lookup in the
+    same request is only done once. ``explain`` describes the steps taken.
+    """
+
+    def __init__(self, domain, max_ids=MAX_RELATED_CASE_IDS, chunk_size=RELATED_CASE_ID_CHUNK_SIZE):
+        self.domain = domain
+        self.max_ids = max_ids
+        self.chunk_size = chunk_size
+        self.steps = []
+        self._ids_by_lookup = {}
+
+    def get_filter(self, property_query, identifiers, filter_part=None):
+        """
+        :param property_query: the query for the highest level cases e.g. `property = 'value'`
+        :param identifiers: the identifiers of the indices to follow from the
+        highest level down e.g. ['grandparent', 'parent'] for `parent/grandparent/property`
+        :param filter_part: the part of the XPath expression being resolved, for errors
+        """
+        lookup = (property_query,)
+        ids = self._lookup(
+            lookup, "cases where {}".format(property_query),
+            lambda: self._get_property_case_ids(property_query, filter_part), filter_part
+        )
+        for identifier in identifiers[:-1]:
             if not ids:
                 break
+            case_ids = ids
+            lookup += (identifier,)
+            ids = self._lookup(
+                lookup, "cases indexing them as '{}'".format(identifier),
+                lambda: self._get_child_case_ids(case_ids, identifier, filter_part), filter_part
+            )
 
-        # after walking the full tree, get the final level we are interested in, i.e. `parent`
-        final_identifier = serialize(n.left)
+        final_identifier = identifiers[-1]
+        child_count = None
+        if len(ids) > self.chunk_size:
+            # only worth the extra count query when the reverse index filter would be large
+            child_count = self._count_child_cases(ids, final_identifier)
+            if child_count * 2 < len(ids):
+                # cheaper to filter on the ids of the cases themselves
+                child_ids = self._lookup(
+                    lookup + (final_identifier,), "cases indexing them as '{}'".format(final_identifier),
+                    lambda: self._get_child_case_ids(ids, final_identifier, filter_part), filter_part
+                )
+                self.steps.append(RelatedCaseLookupStep("filter on case ids", len(child_ids), 0, False))
+                return filters.doc_id(child_ids)
+
+        if ids:
+            self.steps.append(RelatedCaseLookupStep(
+                "filter on cases indexing them as '{}'".format(final_identifier), child_count, 0, False
+            ))
         return reverse_index_case_query(ids, final_identifier)
 
-    def _parent_property_lookup(node):
-        """given a node of the form `parent/foo = 'thing'`, return all case_ids where `foo = thing`
+    def explain(self):
+        """Describe the steps taken to resolve the related case lookups
+
+        The count of the final filter is an estimate and is only known if the
+        cases were counted.
+        """
+        lines = []
+        for index, step in enumerate(self.steps, start=1):
+            line = "{}. {}".format(index, step.description)
+            if step.count is not None:
+                line += ": {} cases".format(step.count)
+            if step.chunks > 1:
+                line += " ({} queries)".format(step.chunks)
+            if step.cached:
+                line += " (cached)"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _lookup(self, lookup, description, get_ids, filter_part):
+        if lookup in self._ids_by_lookup:
+            ids = self._ids_by_lookup[lookup]
+            self.steps.append(RelatedCaseLookupStep(description, len(ids), 0, True))
+            return ids
+
+        ids, chunks = get_ids()
+        self._ids_by_lookup[lookup] = ids
+        self.steps.append(RelatedCaseLookupStep(description, len(ids), chunks, False))
+        return ids
+
+    def _get_property_case_ids(self, property_query, filter_part):
+        query = CaseSearchES().domain(self.domain).xpath_query(self.domain, property_query)
+        return self._get_ids([query], filter_part), 1
+
+    def _get_child_case_ids(self, case_ids, identifier, filter_part):
+        queries = [
+            CaseSearchES().domain(self.domain).get_child_cases(chunk, identifier)
+            for chunk in chunked(case_ids, self.chunk_size)
+        ]
+        return self._get_ids(queries, filter_part), len(queries)
+
+    def _count_child_cases(self, case_ids, identifier):
+        return sum(
+            CaseSearchES().domain(self.domain).get_child_cases(chunk, identifier).count()
+            for chunk in chunked(case_ids, self.chunk_size)
+        )
+
+    def _get_ids(self, queries, filter_part):
+        ids = set()
+        for query in queries:
+            for case_id in query.scroll_ids():
+                ids.add(case_id)
+                if len(ids) > self.max_ids:
+                    raise CaseFilterError(
+                        _("The related case lookup \"{}\" matches too many cases. "
+                          "Please make your search more specific.").format(filter_part),
+                        filter_part
+                    )
+        return sorted(ids)
+
+
+def build_filter_from_ast(domain, node, planner=None):
+    """Builds an ES filter from an AST provided by eulxml.xpath.parse
+
+    :param planner: (optional) ``RelatedCaseQueryPlanner`` to use for related
+    case lookups. Pass the same planner when building several filters in
+    one request to reuse the results of the lookups.
+    """
+    planner = planner or RelatedCaseQueryPlanner(domain)
+
+    def _walk_related_cases(node):
+        """Return a query that will fulfill the filter on the related case.
+
+        :param node: a node returned from eulxml.xpath.parse of the form `parent/grandparent/property = 'value'`
+
+        Since ES has no way of performing joins, we filter down in stages. See
+        ``RelatedCaseQueryPlanner`` for details.
         """
         if isinstance(node.right, Step):
             _raise_step_RHS(node)
-        new_query = "{} {} '{}'".format(serialize(node.left.right), node.op, node.right)
-        return CaseSearchES().domain(domain).xpath_query(domain, new_query).scroll_ids()
+        # the property lookup on the highest level cases i.e. `property = 'value'`
+        property_query = "{} {} '{}'".format(serialize(node.left.right), node.op, node.right)
 
-    def _child_case_lookup(case_ids, identifier):
-        """returns a list of all case_ids who have parents `case_id` with the relationship `identifier`
-        """
-        return CaseSearchES().domain(domain).get_child_cases(case_ids, identifier).scroll_ids()
+        # get the related case path we need to walk, i.e. `parent/grandparent`
+        # from the highest level down i.e. ['grandparent', 'parent']
+        identifiers = []
+        n = node.left
+        while _is_related_case_lookup(n):
+            n = n.left
+            identifiers.append(serialize(n.right))
+        identifiers.append(serialize(n.left))
+
+        return planner.get_filter(property_query, identifiers, serialize(node))
 
     def _is_related_case_lookup(node):
         """Returns whether a particular AST node is a related case lookup
@@ -233,14 +350,14 @@ def build_filter_from_ast(domain, node):
     return visit(node)
 
 
-def build_filter_from_xpath(domain, xpath):
+def build_filter_from_xpath(domain, xpath, planner=None):
     error_message = _(
         "We didn't understand what you were trying to do with {}. "
         "Please try reformatting your query. "
         "The operators we accept are: {}"
     )
     try:
-        return build_filter_from_ast(domain, parse_xpath(xpath))
+        return build_filter_from_ast(domain, parse_xpath(xpath), planner)
     except TypeError as e:
         text_error = re.search(r"Unknown text '(.+)'", six.text_type(e))
         if text_error:
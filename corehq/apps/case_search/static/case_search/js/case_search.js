@@ -20,6 +20,7 @@ hqDefine('case_search/js/case_search', [
         self.count = ko.observable();
         self.took = ko.observable();
         self.query = ko.observable();
+        self.relatedCaseLookups = ko.observable();
         self.case_data_url = caseDataUrl;
         self.xpath = ko.observable();
         self.parameters = ko.observableArray();
@@ -42,6 +43,7 @@ hqDefine('case_search/js/case_search', [
             self.count("-");
             self.took(null);
             self.query(null);
+            self.relatedCaseLookups(null);
             $.post({
                 url: window.location.href,
                 data: {q: JSON.stringify({
@@ -58,6 +60,7 @@ hqDefine('case_search/js/case_search', [
                     self.count(data.count);
                     self.took(data.took);
                     self.query(data.query);
+                    self.relatedCaseLookups(data.related_case_lookups);
                 },
                 error: function(response){
                     alertUser.alert_user(response.responseJSON.message, 'danger');
@@ -0,0 +1,81 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from mock import patch
+
+from corehq.apps.case_search.cache import (
+    get_cached_search_results,
+    get_search_results_cache_key,
+    invalidate_search_results,
+    set_cached_search_results,
+)
+from corehq.apps.case_search.models import CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY
+
+locmem_cache = caches['locmem']
+
+
+@patch('corehq.apps.case_search.cache.cache', locmem_cache)
+class CaseSearchCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        locmem_cache.clear()
+        self.results = [b'<case case_id="c1"/>']
+
+    def tearDown(self):
+        locmem_cache.clear()
+
+    def _get(self, domain, case_type, criteria):
+        return get_cached_search_results(get_search_results_cache_key(domain, case_type, criteria))
+
+    def _set(self, domain, case_type, criteria):
+        set_cached_search_results(get_search_results_cache_key(domain, case_type, criteria), self.results)
+
+    def test_miss(self):
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jon'}))
+
+    def test_criteria_order(self):
+        self._set('domain', 'patient', {'name': 'Jon', 'dob': '2018-01-01'})
+        self.assertEqual(self._get('domain', 'patient', {'dob': '2018-01-01', 'name': 'Jon'}), self.results)
+
+    def test_different_criteria(self):
+        self._set('domain', 'patient', {'name': 'Jon'})
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jonathan'}))
+        self.assertIsNone(self._get('domain', 'household', {'name': 'Jon'}))
+        self.assertIsNone(self._get('other-domain', 'patient', {'name': 'Jon'}))
+
+    def test_blacklisted_owner_ids(self):
+        self._set('domain', 'patient', {'name': 'Jon', CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY: 'owner1 owner2'})
+        self.assertEqual(
+            self._get('domain', 'patient', {'name': 'Jon', CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY: 'owner2 owner1'}),
+            self.results
+        )
+        self.assertIsNone(
+            self._get('domain', 'patient', {'name': 'Jon', CASE_SEARCH_BLACKLISTED_OWNER_ID_KEY: 'owner1'})
+        )
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jon'}))
+
+    def test_invalidate_case_type(self):
+        self._set('domain', 'patient', {'name': 'Jon'})
+        self._set('domain', 'household', {'name': 'Jon'})
+        invalidate_search_results('domain', 'patient')
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jon'}))
+        self.assertEqual(self._get('domain', 'household', {'name': 'Jon'}), self.results)
+
+    def test_invalidate_domain(self):
+        self._set('domain', 'patient', {'name': 'Jon'})
+        invalidate_search_results('domain')
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jon'}))
+
+    def test_invalidate_twice(self):
+        invalidate_search_results('domain', 'patient')
+        self._set('domain', 'patient', {'name': 'Jon'})
+        invalidate_search_results('domain', 'patient')
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jon'}))
+
+    def test_invalidated_while_searching(self):
+        cache_key = get_search_results_cache_key('domain', 'patient', {'name': 'Jon'})
+        invalidate_search_results('domain', 'patient')
+        set_cached_search_results(cache_key, self.results)
+        self.assertIsNone(self._get('domain', 'patient', {'name': 'Jon'}))
@@ -7,10 +7,12 @@ from eulxml.xpath import parse as parse_xpath
 from casexml.apps.case.mock import CaseFactory, CaseIndex, CaseStructure
 from corehq.apps.case_search.filter_dsl import (
     CaseFilterError,
+    RelatedCaseQueryPlanner,
     build_filter_from_ast,
     get_properties_from_ast,
 )
-from corehq.apps.es import CaseSearchES
+from corehq.apps.es import CaseSearchES, filters
+from corehq.apps.es.case_search import reverse_index_case_query
 from corehq.elastic import get_es_new, send_to_elasticsearch
 from corehq.form_processor.tests.utils import FormProcessorTestUtils
 from corehq.pillows.case_search import transform_case_for_elasticsearch
@@ -261,6 +263,86 @@ class TestFilterDsl(SimpleTestCase):
             build_filter_from_ast(None, parse_xpath("parent/name > other_property"))
 
 
+class FakeRelatedCaseQueryPlanner(RelatedCaseQueryPlanner):
+    """Looks up cases in `cases`, a dict of case_id -> (properties, {identifier: referenced_id})"""
+
+    def __init__(self, cases, **kwargs):
+        super(FakeRelatedCaseQueryPlanner, self).__init__('domain', **kwargs)
+        self.cases = cases
+        self.queries = []
+
+    def _get_property_case_ids(self, property_query, filter_part):
+        self.queries.append(property_query)
+        prop, value = property_query.split(" = ")
+        ids = [case_id for case_id, (props, indices) in self.cases.items() if props.get(prop) == value.strip("'")]
+        return self._check_ids(ids, filter_part), 1
+
+    def _get_child_case_ids(self, case_ids, identifier, filter_part):
+        self.queries.append(identifier)
+        return self._check_ids(self._children(case_ids, identifier), filter_part), 1
+
+    def _count_child_cases(self, case_ids, identifier):
+        return len(self._children(case_ids, identifier))
+
+    def _children(self, case_ids, identifier):
+        return sorted(
+            case_id for case_id, (props, indices) in self.cases.items()
+            if indices.get(identifier) in case_ids
+        )
+
+    def _check_ids(self, ids, filter_part):
+        if len(ids) > self.max_ids:
+            raise CaseFilterError("too many", filter_part)
+        return ids
+
+
+class TestRelatedCaseQueryPlanner(SimpleTestCase):
+
+    def setUp(self):
+        self.cases = {
+            'grandparent': ({'name': 'gp'}, {}),
+            'parent1': ({}, {'parent': 'grandparent'}),
+            'parent2': ({}, {'parent': 'grandparent'}),
+            'child1': ({}, {'parent': 'parent1'}),
+            'child2': ({}, {'parent': 'parent2'}),
+            'child3': ({}, {'parent': 'parent2'}),
+        }
+
+    def test_reverse_index_filter(self):
+        planner = FakeRelatedCaseQueryPlanner(self.cases)
+        built_filter = build_filter_from_ast('domain', parse_xpath("parent/parent/name = 'gp'"), planner)
+        self.assertEqual(reverse_index_case_query(['parent1', 'parent2'], 'parent'), built_filter)
+        self.assertEqual(["name = 'gp'", 'parent'], planner.queries)
+
+    def test_filter_on_fewer_child_ids(self):
+        for i in range(5):
+            self.cases['other{}'.format(i)] = ({'name': 'gp'}, {})
+        planner = FakeRelatedCaseQueryPlanner(self.cases, chunk_size=5)
+        built_filter = build_filter_from_ast('domain', parse_xpath("parent/name = 'gp'"), planner)
+        self.assertEqual(filters.doc_id(['parent1', 'parent2']), built_filter)
+
+    def test_lookups_cached(self):
+        planner = FakeRelatedCaseQueryPlanner(self.cases)
+        build_filter_from_ast(
+            'domain', parse_xpath("parent/parent/name = 'gp' or parent/parent/name = 'gp'"), planner
+        )
+        self.assertEqual(["name = 'gp'", 'parent'], planner.queries)
+        self.assertEqual(
+            "1. cases where name = 'gp': 1 cases\n"
+            "2. cases indexing them as 'parent': 2 cases\n"
+            "3. filter on cases indexing them as 'parent'\n"
+            "4. cases where name = 'gp': 1 cases (cached)\n"
+            "5. cases indexing them as 'parent': 2 cases (cached)\n"
+            "6. filter on cases indexing them as 'parent'",
+            planner.explain()
+        )
+
+    def test_too_many_ids(self):
+        planner = FakeRelatedCaseQueryPlanner(self.cases, max_ids=1)
+        with self.assertRaises(CaseFilterError):
+            build_filter_from_ast('domain', parse_xpath("parent/parent/name = 'gp'"), planner)
+
+
 class TestFilterDslLookups(TestCase):
     maxDiff = None
 
@@ -330,6 +412,24 @@ class TestFilterDslLookups(TestCase):
         ensure_index_deleted(CASE_SEARCH_INDEX_INFO.index)
         super(TestFilterDslLookups, self).tearDownClass()
 
+    def test_related_case_ids_chunked(self):
+        planner = RelatedCaseQueryPlanner(self.domain, chunk_size=1)
+        self.assertEqual(
+            ([self.parent_case_id], 2),
+            planner._get_child_case_ids([self.grandparent_case_id, 'unknown'], 'mother', None)
+        )
+
+    def test_related_case_ids_max_ids(self):
+        planner = RelatedCaseQueryPlanner(self.domain, max_ids=3)
+        self.assertEqual(
+            (sorted([self.child_case_id, self.parent_case_id, self.grandparent_case_id]), 1),
+            planner._get_property_case_ids("house = 'Tyrell'", None)
+        )
+
+        planner = RelatedCaseQueryPlanner(self.domain, max_ids=2)
+        with self.assertRaises(CaseFilterError):
+            planner._get_property_case_ids("house = 'Tyrell'", "father/house = 'Tyrell'")
+
     def test_parent_lookups(self):
         parsed = parse_xpath("father/name = 'Mace'")
         # return all the cases who's parent (relationship named 'father') has case property 'name' = 'Mace'
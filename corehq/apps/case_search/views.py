@@ -7,6 +7,7 @@ import re
 from django.http import Http404
 from django.views.generic import TemplateView
 
+from corehq.apps.case_search.filter_dsl import RelatedCaseQueryPlanner
 from corehq.apps.case_search.models import (
     CaseSearchQueryAddition,
     case_search_enabled_for_domain,
@@ -73,12 +74,14 @@ class CaseSearchView(DomainViewMixin, TemplateView):
             new_query = merge_queries(search.get_query(), addition.query_addition)
             search = search.set_query(new_query)
 
+        planner = RelatedCaseQueryPlanner(self.domain)
         if xpath:
-            search = search.xpath_query(self.domain, xpath)
+            search = search.xpath_query(self.domain, xpath, planner)
         search_results = search.run()
         return json_response({
             'values': search_results.raw_hits,
             'count': search_results.total,
             'took': search_results.raw['took'],
             'query': search_results.query.dumps(pretty=True),
+            'related_case_lookups': planner.explain(),
         })
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import uuid
 from corehq.apps.app_manager.models import (
     AdvancedModule,
     AdvancedForm,
@@ -39,12 +40,16 @@ from corehq.messaging.scheduling.scheduling_partitioned.models import (
 )
 from corehq.messaging.scheduling.tasks import handle_case_timed_schedule_instance
 from corehq.messaging.scheduling.tests.util import delete_alert_schedules, delete_timed_schedules
-from corehq.messaging.tasks import run_messaging_rule, sync_case_for_messaging_rule
+from corehq.messaging.tasks import (
+    run_messaging_rule,
+    sync_case_for_messaging_rule,
+    sync_cases_for_messaging_rule,
+)
 from corehq.sql_db.util import run_query_across_partitioned_databases
 from datetime import datetime, date, time
 from django.db.models import Q
 from django.test import TestCase
-from mock import patch, call
+from mock import patch
 from six.moves import range
 
 
@@ -995,7 +1000,7 @@ class CaseRuleSchedulingIntegrationTest(TestCase):
             self.assertTrue(instances[0].active)
 
     @run_with_all_backends
-    @patch('corehq.messaging.tasks.sync_case_for_messaging_rule.delay')
+    @patch('corehq.messaging.tasks.sync_cases_for_messaging_rule.delay')
     def test_run_messaging_rule(self, task_patch):
         schedule = AlertSchedule.create_simple_alert(
             self.domain,
@@ -1014,14 +1019,42 @@ class CaseRuleSchedulingIntegrationTest(TestCase):
 
         with create_case(self.domain, 'person') as case1, create_case(self.domain, 'person') as case2:
             run_messaging_rule(self.domain, rule.pk)
-            self.assertEqual(task_patch.call_count, 2)
-            task_patch.assert_has_calls(
-                [
-                    call(self.domain, case1.case_id, rule.pk),
-                    call(self.domain, case2.case_id, rule.pk),
-                ],
-                any_order=True
-            )
+            self.assertEqual(task_patch.call_count, 1)
+            domain, case_ids, rule_id = task_patch.call_args[0]
+            self.assertEqual(domain, self.domain)
+            self.assertEqual(set(case_ids), {case1.case_id, case2.case_id})
+            self.assertEqual(rule_id, rule.pk)
+
+    @run_with_all_backends
+    @patch('corehq.messaging.scheduling.models.content.SMSContent.send')
+    @patch('corehq.messaging.tasks.sync_case_for_messaging_rule.delay')
+    def test_sync_cases_for_messaging_rule(self, task_patch, send_patch):
+        schedule = AlertSchedule.create_simple_alert(
+            self.domain,
+            SMSContent(message={'en': 'Hello'})
+        )
+
+        rule = create_empty_rule(self.domain, AutomaticUpdateRule.WORKFLOW_SCHEDULING)
+
+        rule.add_action(
+            CreateScheduleInstanceActionDefinition,
+            alert_schedule_id=schedule.schedule_id,
+            recipients=(('Self', None),),
+        )
+
+        AutomaticUpdateRule.clear_caches(self.domain, AutomaticUpdateRule.WORKFLOW_SCHEDULING)
+
+        with create_case(self.domain, 'person') as case1, create_case(self.domain, 'person') as case2:
+            missing_case_id = uuid.uuid4().hex
+            sync_cases_for_messaging_rule(self.domain, [case1.case_id, case2.case_id, missing_case_id], rule.pk)
+
+            for case in (case1, case2):
+                instances = get_case_alert_schedule_instances_for_schedule(case.case_id, schedule)
+                self.assertEqual(instances.count(), 1)
+                self.assertEqual(instances[0].rule_id, rule.pk)
+
+            # cases that can't be synced are handed on to be retried on their own
+            task_patch.assert_called_once_with(self.domain, missing_case_id, rule.pk)
 
     @run_with_all_backends
     @patch('corehq.messaging.scheduling.models.content.SMSContent.send')
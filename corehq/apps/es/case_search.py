@@ -103,7 +103,7 @@ class CaseSearchES(CaseES):
         """
         return self._add_query(case_property_range_query(case_property_name, gt, gte, lt, lte), clause)
 
-    def xpath_query(self, domain, xpath):
+    def xpath_query(self, domain, xpath, planner=None):
         """Search for cases using an XPath predicate expression.
 
         Enter an arbitrary XPath predicate in the context of the case. Also supports related case lookups.
@@ -113,9 +113,12 @@ class CaseSearchES(CaseES):
         - date ranges: "first_came_online >= '2017-08-12' or died <= '2020-11-15"
         - numeric ranges: "age >= 100 and height < 1.25"
         - related cases: "mother/first_name = 'maeve' or parent/parent/host/age = 13"
+
+        Pass the same ``RelatedCaseQueryPlanner`` as ``planner`` for every query
+        built in one request to only do each related case lookup once.
         """
         from corehq.apps.case_search.filter_dsl import build_filter_from_xpath
-        return self.filter(build_filter_from_xpath(domain, xpath))
+        return self.filter(build_filter_from_xpath(domain, xpath, planner))
 
     def _add_query(self, new_query, clause):
         current_query = self._query.get(queries.BOOL)
@@ -128,5 +128,10 @@ def nested(path, filter_):
     }
 
 
+def prefix(field, value):
+    """Only return docs where ``field`` starts with ``value``"""
+    return {"prefix": {field: value}}
+
+
 def regexp(field, regex):
     return {"regexp": {field: regex}}
@@ -88,6 +88,8 @@ CASE_EXPORT = 'case'
 SMS_EXPORT = 'sms'
 MAX_EXPORTABLE_ROWS = 100000
 CASE_SCROLL_SIZE = 10000
+# number of documents whose rows are computed and written together
+EXPORT_WRITE_BATCH_SIZE = 1000
 
 # When a question is missing completely from a form/case this should be the value
 MISSING_VALUE = '---'
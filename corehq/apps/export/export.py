@@ -10,10 +10,11 @@ import datetime
 
 from couchdbkit import ResourceConflict
 
+from dimagi.utils.chunked import chunked
 from dimagi.utils.logging import notify_exception
 from soil import DownloadBase
 
-from couchexport.export import FormattedRow, get_writer
+from couchexport.export import get_writer
 from couchexport.models import Format
 from corehq.elastic import iter_es_docs_from_query
 from corehq.toggles import PAGINATED_EXPORTS
@@ -29,7 +30,7 @@ from corehq.apps.export.models.new import (
     FormExportInstance,
     SMSExportInstance,
 )
-from corehq.apps.export.const import MAX_EXPORTABLE_ROWS
+from corehq.apps.export.const import EXPORT_WRITE_BATCH_SIZE, MAX_EXPORTABLE_ROWS
 import six
 from io import open
 
@@ -110,7 +111,16 @@ class _ExportWriter(object):
         :param table: A TableConfiguration
         :param row: An ExportRow
         """
-        return self.writer.write([(table, [FormattedRow(data=row.data)])])
+        return self.write_rows(table, [row])
+
+    def write_rows(self, table, rows):
+        """
+        Write the given rows to the given table of the export.
+        _Writer must be opened first.
+        :param table: A TableConfiguration
+        :param rows: A list of ExportRows
+        """
+        return self.writer.write_rows(table, [row.data for row in rows])
 
     def get_preview(self):
         return self.writer.get_preview()
@@ -252,16 +262,30 @@ class _PaginatedExportWriter(object):
         :param table: A TableConfiguration
         :param row: An ExportRow
         """
-        if self.rows_written[table] >= MAX_EXPORTABLE_ROWS * (self.pages[table] + 1):
-            self.pages[table] += 1
-            self.writer.add_table(
-                self._paged_table_index(table),
-                self._get_paginated_headers()[self._paged_table_index(table)][0],
-                table_title=self._get_paginated_table_titles()[self._paged_table_index(table)],
-            )
+        self.write_rows(table, [row])
 
-        self.writer.write([(self._paged_table_index(table), [FormattedRow(data=row.data)])])
-        self.rows_written[table] += 1
+    def write_rows(self, table, rows):
+        """
+        Write the given rows to the given table of the export, opening new
+        tables as each page fills up.
+        :param table: A TableConfiguration
+        :param rows: A list of ExportRows
+        """
+        start = 0
+        while start < len(rows):
+            if self.rows_written[table] >= MAX_EXPORTABLE_ROWS * (self.pages[table] + 1):
+                self.pages[table] += 1
+                self.writer.add_table(
+                    self._paged_table_index(table),
+                    self._get_paginated_headers()[self._paged_table_index(table)][0],
+                    table_title=self._get_paginated_table_titles()[self._paged_table_index(table)],
+                )
+
+            page_space = MAX_EXPORTABLE_ROWS * (self.pages[table] + 1) - self.rows_written[table]
+            page_rows = rows[start:start + page_space]
+            self.writer.write_rows(self._paged_table_index(table), [row.data for row in page_rows])
+            self.rows_written[table] += len(page_rows)
+            start += len(page_rows)
 
 
 def get_export_writer(export_instances, temp_path, allow_pagination=True):
@@ -340,47 +364,55 @@ def write_export_instance(writer, export_instance, documents, progress_tracker=N
     start = _time_in_milliseconds()
     total_bytes = 0
     total_rows = 0
-    compute_total = 0
-    write_total = 0
+    tags = ['format:{}'.format(writer.format)]
 
-    for row_number, doc in enumerate(documents):
-        total_bytes += sys.getsizeof(doc)
-        for table in export_instance.selected_tables:
-            compute_start = _time_in_milliseconds()
-            try:
-                rows = table.get_rows(
-                    doc,
-                    row_number,
-                    split_columns=export_instance.split_multiselects,
-                    transform_dates=export_instance.transform_dates,
-                )
-            except Exception as e:
-                notify_exception(None, "Error exporting doc", details={
-                    'domain': export_instance.domain,
-                    'export_instance_id': export_instance.get_id,
-                    'export_table': table.label,
-                    'doc_id': doc.get('_id'),
-                })
-                e.sentry_capture = False
-                raise
-            compute_total += _time_in_milliseconds() - compute_start
-
-            write_start = _time_in_milliseconds()
-            for row in rows:
-                # It might be bad to write one row at a time when you can do more (from a performance perspective)
-                # Regardless, we should handle the batching of rows in the _Writer class, not here.
-                writer.write(table, row)
-            write_total += _time_in_milliseconds() - write_start
-
-            total_rows += len(rows)
+    tables = export_instance.selected_tables
+    row_plans = [table.get_row_plan() for table in tables]
+
+    row_number = 0
+    for batch in chunked(documents, EXPORT_WRITE_BATCH_SIZE):
+        batch_bytes = 0
+        compute_start = _time_in_milliseconds()
+        table_rows = [[] for table in tables]
+        for doc in batch:
+            batch_bytes += sys.getsizeof(doc)
+            for table, row_plan, rows in zip(tables, row_plans, table_rows):
+                try:
+                    rows.extend(table.get_rows(
+                        doc,
+                        row_number,
+                        split_columns=export_instance.split_multiselects,
+                        transform_dates=export_instance.transform_dates,
+                        row_plan=row_plan,
+                    ))
+                except Exception as e:
+                    notify_exception(None, "Error exporting doc", details={
+                        'domain': export_instance.domain,
+                        'export_instance_id': export_instance.get_id,
+                        'export_table': table.label,
+                        'doc_id': doc.get('_id'),
+                    })
+                    e.sentry_capture = False
+                    raise
+            row_number += 1
+        compute_duration = _time_in_milliseconds() - compute_start
+
+        write_start = _time_in_milliseconds()
+        for table, rows in zip(tables, table_rows):
+            if rows:
+                writer.write_rows(table, rows)
+        write_duration = _time_in_milliseconds() - write_start
+
+        batch_rows = sum(len(rows) for rows in table_rows)
+        _record_datadog_export_write_rows(write_duration, batch_bytes, batch_rows, tags)
+        _record_datadog_export_compute_rows(compute_duration, batch_bytes, batch_rows, tags)
+        total_bytes += batch_bytes
+        total_rows += batch_rows
 
         if progress_tracker:
-            DownloadBase.set_progress(progress_tracker, row_number + 1, documents.count)
+            DownloadBase.set_progress(progress_tracker, row_number, documents.count)
 
     end = _time_in_milliseconds()
-    tags = ['format:{}'.format(writer.format)]
-    _record_datadog_export_write_rows(write_total, total_bytes, total_rows, tags)
-    _record_datadog_export_compute_rows(compute_total, total_bytes, total_rows, tags)
     _record_datadog_export_duration(end - start, total_bytes, total_rows, tags)
 
 
@@ -63,6 +63,32 @@ class TermFilter(ExportFilter):
         return esfilters.term(self.term, self.value)
 
 
+class DocIdSliceFilter(ExportFilter):
+    """
+    Filter to one of ``num_slices`` disjoint slices of the documents, split on the
+    first character of the document id. Taken together the slices match every document:
+    ids that don't start with a lowercase hex digit all fall in the first slice.
+    """
+    DOC_ID_CHARS = '0123456789abcdef'
+
+    def __init__(self, slice_id, num_slices):
+        assert 0 <= slice_id < num_slices <= len(self.DOC_ID_CHARS)
+        self.slice_id = slice_id
+        self.num_slices = num_slices
+
+    def to_es_filter(self):
+        slice_filter = esfilters.OR(*[
+            esfilters.prefix('_id', char) for i, char in enumerate(self.DOC_ID_CHARS)
+            if i % self.num_slices == self.slice_id
+        ])
+        if self.slice_id == 0:
+            other_ids = esfilters.NOT(
+                esfilters.OR(*[esfilters.prefix('_id', char) for char in self.DOC_ID_CHARS])
+            )
+            slice_filter = esfilters.OR(slice_filter, other_ids)
+        return slice_filter
+
+
 class AppFilter(ExportFilter):
     """
     Filter on app_id
@@ -7,7 +7,11 @@ import multiprocessing
 
 from django.core.management.base import BaseCommand, CommandError
 
-from corehq.apps.export.multiprocess import rebuild_export_mutiprocess
+from corehq.apps.export.multiprocess import (
+    MAX_EXPORT_SLICES,
+    rebuild_export_mutiprocess,
+    rebuild_export_sliced,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,21 @@ class Command(BaseCommand):
             default=multiprocessing.cpu_count() - 1,
             help='Number of parallel processes to run.'
         )
+        parser.add_argument(
+            '--sliced',
+            action='store_true',
+            dest='sliced',
+            default=False,
+            help='Have each process query its own slice of the documents instead of dumping '
+                 'all documents to disk first. --chunksize is ignored.'
+        )
+        parser.add_argument(
+            '--slices',
+            type=int,
+            dest='num_slices',
+            default=MAX_EXPORT_SLICES,
+            help='Number of slices to split the documents into (max {}).'.format(MAX_EXPORT_SLICES)
+        )
 
     def handle(self, **options):
         if __debug__:
@@ -39,6 +58,12 @@ class Command(BaseCommand):
         page_size = options.pop('page_size')
         processes = options.pop('processes')
 
-        rebuild_export_mutiprocess(export_id, processes, page_size)
+        if options['sliced']:
+            num_slices = options['num_slices']
+            if not 0 < num_slices <= MAX_EXPORT_SLICES:
+                raise CommandError('--slices must be between 1 and {}'.format(MAX_EXPORT_SLICES))
+            rebuild_export_sliced(export_id, processes, num_slices)
+        else:
+            rebuild_export_mutiprocess(export_id, processes, page_size)
 
         self.stdout.write(self.style.SUCCESS('Rebuild Complete'))
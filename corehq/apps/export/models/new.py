@@ -266,7 +266,18 @@ class ExportColumn(DocumentSchema):
         assert base_path == self.item.path[:len(base_path)], "ExportItem's path doesn't start with the base_path"
         # Get the path from the doc root to the desired ExportItem
         path = [x.name for x in self.item.path[len(base_path):]]
-        return self._transform(NestedDictGetter(path)(doc), doc, transform_dates)
+        return self._get_value_from_raw(
+            NestedDictGetter(path)(doc), domain, doc_id, doc,
+            transform_dates=transform_dates, split_column=split_column
+        )
+
+    def _get_value_from_raw(self, raw_value, domain, doc_id, doc, transform_dates=False, split_column=False):
+        """
+        Produce the column value from the raw value found at the column's path.
+        Subclasses that post-process the value should override this rather than
+        ``get_value`` so that they can be used by ``TableRowPlan``.
+        """
+        return self._transform(raw_value, doc, transform_dates)
 
     def _transform(self, value, doc, transform_dates):
         """
@@ -442,6 +453,110 @@ class DocRow(namedtuple("DocRow", ["doc", "row"])):
     """
 
 
+class _PathTrieNode(object):
+
+    def __init__(self):
+        self.children = OrderedDict()
+        # indexes into the list of raw values of the columns whose path ends at this node
+        self.slots = []
+
+
+class TableRowPlan(object):
+    """
+    A plan for computing the rows of a table, compiled once per export rather than
+    once per document.
+
+    The paths of the selected columns (relative to the table path) are merged into
+    a trie so each sub-document is traversed once, with path prefixes shared between
+    columns only looked up once. Columns that compute their value from something
+    other than their item path fall back to ``ExportColumn.get_value``.
+
+    The values produced are identical to calling ``get_value`` on each column.
+    """
+
+    def __init__(self, table):
+        self.base_path = table.path
+        self._root = _PathTrieNode()
+        self._num_slots = 0
+        # (column, bound _get_value_from_raw or None, slot index or None) for each selected column
+        self._column_getters = []
+        for column in table.selected_columns:
+            if self._uses_item_path(column):
+                slot = self._add_path(column)
+                self._column_getters.append((column, column._get_value_from_raw, slot))
+            else:
+                self._column_getters.append((column, None, None))
+
+    @staticmethod
+    def _uses_item_path(column):
+        return (
+            six.get_unbound_function(type(column).get_value)
+            is six.get_unbound_function(ExportColumn.get_value)
+        )
+
+    def _add_path(self, column):
+        base_path = self.base_path
+        assert base_path == column.item.path[:len(base_path)], "ExportItem's path doesn't start with the base_path"
+        path = [x.name for x in column.item.path[len(base_path):]]
+        slot = self._num_slots
+        self._num_slots += 1
+        if not path:
+            # an empty path never matches anything (see NestedDictGetter)
+            return slot
+
+        node = self._root
+        for name in path:
+            if name not in node.children:
+                node.children[name] = _PathTrieNode()
+            node = node.children[name]
+        node.slots.append(slot)
+        return slot
+
+    def _fill_raw_values(self, value, node, raw_values):
+        for name, child in six.iteritems(node.children):
+            try:
+                child_value = value[name]
+            except (KeyError, TypeError, ValueError):
+                # every path below this point is missing and stays None
+                continue
+            for slot in child.slots:
+                raw_values[slot] = child_value
+            if child.children:
+                self._fill_raw_values(child_value, child, raw_values)
+
+    def get_row_data(self, domain, document_id, doc, row_index, split_columns=False, transform_dates=False):
+        raw_values = [None] * self._num_slots
+        if isinstance(doc, dict):
+            self._fill_raw_values(doc, self._root, raw_values)
+
+        row_data = []
+        for column, get_value_from_raw, slot in self._column_getters:
+            if get_value_from_raw is not None:
+                val = get_value_from_raw(
+                    raw_values[slot],
+                    domain,
+                    document_id,
+                    doc,
+                    transform_dates=transform_dates,
+                    split_column=split_columns,
+                )
+            else:
+                val = column.get_value(
+                    domain,
+                    document_id,
+                    doc,
+                    self.base_path,
+                    row_index=row_index,
+                    split_column=split_columns,
+                    transform_dates=transform_dates,
+                )
+            if isinstance(val, list):
+                row_data.extend(val)
+            else:
+                row_data.append(val)
+        return row_data
+
+
 class TableConfiguration(DocumentSchema):
     """
     The TableConfiguration represents one excel sheet in an export.
@@ -472,11 +587,19 @@ class TableConfiguration(DocumentSchema):
             headers.extend(column.get_headers(split_column=split_columns))
         return headers
 
-    def get_rows(self, document, row_number, split_columns=False, transform_dates=False):
+    def get_row_plan(self):
+        """
+        Compile the selected columns into a TableRowPlan. When getting the rows for many
+        documents, compile the plan once and pass it to ``get_rows``.
+        """
+        return TableRowPlan(self)
+
+    def get_rows(self, document, row_number, split_columns=False, transform_dates=False, row_plan=None):
         """
         Return a list of ExportRows generated for the given document.
         :param document: dictionary representation of a form submission or case
         :param row_number: number indicating this documents index in the sequence of all documents in the export
+        :param row_plan: (optional) a TableRowPlan from ``get_row_plan``
         :return: List of ExportRows
         """
         document_id = document.get('_id')
@@ -488,25 +611,17 @@ class TableConfiguration(DocumentSchema):
         assert domain is not None, 'Form or Case must be associated with domain'
         assert document_id is not None, 'Form or Case must have an id'
 
+        row_plan = row_plan or self.get_row_plan()
         rows = []
         for doc_row in sub_documents:
-            doc, row_index = doc_row.doc, doc_row.row
-
-            row_data = []
-            for col in self.selected_columns:
-                val = col.get_value(
-                    domain,
-                    document_id,
-                    doc,
-                    self.path,
-                    row_index=row_index,
-                    split_column=split_columns,
-                    transform_dates=transform_dates,
-                )
-                if isinstance(val, list):
-                    row_data.extend(val)
-                else:
-                    row_data.append(val)
+            row_data = row_plan.get_row_data(
+                domain,
+                document_id,
+                doc_row.doc,
+                doc_row.row,
+                split_columns=split_columns,
+                transform_dates=transform_dates,
+            )
             rows.append(ExportRow(data=row_data))
         return rows
 
@@ -2224,18 +2339,12 @@ class SplitUserDefinedExportColumn(ExportColumn):
     )
     user_defined_options = ListProperty()
 
-    def get_value(self, domain, doc_id, doc, base_path, transform_dates=False, **kwargs):
-        """
-        Get the value of self.item of the given doc.
-        When base_path is [], doc is a form submission or case,
-        when base_path is non empty, doc is a repeat group from a form submission.
-        doc is a form submission or instance of a repeat group in a submission or case
-        """
-        value = super(SplitUserDefinedExportColumn, self).get_value(
+    def _get_value_from_raw(self, raw_value, domain, doc_id, doc, transform_dates=False, **kwargs):
+        value = super(SplitUserDefinedExportColumn, self)._get_value_from_raw(
+            raw_value,
             domain,
             doc_id,
             doc,
-            base_path,
             transform_dates=transform_dates
         )
         if self.split_type == PLAIN_USER_DEFINED_SPLIT_TYPE:
@@ -2280,8 +2389,8 @@ class MultiMediaExportColumn(ExportColumn):
     in order to make the link clickable.
     """
 
-    def get_value(self, domain, doc_id, doc, base_path, transform_dates=False, **kwargs):
-        value = super(MultiMediaExportColumn, self).get_value(domain, doc_id, doc, base_path, **kwargs)
+    def _get_value_from_raw(self, raw_value, domain, doc_id, doc, transform_dates=False, **kwargs):
+        value = super(MultiMediaExportColumn, self)._get_value_from_raw(raw_value, domain, doc_id, doc, **kwargs)
 
         if not value or value == MISSING_VALUE:
             return value
@@ -2308,12 +2417,12 @@ class SplitGPSExportColumn(ExportColumn):
         ]
         return [header_template.format(header) for header_template in header_templates]
 
-    def get_value(self, domain, doc_id, doc, base_path, split_column=False, **kwargs):
-        value = super(SplitGPSExportColumn, self).get_value(
+    def _get_value_from_raw(self, raw_value, domain, doc_id, doc, split_column=False, **kwargs):
+        value = super(SplitGPSExportColumn, self)._get_value_from_raw(
+            raw_value,
             domain,
             doc_id,
             doc,
-            base_path,
             **kwargs
         )
         if not split_column:
@@ -2357,14 +2466,8 @@ class SplitExportColumn(ExportColumn):
     item = SchemaProperty(MultipleChoiceItem)
     ignore_unspecified_options = BooleanProperty(default=False)
 
-    def get_value(self, domain, doc_id, doc, base_path, split_column=False, **kwargs):
-        """
-        Get the value of self.item of the given doc.
-        When base_path is [], doc is a form submission or case,
-        when base_path is non empty, doc is a repeat group from a form submission.
-        doc is a form submission or instance of a repeat group in a submission or case
-        """
-        value = super(SplitExportColumn, self).get_value(domain, doc_id, doc, base_path, **kwargs)
+    def _get_value_from_raw(self, raw_value, domain, doc_id, doc, split_column=False, **kwargs):
+        value = super(SplitExportColumn, self)._get_value_from_raw(raw_value, domain, doc_id, doc, **kwargs)
         if not split_column:
             return value
 
@@ -17,6 +17,11 @@ The export works as follows:
     * Unsuccessful results can be retried
   * Add successful pages to final ZIP archive
   * Add raw data dumps for unsuccessful pages to final ZIP archive
+
+Alternatively ``rebuild_export_sliced`` skips the dump phase: the documents are split
+into disjoint slices by doc id (see ``DocIdSliceFilter``) and each process queries ES
+for its own slice and computes the rows directly. Pages are added to the final ZIP
+archive as they complete.
 """
 from __future__ import absolute_import
 from __future__ import division
@@ -37,7 +42,8 @@ from corehq.apps.export.dbaccessors import get_properly_wrapped_export_instance
 from corehq.apps.export.export import (
     get_export_writer, save_export_payload, get_export_size, get_export_documents)
 from corehq.apps.export.export import write_export_instance
-from corehq.elastic import ScanResult
+from corehq.apps.export.filters import DocIdSliceFilter
+from corehq.elastic import ScanResult, get_es_export
 from corehq.util.files import safe_filename
 from couchexport.export import get_writer
 from couchexport.writers import ZippedExportWriter
@@ -47,6 +53,8 @@ TEMP_FILE_PREFIX = 'cchq_export_dump_'
 
 UNPROCESSED_PAGES_DIR = 'unprocessed'
 
+MAX_EXPORT_SLICES = len(DocIdSliceFilter.DOC_ID_CHARS)
+
 logger = logging.getLogger(__name__)
 
 
@@ -130,6 +138,21 @@ def rebuild_export_mutiprocess(export_id, num_processes, page_size=100000):
     run_multiprocess_exporter(exporter, filters, paginator, page_size)
 
 
+def rebuild_export_sliced(export_id, num_processes, num_slices=MAX_EXPORT_SLICES):
+    assert num_processes > 0
+
+    export_instance = get_properly_wrapped_export_instance(export_id)
+    filters = export_instance.get_filters()
+    total_docs = get_export_size(export_instance, filters)
+    exporter = SlicedMultiprocessExporter(export_instance, total_docs, num_processes, filters, num_slices)
+
+    logger.info('Starting sliced export of {} docs in {} slices'.format(total_docs, num_slices))
+    with exporter:
+        exporter.process_all_slices()
+
+    exporter.wait_till_completion()
+
+
 def run_multiprocess_exporter(exporter, filters, paginator, page_size):
     def _log_page_dumped(paginator):
         logger.info('  Dump page {} complete: {} docs'.format(paginator.page, paginator.page_size))
@@ -174,6 +197,29 @@ def run_export(export_instance, page_number, dump_path, doc_count, progress_trac
     return SuccessResult(page_number, export_file_path, doc_count)
 
 
+def run_slice_export_with_logging(export_instance, slice_id, num_slices, filters, attempts):
+    """Query ES for one slice of the export documents and process them.
+    Exceptions are logged here since logging on the other side of the process queue
+    won't show the traceback
+    """
+    logger.info('    Processing slice {} started (attempt {})'.format(slice_id, attempts))
+    progress_queue = getattr(run_slice_export_with_logging, 'queue', None)
+    try:
+        docs = get_export_documents(export_instance, list(filters) + [DocIdSliceFilter(slice_id, num_slices)])
+        if progress_queue:
+            progress_queue.put(ProgressValue(slice_id, 0, docs.count))
+        update_frequency = min(1000, int(docs.count // 10) or 1)
+        progress_tracker = LoggingProgressTracker(slice_id, progress_queue, update_frequency)
+        export_file_path = _get_export_file_path(export_instance, docs, progress_tracker)
+        if progress_queue:
+            progress_queue.put(ProgressValue(slice_id, docs.count, docs.count))
+        logger.info('    Processing slice {} complete'.format(slice_id))
+        return SuccessResult(slice_id, export_file_path, docs.count)
+    except Exception:
+        logger.exception("Error processing slice {} (attempt {})".format(slice_id, attempts))
+        raise
+
+
 def _get_export_documents_from_file(dump_path, doc_count):
     """Mimic the results of an ES scroll query but get results from jsonlines file"""
     def _doc_iter():
@@ -225,6 +271,8 @@ class LoggingProgressTracker(object):
 class MultiprocessExporter(object):
     """Helper class to manage multi-process exporting"""
 
+    export_function = staticmethod(run_export_with_logging)
+
     def __init__(self, export_instance, total_docs, num_processes, existing_archive_path=None, keep_file=False):
         self.keep_file = keep_file
         self.export_instance = export_instance
@@ -233,16 +281,15 @@ class MultiprocessExporter(object):
         self.progress_queue = multiprocessing.Queue()
         self.progress = multiprocessing.Process(target=_output_progress, args=(self.progress_queue, total_docs))
 
-        self.export_function = run_export_with_logging
-
-        def _set_queue(queue):
+        def _init_process(queue):
             """Set the progress queue as an attribute on the function
             You can't pass this as an arg"""
             self.export_function.queue = queue
+            self._init_process()
 
         self.pool = multiprocessing.Pool(
             processes=num_processes,
-            initializer=_set_queue,
+            initializer=_init_process,
             initargs=[self.progress_queue]
         )
 
@@ -260,6 +307,13 @@ class MultiprocessExporter(object):
     def start(self):
         self.progress.start()
 
+    def _init_process(self):
+        """Called in each worker process when it starts"""
+        pass
+
+    def _get_export_args(self, page_info, attempts):
+        return self.export_instance, page_info.page, page_info.path, page_info.page_size, attempts
+
     def process_page(self, page_info):
         """
         :param page_info: object with attributes:
@@ -269,49 +323,58 @@ class MultiprocessExporter(object):
         """
         attempts = page_info.retry_count + 1
         self.progress_queue.put(ProgressValue(page_info.page, 0, page_info.page_size))
-        args = self.export_instance, page_info.page, page_info.path, page_info.page_size, attempts
+        args = self._get_export_args(page_info, attempts)
         result = self.pool.apply_async(self.export_function, args=args)
         self.results.append(QueuedResult(result, page_info.page, page_info.path, page_info.page_size, attempts))
 
     def wait_till_completion(self):
-        results = self.get_results()
-        final_path = self.build_final_export(results)
+        # pages are added to the final export as they complete
+        final_path = self.build_final_export(self.iter_results())
         if self.premature_exit:
             logger.warning("\n------- PREMATURE EXIT --------\nResult written to %s\n", final_path)
         else:
             self.upload(final_path)
 
     def get_results(self, retries_per_page=3):
-        export_results = []
+        return list(self.iter_results(retries_per_page))
+
+    def iter_results(self, retries_per_page=3):
+        """Yield the results of the queued pages in the order they complete,
+        retrying failed pages up to ``retries_per_page`` times"""
         try:
             while self.results:
-                queued_result = self.results[0]
                 try:
-                    export_results.append(queued_result.async_result.get(timeout=5))
-                    self.results.pop(0)
+                    completed = [result for result in self.results if result.async_result.ready()]
+                    if not completed:
+                        self.results[0].async_result.wait(timeout=5)
+                        continue
                 except KeyboardInterrupt:
                     logger.error('Exiting before all results received.')
                     self.premature_exit = True
-                    export_results.extend(self.results)
-                    return export_results
-                except multiprocessing.TimeoutError:
-                    pass
-                except Exception:
-                    logger.exception(
-                        "Error getting results for page %s after %s tries",
-                        queued_result.page,
-                        queued_result.retry_count
-                    )
-                    self.results.pop(0)
-                    if queued_result.retry_count < retries_per_page:
-                        self.process_page(queued_result)
+                    remaining, self.results = self.results, []
+                    for queued_result in remaining:
+                        yield queued_result
+                    return
+
+                for queued_result in completed:
+                    self.results.remove(queued_result)
+                    try:
+                        export_result = queued_result.async_result.get()
+                    except Exception:
+                        logger.exception(
+                            "Error getting results for page %s after %s tries",
+                            queued_result.page,
+                            queued_result.retry_count
+                        )
+                        if queued_result.retry_count < retries_per_page:
+                            self.process_page(queued_result)
+                        else:
+                            yield queued_result
                     else:
-                        export_results.append(queued_result)
+                        yield export_result
         finally:
             self.stop()
 
-        return export_results
-
     def stop(self):
         self._safe_terminate(self.pool)
         self._safe_terminate(self.progress)
@@ -343,11 +406,10 @@ class MultiprocessExporter(object):
         base_name = safe_filename(self.export_instance.name or 'Export')
         final_zip = self._get_zipfile_for_final_archive()
         with final_zip:
-            pages = len(export_results)
             for result in export_results:
                 if not result.success:
                     logger.error('  Error in page %s so not added to final output', result.page)
-                    if os.path.exists(result.path):
+                    if result.path and os.path.exists(result.path):
                         raw_dump_path = result.path
                         logger.info('    Adding raw dump of page %s to final output', result.page)
                         destination = '{}/page_{}.json.gz'.format(UNPROCESSED_PAGES_DIR, result.page)
@@ -355,7 +417,7 @@ class MultiprocessExporter(object):
                         os.remove(raw_dump_path)
                     continue
 
-                logger.info('  Adding page {} of {} to final file'.format(result.page, pages))
+                logger.info('  Adding page {} to final file'.format(result.page))
                 if self.is_zip:
                     _add_compressed_page_to_zip(final_zip, result.page, result.path)
                 else:
@@ -371,6 +433,30 @@ class MultiprocessExporter(object):
             os.remove(final_path)
 
 
+class SlicedMultiprocessExporter(MultiprocessExporter):
+    """Exporter where each process queries ES for its own slice of the documents
+    instead of processing pages dumped by a single scroll"""
+
+    export_function = staticmethod(run_slice_export_with_logging)
+
+    def __init__(self, export_instance, total_docs, num_processes, filters,
+                 num_slices=MAX_EXPORT_SLICES, **kwargs):
+        super(SlicedMultiprocessExporter, self).__init__(export_instance, total_docs, num_processes, **kwargs)
+        self.filters = filters
+        self.num_slices = num_slices
+
+    def _init_process(self):
+        # don't share the parent's ES connections with the forked worker
+        get_es_export.reset_cache()
+
+    def _get_export_args(self, page_info, attempts):
+        return self.export_instance, page_info.page, self.num_slices, self.filters, attempts
+
+    def process_all_slices(self):
+        for slice_id in range(self.num_slices):
+            self.process_page(RetryResult(slice_id, None, 0, 0))
+
+
 def _add_compressed_page_to_zip(zip_file, page_number, zip_path_to_add):
     with zipfile.ZipFile(zip_path_to_add, 'r') as page_file:
         for path in page_file.namelist():
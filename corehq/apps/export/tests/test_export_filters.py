@@ -10,6 +10,7 @@ from corehq.apps.export.export import (
     get_export_documents,
 )
 from corehq.apps.export.filters import (
+    DocIdSliceFilter,
     GroupOwnerFilter,
     IsClosedFilter,
     OwnerFilter,
@@ -52,6 +53,24 @@ class ExportFilterTest(SimpleTestCase):
             }
         )
 
+    def test_doc_id_slice_filter(self):
+        self.assertEqual(
+            DocIdSliceFilter(3, 4).to_es_filter(),
+            {
+                'or': (
+                    {'prefix': {'_id': '3'}},
+                    {'prefix': {'_id': '7'}},
+                    {'prefix': {'_id': 'b'}},
+                    {'prefix': {'_id': 'f'}},
+                )
+            }
+        )
+
+    def test_first_doc_id_slice_includes_other_ids(self):
+        slice_filter = DocIdSliceFilter(0, 16).to_es_filter()
+        self.assertEqual(slice_filter['or'][0], {'or': ({'prefix': {'_id': '0'}},)})
+        self.assertEqual(len(slice_filter['or'][1]['not']['or']), 16)
+
 
 class ExportFilterResultTest(SimpleTestCase):
 
@@ -338,3 +338,46 @@ class TableConfigurationGetRowsTest(SimpleTestCase):
         self.assertEqual(
             [row.data for row in table_configuration.get_rows(submission, 0)], []
         )
+
+    def test_row_plan_matches_column_values(self):
+        table_configuration = TableConfiguration(
+            path=[],
+            columns=[
+                RowNumberColumn(selected=True),
+                ExportColumn(
+                    item=ScalarItem(path=[PathNode(name='form'), PathNode(name='q1')]),
+                    selected=True,
+                ),
+                ExportColumn(
+                    item=ScalarItem(path=[PathNode(name='form'), PathNode(name='group'), PathNode(name='q2')]),
+                    selected=True,
+                ),
+                ExportColumn(
+                    item=ScalarItem(path=[PathNode(name='form'), PathNode(name='text'), PathNode(name='q3')]),
+                    selected=True,
+                ),
+                ExportColumn(
+                    item=ScalarItem(path=[PathNode(name='form'), PathNode(name='missing'), PathNode(name='q4')]),
+                    selected=True,
+                ),
+            ]
+        )
+        submission = {
+            'domain': 'my-domain',
+            '_id': '1234',
+            'form': {
+                'q1': 'foo',
+                'group': {'q2': 'bar'},
+                'text': 'not a dict',
+            }
+        }
+        row_plan = table_configuration.get_row_plan()
+        expected = [
+            column.get_value('my-domain', '1234', submission, [], row_index=(0,))
+            for column in table_configuration.selected_columns
+        ]
+        self.assertEqual(expected, [['0'], 'foo', 'bar', None, None])
+        self.assertEqual(
+            [row.data for row in table_configuration.get_rows(submission, 0, row_plan=row_plan)],
+            [['0', 'foo', 'bar', None, None]]
+        )
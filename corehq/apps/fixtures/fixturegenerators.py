@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from collections import defaultdict
+import json
+from collections import defaultdict, namedtuple
 from xml.etree import cElementTree as ElementTree
 from io import BytesIO
 
@@ -12,7 +13,7 @@ from corehq.apps.programs.fixtures import program_fixture_generator_json
 from corehq.blobs import get_blob_db
 from corehq.blobs.exceptions import NotFound
 
-from .utils import get_index_schema_node
+from .utils import get_index_schema_node, get_user_fixture_bucket, get_user_fixture_cache_key
 
 # GLOBAL_USER_ID is expected to be a globally unique string that will never
 # change and can always be search-n-replaced in global fixture XML. The UUID
@@ -22,6 +23,15 @@ from .utils import get_index_schema_node
 # This is an optimization to avoid an extra XML parse/serialize cycle.
 GLOBAL_USER_ID = 'global-user-id-7566F038-5000-4419-B3EF-5349FB2FF2E9'
 
+USER_FIXTURE_CACHE_TIMEOUT = 24 * 60  # minutes
+
+
+class CachedItem(namedtuple('CachedItem', 'item_id data_type_id sort_key xml')):
+    """An item list item as cached for the user, group or location that owns it"""
+
+    def to_xml(self):
+        return ElementTree.fromstring(self.xml.encode('utf-8'))
+
 
 def item_lists_by_domain(domain):
     ret = list()
@@ -70,7 +80,7 @@ class ItemListsProvider(FixtureProvider):
         if global_types:
             items.extend(self.get_global_items(global_types, restore_state))
         if user_types:
-            items.extend(self.get_user_items(user_types, restore_user))
+            items.extend(self.get_user_items(user_types, restore_state))
         return items
 
     def get_global_items(self, global_types, restore_state):
@@ -107,17 +117,72 @@ class ItemListsProvider(FixtureProvider):
             items_by_type[data_type].append(item)
         return self._get_fixtures(global_types, items_by_type, GLOBAL_USER_ID)
 
-    def get_user_items(self, user_types, restore_user):
+    def get_user_items(self, user_types, restore_state):
+        """Get the items of the user, its groups and its locations
+
+        The items owned by each user, group and location are cached
+        separately, so that items shared by many users, usually through
+        groups or locations, are only fetched and rendered once.
+        """
+        restore_user = restore_state.restore_user
+        items = {}
+        owners = list(restore_user.get_fixture_data_item_owners())
+        for owner_items in self._get_items_by_owner(user_types, restore_state, owners):
+            for item in owner_items:
+                items[item.item_id] = item
+
         items_by_type = defaultdict(list)
-        for item in restore_user.get_fixture_data_items():
+        for item in items.values():
             try:
                 data_type = user_types[item.data_type_id]
             except KeyError:
                 continue
-            self._set_cached_type(item, data_type)
             items_by_type[data_type].append(item)
         return self._get_fixtures(user_types, items_by_type, restore_user.user_id)
 
+    def _get_items_by_owner(self, user_types, restore_state, owners):
+        """Get the cached items of all the owners in one bulk request and
+        build and cache the items of owners that aren't cached
+
+        :returns: list of lists of ``CachedItem``s in the same order as ``owners``
+        """
+        domain = restore_state.restore_user.domain
+        db = get_blob_db()
+        bucket = get_user_fixture_bucket(domain)
+        keys = [(get_user_fixture_cache_key(owner_type, owner_id), bucket) for owner_type, owner_id in owners]
+        cached = {} if restore_state.overwrite_cache else db.bulk_get(keys)
+
+        items_by_owner = []
+        to_cache = []
+        for (owner_type, owner_id), key in zip(owners, keys):
+            if key in cached:
+                blob = cached[key]
+                try:
+                    data = blob.read()
+                finally:
+                    blob.close()
+                items = [CachedItem(*item) for item in json.loads(data.decode('utf-8'))]
+            else:
+                items = self._get_owner_items(user_types, domain, owner_type, owner_id)
+                identifier, bucket = key
+                to_cache.append((BytesIO(json.dumps(items).encode('utf-8')), identifier, bucket))
+            items_by_owner.append(items)
+
+        if to_cache:
+            db.bulk_put(to_cache, timeout=USER_FIXTURE_CACHE_TIMEOUT)
+        return items_by_owner
+
+    def _get_owner_items(self, user_types, domain, owner_type, owner_id):
+        items = []
+        for item in FixtureDataItem.by_owner(domain, owner_type, owner_id):
+            data_type = user_types.get(item.data_type_id)
+            if data_type is None:
+                continue
+            self._set_cached_type(item, data_type)
+            xml = ElementTree.tostring(item.to_xml(), encoding='utf-8').decode('utf-8')
+            items.append(CachedItem(item.get_id, item.data_type_id, item.sort_key, xml))
+        return items
+
     def _set_cached_type(self, item, data_type):
         # set the cached version used by the object so that it doesn't
         # have to do another db trip later
@@ -12,7 +12,7 @@ from corehq.apps.fixtures.dbaccessors import (
 )
 from corehq.apps.fixtures.exceptions import FixtureException, FixtureTypeCheckError
 from corehq.apps.fixtures.utils import clean_fixture_field_name, \
-    get_fields_without_attributes
+    clear_owner_fixture_cache, get_fields_without_attributes
 from corehq.apps.users.models import CommCareUser
 from corehq.apps.fixtures.exceptions import FixtureVersionError
 from dimagi.ext.couchdbkit import Document, DocumentSchema, DictProperty, StringProperty, StringListProperty, SchemaListProperty, IntegerProperty, BooleanProperty
@@ -24,6 +24,7 @@ from corehq.apps.locations.models import SQLLocation
 import six
 
 FIXTURE_BUCKET = 'domain-fixtures'
+USER_FIXTURE_BUCKET = 'domain-user-fixtures'
 
 
 class FixtureTypeField(DocumentSchema):
@@ -231,6 +232,9 @@ class FixtureDataItem(Document):
         with transaction or CouchTransaction() as transaction:
             o = FixtureOwnership(domain=self.domain, owner_type=owner_type, owner_id=owner.get_id, data_item_id=self.get_id)
             transaction.save(o)
+            transaction.add_post_commit_action(
+                lambda: clear_owner_fixture_cache(self.domain, owner_type, owner.get_id)
+            )
         return o
 
     def remove_owner(self, owner, owner_type):
@@ -254,6 +258,7 @@ class FixtureDataItem(Document):
                     data_type_id=self.data_type_id,
                     domain=self.domain
                 ))
+        clear_owner_fixture_cache(self.domain, owner_type, owner.get_id)
 
     def add_user(self, user, transaction=None):
         return self.add_owner(user, 'user', transaction=transaction)
@@ -355,20 +360,34 @@ class FixtureDataItem(Document):
         loc_ids = get_owner_ids_by_type(self.domain, 'location', self.get_id)
         return SQLLocation.objects.filter(location_id__in=loc_ids)
 
-    @classmethod
-    def by_user(cls, user, wrap=True):
+    @staticmethod
+    def get_owners_for_user(user):
+        """
+        :returns: list of (owner_type, owner_id) tuples for the user, its
+        groups and its location and the location's ancestors
+        """
         group_ids = Group.by_user(user, wrap=False)
         loc_ids = user.sql_location.path if user.sql_location else []
+        return (
+            [('user', user.user_id)] +
+            [('group', group_id) for group_id in group_ids] +
+            [('location', loc_id) for loc_id in loc_ids]
+        )
 
-        def make_keys(owner_type, ids):
-            return [[user.domain, 'data_item by {}'.format(owner_type), id_]
-                    for id_ in ids]
+    @classmethod
+    def by_user(cls, user, wrap=True):
+        return cls._by_owners(user.domain, cls.get_owners_for_user(user), wrap=wrap)
 
+    @classmethod
+    def by_owner(cls, domain, owner_type, owner_id):
+        return cls._by_owners(domain, [(owner_type, owner_id)])
+
+    @classmethod
+    def _by_owners(cls, domain, owners, wrap=True):
         fixture_ids = set(
             FixtureOwnership.get_db().view('fixtures/ownership',
-                keys=(make_keys('user', [user.user_id]) +
-                      make_keys('group', group_ids) +
-                      make_keys('location', loc_ids)),
+                keys=[[domain, 'data_item by {}'.format(owner_type), owner_id]
+                      for owner_type, owner_id in owners],
                 reduce=False,
                 wrapper=lambda r: r['value'],
             )
@@ -394,7 +413,7 @@ class FixtureDataItem(Document):
             # fetch and delete ownership documents pointing
             # to deleted or non-existent fixture documents
             # this cleanup is necessary since we used to not do this
-            bad_ownerships = FixtureOwnership.for_all_item_ids(deleted_fixture_ids, user.domain)
+            bad_ownerships = FixtureOwnership.for_all_item_ids(deleted_fixture_ids, domain)
             FixtureOwnership.get_db().bulk_delete(bad_ownerships)
 
             return docs
@@ -4,6 +4,7 @@ from xml.etree import cElementTree as ElementTree
 
 import six
 from django.test import TestCase
+from mock import patch
 
 from casexml.apps.case.tests.util import check_xml_line_by_line
 from casexml.apps.phone.tests.utils import call_fixture_generator
@@ -13,6 +14,9 @@ from corehq.apps.fixtures.dbaccessors import delete_all_fixture_data_types, \
 from corehq.apps.fixtures.exceptions import FixtureVersionError
 from corehq.apps.fixtures.models import FixtureDataType, FixtureTypeField, \
     FixtureDataItem, FieldList, FixtureItemField, FixtureOwnership, FIXTURE_BUCKET
+from corehq.apps.fixtures.utils import clear_fixture_cache, get_user_fixture_bucket, \
+    get_user_fixture_cache_key
+from corehq.apps.groups.models import Group
 from corehq.apps.users.dbaccessors.all_commcare_users import delete_all_users
 from corehq.apps.users.models import CommCareUser
 from corehq.blobs import get_blob_db
@@ -105,7 +109,7 @@ class FixtureDataTest(TestCase):
         delete_all_users()
         delete_all_fixture_data_types()
         get_fixture_data_types_in_domain.clear(self.domain)
-        get_blob_db().delete(self.domain, FIXTURE_BUCKET)
+        clear_fixture_cache(self.domain)
         super(FixtureDataTest, self).tearDown()
 
     def test_xml(self):
@@ -165,6 +169,52 @@ class FixtureDataTest(TestCase):
 
         self.fixture_ownership = self.data_item.add_user(self.user)
 
+    def test_user_items_cached_by_owner(self):
+        bucket = get_user_fixture_bucket(self.domain)
+        user_key = get_user_fixture_cache_key('user', self.user.get_id)
+
+        fixture, = call_fixture_generator(fixturegenerators.item_lists, self.user.to_ota_restore_user())
+        self.assertEqual(1, len(fixture.find('district_list')))
+        self.assertTrue(get_blob_db().exists(user_key, bucket))
+
+        self.data_item.remove_user(self.user)
+        self.assertFalse(get_blob_db().exists(user_key, bucket))
+        fixture, = call_fixture_generator(fixturegenerators.item_lists, self.user.to_ota_restore_user())
+        self.assertEqual(0, len(fixture.find('district_list')))
+
+        self.fixture_ownership = self.data_item.add_user(self.user)
+        self.assertFalse(get_blob_db().exists(user_key, bucket))
+        fixture, = call_fixture_generator(fixturegenerators.item_lists, self.user.to_ota_restore_user())
+        self.assertEqual(1, len(fixture.find('district_list')))
+
+    def test_cached_owner_items_fetched_in_bulk(self):
+        call_fixture_generator(fixturegenerators.item_lists, self.user.to_ota_restore_user())
+        db = get_blob_db()
+        with patch.object(db, 'bulk_get', wraps=db.bulk_get) as bulk_get, \
+                patch.object(FixtureDataItem, 'by_owner') as by_owner:
+            fixture, = call_fixture_generator(fixturegenerators.item_lists, self.user.to_ota_restore_user())
+        self.assertEqual(1, len(fixture.find('district_list')))
+        self.assertEqual(1, bulk_get.call_count)
+        self.assertFalse(by_owner.called)
+
+    def test_group_items_shared_by_users(self):
+        sammy = CommCareUser.create(self.domain, 'sammy', '***')
+        group = Group(domain=self.domain, name='fixture-group', users=[self.user.get_id, sammy.get_id])
+        group.save()
+        self.addCleanup(group.delete)
+        self.data_item.add_group(group)
+        self.addCleanup(self.data_item.remove_group, group)
+
+        for user in [self.user, sammy]:
+            fixture, = call_fixture_generator(fixturegenerators.item_lists, user.to_ota_restore_user())
+            self.assertEqual(fixture.attrib['user_id'], user.get_id)
+            # owned by both the user and the group but only included once
+            self.assertEqual(1, len(fixture.find('district_list')))
+        self.assertTrue(get_blob_db().exists(
+            get_user_fixture_cache_key('group', group.get_id),
+            get_user_fixture_bucket(self.domain),
+        ))
+
     def test_get_indexed_items(self):
         with self.assertRaises(FixtureVersionError):
             fixtures = FixtureDataItem.get_indexed_items(
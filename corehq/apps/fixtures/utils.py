@@ -62,3 +62,19 @@ def get_index_schema_node(fixture_id, attrs_to_index):
 def clear_fixture_cache(domain):
     from corehq.apps.fixtures.models import FIXTURE_BUCKET
     get_blob_db().delete(domain, FIXTURE_BUCKET)
+    get_blob_db().delete(bucket=get_user_fixture_bucket(domain))
+
+
+def clear_owner_fixture_cache(domain, owner_type, owner_id):
+    """Clear the cached items of one user, group or location"""
+    get_blob_db().delete(get_user_fixture_cache_key(owner_type, owner_id),
+                         get_user_fixture_bucket(domain))
+
+
+def get_user_fixture_bucket(domain):
+    from corehq.apps.fixtures.models import USER_FIXTURE_BUCKET
+    return '{}/{}'.format(USER_FIXTURE_BUCKET, domain)
+
+
+def get_user_fixture_cache_key(owner_type, owner_id):
+    return '{}-{}'.format(owner_type, owner_id)
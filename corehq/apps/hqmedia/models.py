@@ -188,6 +188,12 @@ class CommCareMultimedia(BlobMixin, SafeSaveDocument):
                 return data
         return None
 
+    def get_display_file_stream(self):
+        """:returns: a file-like object of the display file or ``None``"""
+        if self.attachment_id:
+            return self.fetch_attachment(self.attachment_id, stream=True)
+        return None
+
     def get_file_extension(self):
         extension = ''
         if self.aux_media:
@@ -1,16 +1,28 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from collections import defaultdict, namedtuple
+from contextlib import closing
 from io import open
+import hashlib
+import json
 import os
+import shutil
 import tempfile
+import time
 from wsgiref.util import FileWrapper
 from celery.task import task
+from concurrent import futures
+from couchdbkit.exceptions import ResourceConflict
 from celery.utils.log import get_task_logger
 from django.conf import settings
+from django.db import connections
 import zipfile
+import six
 from corehq.apps.app_manager.dbaccessors import get_app
 from corehq.apps.hqmedia.cache import BulkMultimediaStatusCache
 from corehq.apps.hqmedia.models import CommCareMultimedia
+from corehq.blobs import get_blob_db
+from corehq.blobs.exceptions import NotFound
 from corehq.util.files import file_extention_from_filename
 from soil import DownloadBase
 from django.utils.translation import ugettext as _
@@ -20,6 +32,19 @@ logging = get_task_logger(__name__)
 
 MULTIMEDIA_EXTENSIONS = ('.mp3', '.wav', '.jpg', '.png', '.gif', '.3gp', '.mp4', '.zip', )
 
+# multimedia files are opened concurrently while the zip is written
+MEDIA_FETCH_WORKERS = 4
+MEDIA_FETCH_AHEAD = 8
+
+# bulk uploads are saved a chunk of files at a time, with chunks limited by
+# the total size of their files since every file in a chunk is held in memory
+BULK_UPLOAD_CHUNK_BYTES = 50 * 1024 * 1024
+BULK_UPLOAD_WORKERS = 4
+MEDIA_MAPPING_SAVE_ATTEMPTS = 3
+
+CCZ_CACHE_BUCKET = 'ccz-cache'
+CCZ_CACHE_TIMEOUT = 7 * 24 * 60  # minutes
+
 
 @task
 def process_bulk_upload_zip(processing_id, domain, app_id, username=None, share_media=False,
@@ -45,61 +70,76 @@ def process_bulk_upload_zip(processing_id, domain, app_id, username=None, share_
     zipped_files = uploaded_zip.namelist()
     status.total_files = len(zipped_files)
     checked_paths = []
+    # the app's paths for each media class, by lower cased path
+    app_paths_by_class = {}
+    # form paths mapped by this upload, to be saved to the app at the end
+    mappings = []
+    uploaded_form_paths = set()
+
+    def get_app_path(media_class, path):
+        if media_class not in app_paths_by_class:
+            app_paths_by_class[media_class] = {
+                app_path.lower(): app_path
+                for app_path in app.get_all_paths_of_type(media_class.__name__)
+            }
+        return app_paths_by_class[media_class].get(media_class.get_form_path(path, lowercase=True))
+
+    def save_media(upload, multimedia):
+        return _save_uploaded_media(upload, multimedia, domain, username, share_media,
+                                    license_name, author, attribution_notes)
 
     try:
-        for index, path in enumerate(zipped_files):
-            status.update_progress(len(checked_paths))
-            checked_paths.append(path)
-            file_name = os.path.basename(path)
-            try:
-                data = uploaded_zip.read(path)
-            except Exception as e:
-                status.add_unmatched_path(path, _("Error reading file: %s" % e))
-                continue
-
-            media_class = CommCareMultimedia.get_class_by_data(data, filename=path)
-            if not media_class:
-                status.add_skipped_path(path, CommCareMultimedia.get_mime_type(data))
-                continue
-
-            app_paths = list(app.get_all_paths_of_type(media_class.__name__))
-            app_paths_lower = [p.lower() for p in app_paths]
-            form_path = media_class.get_form_path(path, lowercase=True)
-
-            if not form_path in app_paths_lower:
-                status.add_unmatched_path(path,
-                                          _("Did not match any %s paths in application." % media_class.get_nice_name()))
-                continue
-
-            index_of_path = app_paths_lower.index(form_path)
-            form_path = app_paths[index_of_path]  # this is the correct capitalization as specified in the form
-
-            multimedia = media_class.get_by_data(data)
-            if not multimedia:
-                status.add_unmatched_path(path,
-                                          _("Matching path found, but could not save the data to couch."))
-                continue
-
-            is_new = form_path not in list(app.multimedia_map)
-            is_updated = multimedia.attach_data(data,
-                                                original_filename=file_name,
-                                                username=username)
-
-            if not is_updated and not getattr(multimedia, '_id'):
-                status.add_unmatched_path(form_path,
-                                          _("Matching path found, but didn't save new multimedia correctly."))
-                continue
-
-            if is_updated or is_new:
-                multimedia.add_domain(domain, owner=True)
-                if share_media:
-                    multimedia.update_or_add_license(domain, type=license_name, author=author,
-                                                     attribution_notes=attribution_notes)
-                app.create_mapping(multimedia, form_path)
-
-            media_info = multimedia.get_media_info(form_path, is_updated=is_updated, original_path=path)
-            status.add_matched_path(media_class, media_info)
+        try:
+            for paths in _chunk_zipped_files(uploaded_zip, zipped_files, BULK_UPLOAD_CHUNK_BYTES):
+                status.update_progress(len(checked_paths))
+                uploads = []
+                for path in paths:
+                    checked_paths.append(path)
+                    try:
+                        data = uploaded_zip.read(path)
+                    except Exception as e:
+                        status.add_unmatched_path(path, _("Error reading file: %s" % e))
+                        continue
 
+                    media_class = CommCareMultimedia.get_class_by_data(data, filename=path)
+                    if not media_class:
+                        status.add_skipped_path(path, CommCareMultimedia.get_mime_type(data))
+                        continue
+
+                    form_path = get_app_path(media_class, path)
+                    if form_path is None:
+                        status.add_unmatched_path(
+                            path,
+                            _("Did not match any %s paths in application." % media_class.get_nice_name())
+                        )
+                        continue
+
+                    is_new = form_path not in app.multimedia_map and form_path not in uploaded_form_paths
+                    uploaded_form_paths.add(form_path)
+                    uploads.append(_MediaUpload(path, form_path, media_class, data, is_new))
+
+                for upload, multimedia, is_updated in _iter_saved_media(uploads, save_media):
+                    if not is_updated and not getattr(multimedia, '_id'):
+                        status.add_unmatched_path(
+                            upload.form_path,
+                            _("Matching path found, but didn't save new multimedia correctly.")
+                        )
+                        continue
+                    if is_updated or upload.is_new:
+                        app.create_mapping(multimedia, upload.form_path, save=False)
+                        mappings.append((upload.form_path, multimedia))
+
+                    media_info = multimedia.get_media_info(upload.form_path, is_updated=is_updated,
+                                                           original_path=upload.path)
+                    status.add_matched_path(upload.media_class, media_info)
+        except Exception:
+            # keep the mappings of the files that were saved even if a later file failed
+            try:
+                _save_media_mappings(app, mappings)
+            except Exception:
+                logging.exception('Failed to save multimedia mappings for app: {}'.format(app_id))
+            raise
+        _save_media_mappings(app, mappings)
         status.update_progress(len(checked_paths))
     except Exception as e:
         status.mark_with_error(_("Error while processing zip: %s" % e))
@@ -109,6 +149,115 @@ def process_bulk_upload_zip(processing_id, domain, app_id, username=None, share_
     status.save()
 
 
+_MediaUpload = namedtuple('_MediaUpload', 'path form_path media_class data is_new')
+
+
+def _chunk_zipped_files(zip_file, paths, max_bytes):
+    """Group the paths of files in the zip into lists whose files add up to
+    at most ``max_bytes`` uncompressed. A file larger than that gets a list
+    of its own.
+    """
+    chunk = []
+    chunk_bytes = 0
+    for path in paths:
+        size = zip_file.getinfo(path).file_size
+        if chunk and chunk_bytes + size > max_bytes:
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(path)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _iter_saved_media(uploads, save_media):
+    """Save the uploaded files concurrently
+
+    Files are hashed and the multimedia that already exists for them is
+    fetched in bulk. Uploads of the same file are saved together so that
+    its multimedia is only saved by one thread.
+
+    :returns: generator of ``(upload, multimedia, is_updated)`` in the
+    order of the uploads
+    """
+    if not uploads:
+        return
+    with futures.ThreadPoolExecutor(max_workers=BULK_UPLOAD_WORKERS) as executor:
+        file_hashes = list(executor.map(
+            lambda upload: CommCareMultimedia.generate_hash(upload.data), uploads))
+
+        docs_by_hash = {}
+        for row in CommCareMultimedia.get_db().view('hqmedia/by_hash',
+                                                    keys=list(set(file_hashes)),
+                                                    include_docs=True):
+            if row.get('doc'):
+                docs_by_hash.setdefault(row['key'], row['doc'])
+        uploads_by_hash = defaultdict(list)
+        for index, (upload, file_hash) in enumerate(zip(uploads, file_hashes)):
+            uploads_by_hash[file_hash].append((index, upload))
+
+        def save_file(file_hash):
+            try:
+                doc = docs_by_hash.get(file_hash)
+                results = []
+                multimedia = None
+                for index, upload in uploads_by_hash[file_hash]:
+                    if multimedia is None:
+                        if doc is not None:
+                            multimedia = upload.media_class.wrap(doc)
+                        else:
+                            multimedia = upload.media_class()
+                            multimedia.file_hash = file_hash
+                    results.append((index, upload, multimedia, save_media(upload, multimedia)))
+                return results
+            finally:
+                connections.close_all()
+
+        saved = [None] * len(uploads)
+        for results in executor.map(save_file, list(uploads_by_hash)):
+            for index, upload, multimedia, is_updated in results:
+                saved[index] = (upload, multimedia, is_updated)
+    for result in saved:
+        yield result
+
+
+def _save_uploaded_media(upload, multimedia, domain, username, share_media,
+                         license_name, author, attribution_notes):
+    """:returns: whether the multimedia's data was updated"""
+    is_updated = multimedia.attach_data(upload.data,
+                                        original_filename=os.path.basename(upload.path),
+                                        username=username)
+    if not is_updated and not getattr(multimedia, '_id'):
+        return is_updated
+    if is_updated or upload.is_new:
+        multimedia.add_domain(domain, owner=True)
+        if share_media:
+            multimedia.update_or_add_license(domain, type=license_name, author=author,
+                                             attribution_notes=attribution_notes)
+    return is_updated
+
+
+def _save_media_mappings(app, mappings):
+    """Save the app with the new mappings, applying them to the latest
+    version of the app if it was changed while the upload was processed
+    """
+    if not mappings:
+        return
+    attempts = MEDIA_MAPPING_SAVE_ATTEMPTS
+    while True:
+        try:
+            app.save()
+            return
+        except ResourceConflict:
+            attempts -= 1
+            if not attempts:
+                raise
+        app = get_app(app.domain, app.get_id)
+        for form_path, multimedia in mappings:
+            app.create_mapping(multimedia, form_path, save=False)
+
+
 @task
 def build_application_zip(include_multimedia_files, include_index_files, app,
                           download_id, build_profile_id=None, compress_zip=False, filename="commcare.zip",
@@ -135,17 +284,29 @@ def build_application_zip(include_multimedia_files, include_index_files, app,
         _, fpath = tempfile.mkstemp()
 
     if not (os.path.isfile(fpath) and use_transfer):  # Don't rebuild the file if it is already there
-        files, errors = iter_app_files(
-            app, include_multimedia_files, include_index_files, build_profile_id,
-            download_targeted_version=download_targeted_version,
-        )
-        with open(fpath, 'wb') as tmp:
-            with zipfile.ZipFile(tmp, "w") as z:
-                for path, data in files:
-                    # don't compress multimedia files
-                    extension = os.path.splitext(path)[1]
-                    file_compression = zipfile.ZIP_STORED if extension in MULTIMEDIA_EXTENSIONS else compression
-                    z.writestr(path, data, file_compression)
+        cache_key = None
+        if app.copy_of:
+            # builds don't change so their zips can be reused
+            cache_key = _get_zip_cache_key(app, include_multimedia_files, include_index_files,
+                                           build_profile_id, compress_zip, download_targeted_version)
+        if not (cache_key and _fetch_cached_zip(cache_key, fpath)):
+            files, errors = iter_app_files(
+                app, include_multimedia_files, include_index_files, build_profile_id,
+                download_targeted_version=download_targeted_version,
+            )
+            with open(fpath, 'wb') as tmp:
+                with zipfile.ZipFile(tmp, "w") as z:
+                    for path, data in files:
+                        # don't compress multimedia files
+                        extension = os.path.splitext(path)[1]
+                        if extension in MULTIMEDIA_EXTENSIONS:
+                            file_compression = zipfile.ZIP_STORED
+                        else:
+                            file_compression = compression
+                        _write_zip_entry(z, path, data, file_compression)
+            if cache_key and not errors:
+                with open(fpath, 'rb') as f:
+                    get_blob_db().put(f, cache_key, bucket=CCZ_CACHE_BUCKET, timeout=CCZ_CACHE_TIMEOUT)
 
     common_kwargs = dict(
         mimetype='application/zip' if compress_zip else 'application/x-zip-compressed',
@@ -169,3 +330,56 @@ def build_application_zip(include_multimedia_files, include_index_files, app,
     return {
         "errors": errors,
     }
+
+
+def _write_zip_entry(zip_file, path, data, compression):
+    """Write bytes or a file-like object to the zip
+
+    File-like objects are copied into the zip entry in chunks, rather
+    than read into memory, where ``ZipFile.open`` supports writing.
+    """
+    if not hasattr(data, 'read'):
+        zip_file.writestr(path, data, compression)
+        return
+    with closing(data):
+        if six.PY2:
+            zip_file.writestr(path, data.read(), compression)
+            return
+        info = zipfile.ZipInfo(path, date_time=time.localtime(time.time())[:6])
+        info.compress_type = compression
+        info.external_attr = 0o600 << 16
+        with zip_file.open(info, 'w') as entry:
+            shutil.copyfileobj(data, entry)
+
+
+def _get_zip_cache_key(app, include_multimedia_files, include_index_files, build_profile_id,
+                       compress_zip, download_targeted_version):
+    media_map = sorted(
+        (path, map_item.multimedia_id, map_item.version)
+        for path, map_item in app.multimedia_map.items()
+    ) if include_multimedia_files else None
+    key = json.dumps([
+        app.get_id,
+        app.version,
+        build_profile_id,
+        include_multimedia_files,
+        include_index_files,
+        compress_zip,
+        download_targeted_version,
+        media_map,
+    ])
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def _fetch_cached_zip(cache_key, fpath):
+    """Copy the cached zip to ``fpath``
+
+    :returns: whether the zip was cached
+    """
+    try:
+        cached_zip = get_blob_db().get(cache_key, CCZ_CACHE_BUCKET)
+    except NotFound:
+        return False
+    with closing(cached_zip), open(fpath, 'wb') as f:
+        shutil.copyfileobj(cached_zip, f)
+    return True
@@ -0,0 +1,115 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import hashlib
+import zipfile
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from mock import patch
+from six.moves import range
+
+from corehq.apps.hqmedia.models import CommCareMultimedia
+from corehq.apps.hqmedia.tasks import _chunk_zipped_files, _iter_saved_media, _MediaUpload
+
+
+class ChunkZippedFilesTest(SimpleTestCase):
+
+    def _get_zip(self, sizes):
+        buffer = BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zip_file:
+            for path, size in sizes:
+                zip_file.writestr(path, b'x' * size)
+        return zipfile.ZipFile(buffer)
+
+    def _chunk(self, sizes, max_bytes):
+        zip_file = self._get_zip(sizes)
+        return list(_chunk_zipped_files(zip_file, zip_file.namelist(), max_bytes))
+
+    def test_files_are_grouped_up_to_max_bytes(self):
+        chunks = self._chunk([('a.png', 4), ('b.png', 6), ('c.png', 5), ('d.png', 5)], 10)
+        self.assertEqual(chunks, [['a.png', 'b.png'], ['c.png', 'd.png']])
+
+    def test_large_file_gets_its_own_chunk(self):
+        chunks = self._chunk([('a.png', 2), ('big.mp4', 25), ('b.png', 2)], 10)
+        self.assertEqual(chunks, [['a.png'], ['big.mp4'], ['b.png']])
+
+    def test_no_files(self):
+        self.assertEqual(self._chunk([], 10), [])
+
+
+class FakeMedia(object):
+
+    def __init__(self, doc=None):
+        self.doc = doc
+        self.file_hash = None
+
+    @classmethod
+    def wrap(cls, doc):
+        return cls(doc)
+
+
+class FakeView(object):
+
+    def __init__(self, docs_by_hash):
+        self.docs_by_hash = docs_by_hash
+
+    def view(self, view_name, keys, include_docs):
+        return [
+            {'key': key, 'doc': self.docs_by_hash[key]}
+            for key in keys if key in self.docs_by_hash
+        ]
+
+
+class IterSavedMediaTest(SimpleTestCase):
+
+    def _iter_saved_media(self, uploads, existing_docs_by_hash=None):
+        saved = []
+
+        def save_media(upload, multimedia):
+            saved.append((upload.path, multimedia))
+            return upload.is_new
+
+        db = FakeView(existing_docs_by_hash or {})
+        with patch.object(CommCareMultimedia, 'get_db', return_value=db):
+            results = list(_iter_saved_media(uploads, save_media))
+        return results, saved
+
+    def test_results_are_in_upload_order(self):
+        uploads = [
+            _MediaUpload(
+                '{}.png'.format(i), 'jr://file/{}.png'.format(i), FakeMedia, ('data%d' % i).encode('utf-8'), True
+            )
+            for i in range(10)
+        ]
+        results, saved = self._iter_saved_media(uploads)
+        self.assertEqual([upload for upload, multimedia, is_updated in results], uploads)
+        self.assertEqual(len(saved), 10)
+        for upload, multimedia, is_updated in results:
+            self.assertEqual(multimedia.file_hash, hashlib.md5(upload.data).hexdigest())
+            self.assertTrue(is_updated)
+
+    def test_uploads_of_the_same_file_share_multimedia(self):
+        uploads = [
+            _MediaUpload('a.png', 'jr://file/a.png', FakeMedia, b'same', True),
+            _MediaUpload('b.png', 'jr://file/b.png', FakeMedia, b'other', True),
+            _MediaUpload('c.png', 'jr://file/c.png', FakeMedia, b'same', False),
+        ]
+        results, saved = self._iter_saved_media(uploads)
+        self.assertIs(results[0][1], results[2][1])
+        self.assertIsNot(results[0][1], results[1][1])
+        self.assertEqual([path for path, multimedia in saved if multimedia is results[0][1]], ['a.png', 'c.png'])
+        self.assertEqual([is_updated for upload, multimedia, is_updated in results], [True, True, False])
+
+    def test_existing_multimedia_is_wrapped(self):
+        file_hash = hashlib.md5(b'existing').hexdigest()
+        doc = {'_id': 'abc', 'file_hash': file_hash}
+        uploads = [_MediaUpload('a.png', 'jr://file/a.png', FakeMedia, b'existing', False)]
+        results, saved = self._iter_saved_media(uploads, {file_hash: doc})
+        upload, multimedia, is_updated = results[0]
+        self.assertEqual(multimedia.doc, doc)
+        self.assertIsNone(multimedia.file_hash)
+
+    def test_no_uploads(self):
+        results, saved = self._iter_saved_media([])
+        self.assertEqual(results, [])
+        self.assertEqual(saved, [])
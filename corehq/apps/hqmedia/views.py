@@ -8,6 +8,8 @@ import os
 from django.contrib.auth.decorators import login_required
 import json
 import itertools
+from collections import deque
+from concurrent import futures
 from django.conf import settings
 from django.urls import reverse
 from django.utils.decorators import method_decorator
@@ -41,7 +43,12 @@ from corehq.apps.hqmedia.controller import (
     MultimediaVideoUploadController
 )
 from corehq.apps.hqmedia.models import CommCareImage, CommCareAudio, CommCareMultimedia, MULTIMEDIA_PREFIX, CommCareVideo
-from corehq.apps.hqmedia.tasks import process_bulk_upload_zip, build_application_zip
+from corehq.apps.hqmedia.tasks import (
+    MEDIA_FETCH_AHEAD,
+    MEDIA_FETCH_WORKERS,
+    build_application_zip,
+    process_bulk_upload_zip,
+)
 from corehq.apps.users.decorators import require_permission
 from corehq.apps.users.models import Permissions
 from memoized import memoized
@@ -475,28 +482,52 @@ class CheckOnProcessingFile(BaseMultimediaView):
 def iter_media_files(media_objects):
     """
     take as input the output of get_media_objects
-    and return an iterator of (path, data) tuples for the media files
+    and return an iterator of (path, file) tuples for the media files
     as they should show up in the .zip
     as well as a list of error messages
 
+    the files are file-like objects that are opened concurrently,
+    MEDIA_FETCH_AHEAD at a time, and read by the caller in order.
+    the caller is responsible for closing them.
+
     as a side effect of implementation,
     errors will not include all error messages until the iterator is exhausted
 
     """
     errors = []
 
+    def _open_media_file(path, media):
+        try:
+            media_file = media.get_display_file_stream()
+        except NameError as e:
+            errors.append("%(path)s produced an ERROR: %(error)s" % {
+                'path': path,
+                'error': e,
+            })
+            return None
+        if media_file is None:
+            return None
+        return path.replace(MULTIMEDIA_PREFIX, ""), media_file
+
     def _media_files():
-        for path, media in media_objects:
+        media_objects_iter = iter(media_objects)
+        with futures.ThreadPoolExecutor(max_workers=MEDIA_FETCH_WORKERS) as executor:
+            pending = deque(
+                executor.submit(_open_media_file, path, media)
+                for path, media in itertools.islice(media_objects_iter, MEDIA_FETCH_AHEAD)
+            )
             try:
-                data, _ = media.get_display_file()
-                folder = path.replace(MULTIMEDIA_PREFIX, "")
-                if not isinstance(data, six.text_type):
-                    yield os.path.join(folder), data
-            except NameError as e:
-                errors.append("%(path)s produced an ERROR: %(error)s" % {
-                    'path': path,
-                    'error': e,
-                })
+                while pending:
+                    media_file = pending.popleft().result()
+                    for path, media in itertools.islice(media_objects_iter, 1):
+                        pending.append(executor.submit(_open_media_file, path, media))
+                    if media_file is not None:
+                        yield media_file
+            finally:
+                # close the files that were opened ahead if the caller stops early
+                for future in pending:
+                    if future.exception() is None and future.result() is not None:
+                        future.result()[1].close()
     return _media_files(), errors
 
 
@@ -1,8 +1,11 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import hashlib
+import json
 from collections import defaultdict
+from io import BytesIO
 from itertools import groupby
-from xml.etree.cElementTree import Element
+from xml.etree.cElementTree import Element, tostring
 
 from django.db.models import IntegerField
 from django.contrib.postgres.fields.array import ArrayField
@@ -11,7 +14,9 @@ from django_cte.raw import raw_cte_sql
 import six
 
 from casexml.apps.phone.fixtures import FixtureProvider
+from casexml.apps.phone.utils import ITEMS_COMMENT_PREFIX
 from corehq.apps.custom_data_fields.dbaccessors import get_by_domain_and_type
+from corehq.apps.fixtures.fixturegenerators import GLOBAL_USER_ID
 from corehq.apps.fixtures.utils import get_index_schema_node
 from corehq.apps.locations.models import (
     LocationFixtureConfiguration,
@@ -20,6 +25,13 @@ from corehq.apps.locations.models import (
     SQLLocation,
 )
 from corehq import toggles
+from corehq.blobs import get_blob_db
+from corehq.blobs.exceptions import NotFound
+
+LOCATION_FIXTURE_BUCKET = 'location-fixtures'
+# Cache keys change whenever the content of a fixture would change so
+# entries never need to be invalidated, only cleaned up eventually
+LOCATION_FIXTURE_CACHE_TIMEOUT = 24 * 60  # minutes
 
 
 class LocationSet(object):
@@ -99,7 +111,72 @@ class LocationFixtureProvider(FixtureProvider):
             return []
 
         data_fields = _get_location_data_fields(restore_user.domain)
-        return self.serializer.get_xml_nodes(self.id, restore_user, locations_queryset, data_fields)
+        return self._get_xml_nodes(restore_state, locations_queryset, data_fields)
+
+    def _get_xml_nodes(self, restore_state, locations_queryset, data_fields):
+        """
+        Users who sync the same set of locations get the same fixture apart
+        from the user id, so the fixture is cached in the blob db with a
+        placeholder for the user id, as for global item lists.
+        """
+        restore_user = restore_state.restore_user
+        db = get_blob_db()
+        bucket = get_location_fixture_cache_bucket(restore_user.domain)
+        key = _get_location_fixture_cache_key(self.id, restore_user.domain, locations_queryset, data_fields)
+        if not restore_state.overwrite_cache:
+            try:
+                data = db.get(key, bucket).read()
+            except NotFound:
+                pass
+            else:
+                return [data.replace(GLOBAL_USER_ID.encode('utf-8'), restore_user.user_id.encode('utf-8'))]
+
+        nodes = self.serializer.get_xml_nodes(self.id, restore_user, locations_queryset, data_fields)
+        db.put(BytesIO(_serialize_for_cache(nodes)), key, bucket=bucket, timeout=LOCATION_FIXTURE_CACHE_TIMEOUT)
+        return nodes
+
+
+def get_location_fixture_cache_bucket(domain):
+    return '{}/{}'.format(LOCATION_FIXTURE_BUCKET, domain)
+
+
+def _get_location_fixture_cache_key(fixture_id, domain, locations_queryset, data_fields):
+    """
+    The key covers everything the fixture is rendered from: the locations
+    it includes and when each was last modified, the domain's location
+    types and its location data fields. Editing, moving or archiving a
+    location, or adding it to or removing it from the fixture, therefore
+    changes the key of every fixture that includes it.
+
+    Only the id and last_modified of each location are loaded for this,
+    not the locations themselves.
+    """
+    locations = _get_cache_key_rows(locations_queryset)
+    location_types = _get_cache_key_rows(LocationType.objects.filter(domain=domain))
+    fields = [(field.slug, field.index_in_fixture) for field in data_fields]
+    key = json.dumps([fixture_id, domain, locations, location_types, fields])
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+def _get_cache_key_rows(queryset):
+    return sorted(
+        (pk, last_modified.isoformat())
+        for pk, last_modified in queryset.order_by().values_list('pk', 'last_modified')
+    )
+
+
+def _serialize_for_cache(nodes):
+    io = BytesIO()
+    io.write(ITEMS_COMMENT_PREFIX)
+    io.write('{}-->'.format(len(nodes)).encode('utf-8'))
+    for node in nodes:
+        user_id = node.attrib.get('user_id')
+        if user_id is not None:
+            node.attrib['user_id'] = GLOBAL_USER_ID
+        io.write(tostring(node, encoding='utf-8'))
+        if user_id is not None:
+            node.attrib['user_id'] = user_id
+    return io.getvalue()
 
 
 class HierarchicalLocationSerializer(object):
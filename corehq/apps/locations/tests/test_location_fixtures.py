@@ -12,7 +12,8 @@ from corehq.util.test_utils import flag_enabled
 from datetime import datetime, timedelta
 from django.test import TestCase
 from casexml.apps.phone.models import SyncLog
-from casexml.apps.phone.tests.utils import create_restore_user, call_fixture_generator
+from casexml.apps.phone.tests import utils as phone_test_utils
+from casexml.apps.phone.tests.utils import create_restore_user
 from corehq.apps.domain.shortcuts import create_domain
 from corehq.apps.domain.models import Domain
 from corehq.apps.commtrack.tests.util import bootstrap_domain
@@ -22,6 +23,7 @@ from corehq.apps.app_manager.tests.util import TestXmlMixin, extract_xml_partial
 from corehq.apps.users.dbaccessors.all_commcare_users import delete_all_users
 
 from .util import (
+    call_fixture_generator,
     setup_location_types_with_structure,
     setup_locations_with_structure,
     LocationStructure,
@@ -158,6 +160,29 @@ class LocationFixturesTest(LocationHierarchyTestCase, FixtureHasLocationsMixin):
             ['Massachusetts', 'Suffolk', 'Boston', 'Revere']
         )
 
+    @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
+    def test_fixture_cache(self):
+        other_user = create_restore_user(self.domain, 'other_user', '123')
+        self.addCleanup(other_user._couch_user.delete)
+        for user in (self.user, other_user):
+            user._couch_user.set_location(self.locations['Suffolk'])
+
+        call_fixture_generator(location_fixture_generator, self.user)
+        # the other user syncs the same locations so gets the cached fixture
+        cached, = phone_test_utils.call_fixture_generator(location_fixture_generator, other_user)
+        self.assertIsInstance(cached, bytes)
+        self.assertIn(other_user.user_id.encode('utf-8'), cached)
+        self.assertNotIn(self.user.user_id.encode('utf-8'), cached)
+
+        boston = self.locations['Boston']
+        self.addCleanup(boston.save)
+        self.addCleanup(setattr, boston, 'name', boston.name)
+        boston.name = 'Beantown'
+        boston.save()
+        fixture, = phone_test_utils.call_fixture_generator(location_fixture_generator, other_user)
+        self.assertNotIsInstance(fixture, bytes)
+        self.assertIn(b'Beantown', ElementTree.tostring(fixture))
+
     def test_multiple_locations(self):
         self.user._couch_user.add_to_assigned_locations(self.locations['Suffolk'])
         self.user._couch_user.add_to_assigned_locations(self.locations['New York City'])
@@ -4,7 +4,6 @@ from mock import patch
 
 from django.test import TestCase
 
-from casexml.apps.phone.tests.utils import call_fixture_generator
 from corehq.apps.commtrack.tests.util import bootstrap_location_types
 from corehq.apps.domain.shortcuts import create_domain
 from corehq.apps.groups.exceptions import CantSaveException
@@ -12,7 +11,7 @@ from corehq.apps.users.models import CommCareUser
 from corehq.util.test_utils import flag_enabled
 
 from ..fixtures import location_fixture_generator
-from .util import make_loc
+from .util import call_fixture_generator, make_loc
 
 
 @flag_enabled('HIERARCHICAL_LOCATION_FIXTURE')
@@ -1,7 +1,12 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from collections import namedtuple
+from xml.etree import cElementTree as ElementTree
+
+import six
 from django.test import TestCase
+from casexml.apps.phone.tests import utils as phone_test_utils
+from casexml.apps.phone.utils import get_cached_items_with_count
 from dimagi.utils.couch.database import iter_bulk_delete
 from corehq.util.test_utils import unit_testing_only
 from corehq.apps.commtrack.models import SupplyPointCase
@@ -36,6 +41,19 @@ def delete_all_locations():
     LocationType.objects.all().delete()
 
 
+def call_fixture_generator(*args, **kwargs):
+    """Same as casexml's ``call_fixture_generator`` but location fixtures
+    that come from the cache are parsed back into elements"""
+    nodes = []
+    for node in phone_test_utils.call_fixture_generator(*args, **kwargs):
+        if isinstance(node, six.binary_type):
+            xml, num_items = get_cached_items_with_count(node)
+            nodes.extend(ElementTree.fromstring(b'<nodes>' + xml + b'</nodes>'))
+        else:
+            nodes.append(node)
+    return nodes
+
+
 def setup_location_types(domain, location_types):
     location_types_dict = {}
     previous = None
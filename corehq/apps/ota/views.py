@@ -27,6 +27,11 @@ from corehq import toggles
 from corehq.const import OPENROSA_VERSION_MAP
 from corehq.middleware import OPENROSA_VERSION_HEADER
 from corehq.apps.app_manager.util import LatestAppInfo
+from corehq.apps.case_search.cache import (
+    get_cached_search_results,
+    get_search_results_cache_key,
+    set_cached_search_results,
+)
 from corehq.apps.case_search.models import QueryMergeException
 from corehq.apps.case_search.utils import CaseSearchCriteria
 from corehq.apps.domain.decorators import (
@@ -82,19 +87,25 @@ def search(request, domain):
         case_type = criteria.pop('case_type')
     except KeyError:
         return HttpResponse('Search request must specify case type', status=400)
-    try:
-        case_search_criteria = CaseSearchCriteria(domain, case_type, criteria)
-        search_es = case_search_criteria.search_es
-    except QueryMergeException as e:
-        return _handle_query_merge_exception(request, e)
-    try:
-        hits = search_es.run().raw_hits
-    except Exception as e:
-        return _handle_es_exception(request, e, case_search_criteria.query_addition_debug_details)
+    cache_key = get_search_results_cache_key(domain, case_type, criteria)
+    results = get_cached_search_results(cache_key)
+    if results is None:
+        try:
+            case_search_criteria = CaseSearchCriteria(domain, case_type, criteria)
+            search_es = case_search_criteria.search_es
+        except QueryMergeException as e:
+            return _handle_query_merge_exception(request, e)
+        try:
+            hits = search_es.run().raw_hits
+        except Exception as e:
+            return _handle_es_exception(request, e, case_search_criteria.query_addition_debug_details)
+
+        # Even if it's a SQL domain, we just need to render the hits as cases, so CommCareCase.wrap will be fine
+        cases = [CommCareCase.wrap(flatten_result(result, include_score=True)) for result in hits]
+        results = [CaseDBFixture.get_case_xml(case) for case in cases]
+        set_cached_search_results(cache_key, results)
 
-    # Even if it's a SQL domain, we just need to render the hits as cases, so CommCareCase.wrap will be fine
-    cases = [CommCareCase.wrap(flatten_result(result, include_score=True)) for result in hits]
-    fixtures = CaseDBFixture(cases).fixture
+    fixtures = CaseDBFixture.get_fixture_from_case_xml(results)
     return HttpResponse(fixtures, content_type="text/xml; charset=utf-8")
 
 
@@ -131,6 +131,44 @@ def _get_case_counts_by_user(domain, datespan, case_types=None, is_opened=True,
     return case_query.run().aggregations.by_user.counts_by_bucket()
 
 
+def get_case_counts_opened_by_user_and_type(domain, datespan):
+    return _get_case_counts_by_user_and_type(domain, datespan, True)
+
+
+def get_case_counts_closed_by_user_and_type(domain, datespan):
+    return _get_case_counts_by_user_and_type(domain, datespan, False)
+
+
+def _get_case_counts_by_user_and_type(domain, datespan, is_opened=True):
+    """
+    :returns: dict of ``(user_id, case_type) -> count``
+    """
+    date_field = 'opened_on' if is_opened else 'closed_on'
+    user_field = 'opened_by' if is_opened else 'closed_by'
+
+    case_query = (CaseES()
+        .domain(domain)
+        .filter(
+            filters.date_range(
+                date_field,
+                gte=datespan.startdate.date(),
+                lte=datespan.enddate.date(),
+            )
+        )
+        .aggregation(
+            TermsAggregation('by_user', user_field).aggregation(
+                TermsAggregation('by_type', 'type.exact')
+            )
+        )
+        .size(0))
+
+    return {
+        (user_bucket.key, case_type): count
+        for user_bucket in case_query.run().aggregations.by_user.buckets_list
+        for case_type, count in six.iteritems(user_bucket.by_type.counts_by_bucket())
+    }
+
+
 def get_paged_forms_by_type(
         domain,
         doc_types,
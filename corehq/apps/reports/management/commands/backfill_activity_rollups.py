@@ -0,0 +1,35 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from corehq.apps.reports.rollups import update_rollups
+from corehq.util.dates import iso_string_to_date
+from six.moves import range
+
+
+class Command(BaseCommand):
+    help = """
+    Calculates the daily form and case activity rollups of a domain from ES.
+    Run this before enabling the worker_activity_rollups toggle for a domain.
+    Example: ./manage.py backfill_activity_rollups my-domain 2018-01-01 --enddate 2019-03-01
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('domain')
+        parser.add_argument('startdate', type=iso_string_to_date)
+        parser.add_argument('--enddate', type=iso_string_to_date, default=None,
+                            help='Last day to calculate (inclusive). Defaults to today (UTC).')
+
+    def handle(self, domain, startdate, enddate, **options):
+        enddate = enddate or datetime.utcnow().date()
+        if enddate < startdate:
+            raise CommandError("enddate is before startdate")
+        num_days = (enddate - startdate).days + 1
+        for i in range(num_days):
+            day = startdate + timedelta(days=i)
+            update_rollups(domain, day)
+            print("{} ({}/{})".format(day, i + 1, num_days))
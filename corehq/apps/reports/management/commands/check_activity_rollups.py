@@ -0,0 +1,48 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from corehq.apps.reports.rollups import get_rollup_discrepancies, update_rollups
+from corehq.util.dates import iso_string_to_date
+from six.moves import range
+
+
+class Command(BaseCommand):
+    help = """
+    Compares a domain's daily form and case activity rollups with ES and
+    prints the counts that differ as (rollups, ES) with counts of
+    (submitted, completed) forms and (opened, closed) cases.
+    Example: ./manage.py check_activity_rollups my-domain 2019-01-01 --fix
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('domain')
+        parser.add_argument('startdate', type=iso_string_to_date)
+        parser.add_argument('--enddate', type=iso_string_to_date, default=None,
+                            help='Last day to check (inclusive). Defaults to today (UTC).')
+        parser.add_argument('--fix', action='store_true', default=False,
+                            help='Recalculate the rollups of days that differ')
+
+    def handle(self, domain, startdate, enddate, fix, **options):
+        enddate = enddate or datetime.utcnow().date()
+        if enddate < startdate:
+            raise CommandError("enddate is before startdate")
+        days_with_discrepancies = 0
+        for i in range((enddate - startdate).days + 1):
+            day = startdate + timedelta(days=i)
+            discrepancies = get_rollup_discrepancies(domain, day)
+            if not discrepancies:
+                continue
+            days_with_discrepancies += 1
+            print("{}:".format(day))
+            for kind, key, rollup_counts, es_counts in discrepancies:
+                print("    {} {}: {} != {}".format(kind, key, rollup_counts, es_counts))
+            if fix:
+                update_rollups(domain, day)
+        print("{} day(s) with discrepancies{}".format(
+            days_with_discrepancies, " (fixed)" if fix and days_with_discrepancies else ""
+        ))
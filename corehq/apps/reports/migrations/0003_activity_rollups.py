@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2019-03-14 10:12
+from __future__ import unicode_literals
+
+from __future__ import absolute_import
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_auto_20171121_1803'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCaseActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=256)),
+                ('user_id', models.CharField(max_length=255)),
+                ('case_type', models.CharField(max_length=255)),
+                ('date', models.DateField()),
+                ('opened', models.PositiveIntegerField(default=0)),
+                ('closed', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyFormActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=256)),
+                ('user_id', models.CharField(max_length=255)),
+                ('date', models.DateField()),
+                ('submitted', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StaleActivityDay',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=256)),
+                ('date', models.DateField()),
+                ('first_marked_on', models.DateTimeField(auto_now_add=True)),
+                ('last_marked_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='staleactivityday',
+            unique_together=set([('domain', 'date')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyformactivity',
+            unique_together=set([('domain', 'date', 'user_id')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailycaseactivity',
+            unique_together=set([('domain', 'date', 'user_id', 'case_type')]),
+        ),
+    ]
@@ -1168,3 +1168,50 @@ class ReportsSidebarOrdering(models.Model):
             "will be listed under the given heading in the sidebar nav."
         )
     )
+
+
+class DailyFormActivity(models.Model):
+    """
+    The number of forms a user submitted (by ``received_on``) and completed
+    (by ``form.meta.timeEnd``) on a day (UTC). Maintained by
+    ``corehq.apps.reports.rollups`` for domains using activity rollups.
+    """
+    domain = models.CharField(max_length=256)
+    user_id = models.CharField(max_length=255)
+    date = models.DateField()
+    submitted = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+
+    class Meta(object):
+        unique_together = ('domain', 'date', 'user_id')
+
+
+class DailyCaseActivity(models.Model):
+    """
+    The number of cases of a case type that a user opened and closed on a
+    day (UTC). Maintained by ``corehq.apps.reports.rollups`` for domains
+    using activity rollups.
+    """
+    domain = models.CharField(max_length=256)
+    user_id = models.CharField(max_length=255)
+    case_type = models.CharField(max_length=255)
+    date = models.DateField()
+    opened = models.PositiveIntegerField(default=0)
+    closed = models.PositiveIntegerField(default=0)
+
+    class Meta(object):
+        unique_together = ('domain', 'date', 'user_id', 'case_type')
+
+
+class StaleActivityDay(models.Model):
+    """
+    A day whose activity rollups need to be recalculated because forms or
+    cases from that day have changed
+    """
+    domain = models.CharField(max_length=256)
+    date = models.DateField()
+    first_marked_on = models.DateTimeField(auto_now_add=True)
+    last_marked_on = models.DateTimeField(auto_now=True)
+
+    class Meta(object):
+        unique_together = ('domain', 'date')
@@ -0,0 +1,202 @@
+"""Daily rollups of form and case activity for the worker monitoring reports
+
+``DailyFormActivity`` and ``DailyCaseActivity`` hold the number of forms
+and cases of each user per day (UTC), so that reports can sum them over a
+date range instead of aggregating over all of a domain's forms and cases
+in ES on every page view.
+
+Counters are not incremented as changes come in, since changes are
+replayed and forms get archived and edited. Instead the activity rollup
+pillow marks the days a change touches as stale, and
+``update_stale_rollups`` recalculates stale days from ES once ES has had
+time to index the changes.
+
+Rollups only exist for domains with the ``WORKER_ACTIVITY_ROLLUPS`` toggle,
+which should be enabled after running ``backfill_activity_rollups``.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from corehq.apps.reports.analytics import esaccessors
+from corehq.apps.reports.models import DailyCaseActivity, DailyFormActivity, StaleActivityDay
+from corehq.toggles import WORKER_ACTIVITY_ROLLUPS
+from dimagi.utils.dates import DateSpan
+from dimagi.utils.parsing import json_format_date
+import six
+
+# how long to give ES to index a change before recalculating its day
+ES_LAG = timedelta(minutes=2)
+# days that keep changing are recalculated at least this often
+MAX_STALE_TIME = timedelta(minutes=30)
+
+
+def uses_activity_rollups(domain):
+    return WORKER_ACTIVITY_ROLLUPS.enabled(domain)
+
+
+def mark_stale(domain, dates):
+    for date in set(dates):
+        updated = (StaleActivityDay.objects
+                   .filter(domain=domain, date=date)
+                   .update(last_marked_on=datetime.utcnow()))
+        if not updated:
+            StaleActivityDay.objects.get_or_create(domain=domain, date=date)
+
+
+def update_stale_rollups():
+    cutoff = datetime.utcnow() - ES_LAG
+    stale_days = list(StaleActivityDay.objects.filter(
+        Q(last_marked_on__lte=cutoff) | Q(first_marked_on__lte=datetime.utcnow() - MAX_STALE_TIME)
+    ))
+    for stale_day in stale_days:
+        update_rollups(stale_day.domain, stale_day.date)
+        # changes marked after the cutoff might not have been in ES yet
+        StaleActivityDay.objects.filter(pk=stale_day.pk, last_marked_on__lte=cutoff).delete()
+    return len(stale_days)
+
+
+def update_rollups(domain, date):
+    """Replace the rollups of a day with the counts in ES"""
+    form_counts, case_counts = _get_activity_from_es(domain, date)
+    with transaction.atomic():
+        DailyFormActivity.objects.filter(domain=domain, date=date).delete()
+        DailyFormActivity.objects.bulk_create([
+            DailyFormActivity(
+                domain=domain, date=date, user_id=user_id,
+                submitted=submitted, completed=completed,
+            )
+            for user_id, (submitted, completed) in six.iteritems(form_counts)
+        ])
+        DailyCaseActivity.objects.filter(domain=domain, date=date).delete()
+        DailyCaseActivity.objects.bulk_create([
+            DailyCaseActivity(
+                domain=domain, date=date, user_id=user_id, case_type=case_type,
+                opened=opened, closed=closed,
+            )
+            for (user_id, case_type), (opened, closed) in six.iteritems(case_counts)
+        ])
+
+
+def get_rollup_discrepancies(domain, date):
+    """
+    :returns: list of ``(kind, key, rollup counts, ES counts)`` tuples for
+    each user (and case type) whose rollups for the day don't match ES
+    """
+    form_counts, case_counts = _get_activity_from_es(domain, date)
+    stored_form_counts = {
+        user_id: (submitted, completed)
+        for user_id, submitted, completed in DailyFormActivity.objects
+        .filter(domain=domain, date=date)
+        .values_list('user_id', 'submitted', 'completed')
+    }
+    stored_case_counts = {
+        (user_id, case_type): (opened, closed)
+        for user_id, case_type, opened, closed in DailyCaseActivity.objects
+        .filter(domain=domain, date=date)
+        .values_list('user_id', 'case_type', 'opened', 'closed')
+    }
+    discrepancies = []
+    for kind, stored, expected in [
+        ('forms', stored_form_counts, form_counts),
+        ('cases', stored_case_counts, case_counts),
+    ]:
+        for key in sorted(set(stored) | set(expected)):
+            if stored.get(key, (0, 0)) != expected.get(key, (0, 0)):
+                discrepancies.append((kind, key, stored.get(key), expected.get(key)))
+    return discrepancies
+
+
+def _get_activity_from_es(domain, date):
+    datespan = _get_day_span(date)
+    submitted = esaccessors.get_submission_counts_by_user(domain, datespan)
+    completed = esaccessors.get_completed_counts_by_user(domain, datespan)
+    opened = esaccessors.get_case_counts_opened_by_user_and_type(domain, datespan)
+    closed = esaccessors.get_case_counts_closed_by_user_and_type(domain, datespan)
+    form_counts = {
+        user_id: (submitted.get(user_id, 0), completed.get(user_id, 0))
+        for user_id in set(submitted) | set(completed)
+    }
+    case_counts = {
+        key: (opened.get(key, 0), closed.get(key, 0))
+        for key in set(opened) | set(closed)
+    }
+    return form_counts, case_counts
+
+
+def _get_day_span(date):
+    start = datetime.combine(date, time())
+    return DateSpan(start, start)
+
+
+def get_submission_counts_by_user(domain, datespan, user_ids=None):
+    return _get_form_counts_by_user(domain, datespan, 'submitted', user_ids)
+
+
+def get_completed_counts_by_user(domain, datespan, user_ids=None):
+    return _get_form_counts_by_user(domain, datespan, 'completed', user_ids)
+
+
+def _get_form_counts_by_user(domain, datespan, field, user_ids=None):
+    rows = _filter_by_datespan(DailyFormActivity.objects.filter(domain=domain), datespan)
+    if user_ids:
+        rows = rows.filter(user_id__in=user_ids)
+    return _sum_by(rows, 'user_id', field)
+
+
+def get_submission_counts_by_date(domain, user_ids, datespan):
+    return _get_form_counts_by_date(domain, user_ids, datespan, 'submitted')
+
+
+def get_completed_counts_by_date(domain, user_ids, datespan):
+    return _get_form_counts_by_date(domain, user_ids, datespan, 'completed')
+
+
+def _get_form_counts_by_date(domain, user_ids, datespan, field):
+    """Like the ES version, but only for UTC days
+
+    :returns: dict of ``'YYYY-MM-DD' -> count``
+    """
+    rows = _filter_by_datespan(
+        DailyFormActivity.objects.filter(domain=domain, user_id__in=user_ids), datespan
+    )
+    return {
+        json_format_date(date): count
+        for date, count in six.iteritems(_sum_by(rows, 'date', field))
+    }
+
+
+def get_case_counts_opened_by_user(domain, datespan, case_types=None, user_ids=None):
+    return _get_case_counts_by_user(domain, datespan, 'opened', case_types, user_ids)
+
+
+def get_case_counts_closed_by_user(domain, datespan, case_types=None, user_ids=None):
+    return _get_case_counts_by_user(domain, datespan, 'closed', case_types, user_ids)
+
+
+def _get_case_counts_by_user(domain, datespan, field, case_types=None, user_ids=None):
+    rows = _filter_by_datespan(DailyCaseActivity.objects.filter(domain=domain), datespan)
+    if case_types:
+        if isinstance(case_types, six.string_types):
+            case_types = [case_types]
+        rows = rows.filter(case_type__in=case_types)
+    else:
+        rows = rows.exclude(case_type='commcare-user')
+    if user_ids:
+        rows = rows.filter(user_id__in=user_ids)
+    return _sum_by(rows, 'user_id', field)
+
+
+def _filter_by_datespan(rows, datespan):
+    return rows.filter(date__range=(datespan.startdate.date(), datespan.enddate.date()))
+
+
+def _sum_by(rows, key, field):
+    return {
+        row[key]: row['count']
+        for row in rows.values(key).annotate(count=Sum(field)).filter(count__gt=0)
+    }
@@ -10,7 +10,7 @@ from corehq.apps.case_search.const import (
     CASE_COMPUTED_METADATA,
     SPECIAL_CASE_PROPERTIES_MAP,
 )
-from corehq.apps.case_search.filter_dsl import CaseFilterError
+from corehq.apps.case_search.filter_dsl import CaseFilterError, RelatedCaseQueryPlanner
 from corehq.apps.es.case_search import CaseSearchES, flatten_result
 from corehq.apps.reports.datatables import DataTablesColumn, DataTablesHeader
 from corehq.apps.reports.exceptions import BadRequestError
@@ -58,13 +58,19 @@ class CaseListExplorer(CaseListReport):
         with timer:
             return super(CaseListExplorer, self).es_results
 
+    @property
+    @memoized
+    def related_case_planner(self):
+        # shared by every query this report builds so related case lookups are only done once
+        return RelatedCaseQueryPlanner(self.domain)
+
     def _build_query(self, sort=True):
         query = super(CaseListExplorer, self)._build_query()
         query = self._populate_sort(query, sort)
         xpath = XpathCaseSearchFilter.get_value(self.request, self.domain)
         if xpath:
             try:
-                query = query.xpath_query(self.domain, xpath)
+                query = query.xpath_query(self.domain, xpath, self.related_case_planner)
             except CaseFilterError as e:
                 track_workflow(self.request.couch_user.username, "Case List Explorer: Query Error")
 
@@ -20,15 +20,12 @@ from corehq.apps.es.aggregations import (
     MissingAggregation,
 )
 from corehq.apps.locations.permissions import conditionally_location_safe, location_safe
-from corehq.apps.reports import util
+from corehq.apps.reports import rollups, util
+from corehq.apps.reports.analytics import esaccessors
 from corehq.apps.reports.analytics.esaccessors import (
     get_last_submission_time_for_users,
-    get_submission_counts_by_user,
-    get_completed_counts_by_user,
     get_submission_counts_by_date,
     get_completed_counts_by_date,
-    get_case_counts_closed_by_user,
-    get_case_counts_opened_by_user,
     get_active_case_counts_by_owner,
     get_total_case_counts_by_owner,
     get_forms,
@@ -843,11 +840,17 @@ class DailyFormStatsReport(WorkerMonitoringReportTableBase, CompletionOrSubmissi
             users.reverse()
         return self.paginate_list(users)
 
+    @property
+    @memoized
+    def uses_rollups(self):
+        return rollups.uses_activity_rollups(self.domain)
+
     def users_by_range(self, datespan, order):
+        counts = rollups if self.uses_rollups else esaccessors
         if self.is_submission_time:
-            get_counts_by_user = get_submission_counts_by_user
+            get_counts_by_user = counts.get_submission_counts_by_user
         else:
-            get_counts_by_user = get_completed_counts_by_user
+            get_counts_by_user = counts.get_completed_counts_by_user
 
         if EMWF.show_all_mobile_workers(self.request.GET.getlist(EMWF.slug)):
             user_ids = None  # Don't restrict query by user ID
@@ -921,17 +924,24 @@ class DailyFormStatsReport(WorkerMonitoringReportTableBase, CompletionOrSubmissi
         else:
             user_ids = [u.user_id for u in self.selected_users]
 
-        if self.is_submission_time:
-            get_counts_by_date = get_submission_counts_by_date
+        if self.uses_rollups and self.timezone == pytz.utc:
+            # rollups are by UTC day
+            if self.is_submission_time:
+                results = rollups.get_submission_counts_by_date(self.domain, user_ids, self.datespan)
+            else:
+                results = rollups.get_completed_counts_by_date(self.domain, user_ids, self.datespan)
         else:
-            get_counts_by_date = get_completed_counts_by_date
+            if self.is_submission_time:
+                get_counts_by_date = get_submission_counts_by_date
+            else:
+                get_counts_by_date = get_completed_counts_by_date
 
-        results = get_counts_by_date(
-            self.domain,
-            user_ids,
-            self.datespan,
-            self.timezone,
-        )
+            results = get_counts_by_date(
+                self.domain,
+                user_ids,
+                self.datespan,
+                self.timezone,
+            )
 
         date_cols = [
             results.get(json_format_date(date), 0)
@@ -1737,11 +1747,16 @@ class WorkerActivityReport(WorkerMonitoringCaseReportTableBase, DatespanMixin):
         case_owners = _get_owner_ids_from_users(self.users_to_iterate)
         user_ids = self.user_ids
 
+        if rollups.uses_activity_rollups(self.domain):
+            counts = rollups
+        else:
+            counts = esaccessors
+
         return WorkerActivityReportData(
-            avg_submissions_by_user=get_submission_counts_by_user(
+            avg_submissions_by_user=counts.get_submission_counts_by_user(
                 self.domain, avg_datespan, user_ids=user_ids
             ),
-            submissions_by_user=get_submission_counts_by_user(
+            submissions_by_user=counts.get_submission_counts_by_user(
                 self.domain, self.datespan, user_ids=user_ids
             ),
             active_cases_by_owner=get_active_case_counts_by_owner(
@@ -1750,10 +1765,10 @@ class WorkerActivityReport(WorkerMonitoringCaseReportTableBase, DatespanMixin):
             total_cases_by_owner=get_total_case_counts_by_owner(
                 self.domain, self.datespan, self.case_types, owner_ids=case_owners
             ),
-            cases_closed_by_user=get_case_counts_closed_by_user(
+            cases_closed_by_user=counts.get_case_counts_closed_by_user(
                 self.domain, self.datespan, self.case_types, user_ids=user_ids
             ),
-            cases_opened_by_user=get_case_counts_opened_by_user(
+            cases_opened_by_user=counts.get_case_counts_opened_by_user(
                 self.domain, self.datespan, self.case_types, user_ids=user_ids
             ),
         )
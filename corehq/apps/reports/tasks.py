@@ -46,7 +46,7 @@ from corehq.apps.domain.calculations import (
 from corehq.apps.es.domains import DomainES
 from corehq.elastic import (
     stream_es_query,
-    send_to_elasticsearch,
+    get_bulk_writer,
     get_es_new, ES_META)
 from corehq.pillows.mappings.app_mapping import APP_INDEX
 from corehq.util.view_utils import absolute_reverse
@@ -62,7 +62,7 @@ from .models import (
     ReportNotification,
     UnsupportedScheduledReportError,
 )
-
+from .rollups import update_stale_rollups
 from .scheduled import get_scheduled_report_ids
 import six
 from six.moves import map
@@ -155,10 +155,18 @@ def rebuild_export_async(config, schema):
     rebuild_export(config, schema)
 
 
+@periodic_task(run_every=crontab(minute="*/5"), queue='background_queue')
+def update_stale_activity_rollups():
+    update_stale_rollups()
+
+
 @periodic_task(run_every=crontab(hour="22", minute="0", day_of_week="*"), queue='background_queue')
 def update_calculated_properties():
     results = DomainES().fields(["name", "_id", "cp_last_updated"]).scroll()
     all_stats = all_domain_stats()
+    # the stats take a while to calculate so flush regularly rather than
+    # waiting for a full batch
+    writer = get_bulk_writer('update_calculated_properties', max_docs=100, flush_interval=60)
     for r in results:
         dom = r["name"]
         try:
@@ -172,9 +180,12 @@ def update_calculated_properties():
                 del props['cp_last_form']
             if props['cp_300th_form'] is None:
                 del props['cp_300th_form']
-            send_to_elasticsearch("domains", props, es_merge_update=True)
+            writer.update(ES_META["domains"], r["_id"], props, key=dom)
         except Exception as e:
             notify_exception(None, message='Domain {} failed on stats calculations with {}'.format(dom, e))
+    writer.flush()
+    for dom, exception in writer.error_collector.errors:
+        notify_exception(None, message='Domain {} failed on stats update with {}'.format(dom, exception))
 
 
 def _skip_updating_domain_stats(last_updated=None, last_form_submission=None):
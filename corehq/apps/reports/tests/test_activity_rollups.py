@@ -0,0 +1,86 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from datetime import date, datetime, timedelta
+
+import mock
+from django.test import TestCase
+
+from corehq.apps.reports import rollups
+from corehq.apps.reports.models import DailyCaseActivity, DailyFormActivity, StaleActivityDay
+from dimagi.utils.dates import DateSpan
+
+DOMAIN = 'activity-rollups-test'
+DAY = date(2019, 3, 1)
+NEXT_DAY = date(2019, 3, 2)
+
+ACTIVITY = {
+    DAY: (
+        {'u1': (3, 2), 'u2': (1, 1)},
+        {('u1', 'mother'): (2, 0), ('u1', 'child'): (1, 1), ('u1', 'commcare-user'): (1, 0)},
+    ),
+    NEXT_DAY: (
+        {'u1': (2, 0)},
+        {('u2', 'mother'): (0, 2)},
+    ),
+}
+
+
+def _get_activity_from_es(domain, date):
+    return ACTIVITY[date]
+
+
+@mock.patch('corehq.apps.reports.rollups._get_activity_from_es', _get_activity_from_es)
+class ActivityRollupsTest(TestCase):
+
+    def tearDown(self):
+        DailyFormActivity.objects.all().delete()
+        DailyCaseActivity.objects.all().delete()
+        StaleActivityDay.objects.all().delete()
+        super(ActivityRollupsTest, self).tearDown()
+
+    def _datespan(self, startdate, enddate):
+        return DateSpan(
+            datetime.combine(startdate, datetime.min.time()),
+            datetime.combine(enddate, datetime.min.time()),
+        )
+
+    def test_counts(self):
+        rollups.update_rollups(DOMAIN, DAY)
+        rollups.update_rollups(DOMAIN, NEXT_DAY)
+        # recalculating a day replaces its rollups
+        rollups.update_rollups(DOMAIN, DAY)
+        datespan = self._datespan(DAY, NEXT_DAY)
+
+        self.assertEqual(rollups.get_submission_counts_by_user(DOMAIN, datespan), {'u1': 5, 'u2': 1})
+        self.assertEqual(rollups.get_completed_counts_by_user(DOMAIN, datespan), {'u1': 2, 'u2': 1})
+        self.assertEqual(
+            rollups.get_submission_counts_by_user(DOMAIN, self._datespan(NEXT_DAY, NEXT_DAY), ['u2']),
+            {}
+        )
+        self.assertEqual(
+            rollups.get_submission_counts_by_date(DOMAIN, ['u1'], datespan),
+            {'2019-03-01': 3, '2019-03-02': 2}
+        )
+        self.assertEqual(rollups.get_case_counts_opened_by_user(DOMAIN, datespan), {'u1': 3})
+        self.assertEqual(rollups.get_case_counts_opened_by_user(DOMAIN, datespan, ['child']), {'u1': 1})
+        self.assertEqual(rollups.get_case_counts_closed_by_user(DOMAIN, datespan), {'u1': 1, 'u2': 2})
+        self.assertEqual(rollups.get_rollup_discrepancies(DOMAIN, DAY), [])
+
+    def test_update_stale_rollups(self):
+        rollups.mark_stale(DOMAIN, [DAY, NEXT_DAY])
+        # not updated until ES has had time to catch up
+        self.assertEqual(rollups.update_stale_rollups(), 0)
+
+        StaleActivityDay.objects.filter(date=DAY).update(
+            first_marked_on=datetime.utcnow() - rollups.MAX_STALE_TIME - timedelta(minutes=1),
+        )
+        self.assertEqual(rollups.update_stale_rollups(), 1)
+        self.assertTrue(DailyFormActivity.objects.filter(date=DAY).exists())
+        # it changed too recently to be sure that the update included all changes
+        self.assertTrue(StaleActivityDay.objects.filter(date=DAY).exists())
+
+        StaleActivityDay.objects.update(last_marked_on=datetime.utcnow() - rollups.ES_LAG)
+        self.assertEqual(rollups.update_stale_rollups(), 2)
+        self.assertFalse(StaleActivityDay.objects.exists())
+        self.assertTrue(DailyFormActivity.objects.filter(date=NEXT_DAY).exists())
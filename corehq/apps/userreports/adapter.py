@@ -98,6 +98,14 @@ class IndicatorAdapter(object):
     def delete(self, doc):
         raise NotImplementedError
 
+    def bulk_delete(self, doc_ids):
+        """
+        Deletes the rows for all the given doc ids.
+        Override this to support bulk. Currently supported in SQL version
+        """
+        for doc_id in doc_ids:
+            self.delete({'_id': doc_id})
+
     @property
     def run_asynchronous(self):
         return self.config.asynchronous
@@ -13,9 +13,14 @@ class Command(BaseCommand):
                             help='Rebuild table in place (preserve existing data)')
         parser.add_argument('--initiated-by', action='store', dest='initiated',
                             help='Who initiated the rebuild (for sending email notifications)')
+        parser.add_argument('--in-slices', action='store_true', dest='in_slices', default=False,
+                            help='Rebuild the table in parallel celery tasks, one per case type / xmlns '
+                                 'and SQL shard')
 
     def handle(self, indicator_config_id, **options):
-        if options['in_place']:
+        if options['in_slices']:
+            tasks.rebuild_indicators_in_slices.delay(indicator_config_id, options['initiated'])
+        elif options['in_place']:
             tasks.rebuild_indicators_in_place(indicator_config_id, options['initiated'])
         else:
             tasks.rebuild_indicators(indicator_config_id, options['initiated'])
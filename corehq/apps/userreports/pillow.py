@@ -3,7 +3,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
 import hashlib
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
 from datetime import datetime, timedelta
 
 import six
@@ -35,8 +35,8 @@ from fluff.signals import (
 from pillowtop.checkpoints.manager import KafkaPillowCheckpoint
 from pillowtop.logger import pillow_logging
 from pillowtop.pillow.interface import ConstructedPillow
-from pillowtop.processors import PillowProcessor
-from pillowtop.utils import ensure_matched_revisions, ensure_document_exists
+from pillowtop.processors import BulkPillowProcessor
+from pillowtop.utils import ensure_matched_revisions, ensure_document_exists, bulk_fetch_changes_docs
 
 REBUILD_CHECK_INTERVAL = 60 * 60  # in seconds
 LONG_UCR_LOGGING_THRESHOLD = 0.5
@@ -195,7 +195,7 @@ class ConfigurableReportTableManagerMixin(object):
             rebuild_indicators.delay(adapter.config.get_id)
 
 
-class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, PillowProcessor):
+class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, BulkPillowProcessor):
 
     domain_timing_context = Counter()
 
@@ -250,6 +250,134 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Pil
             domain: timer.duration
         })
 
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        Evaluate the indicators for a chunk of changes and write them to each table
+        with a single DELETE and multi-row INSERT per table rather than one
+        transaction per document.
+        """
+        self.bootstrap_if_needed()
+
+        changes_by_domain = defaultdict(OrderedDict)
+        for change in changes_chunk:
+            domain = change.metadata.domain
+            if domain and domain in self.table_adapters_by_domain:
+                # only the latest change for each document needs to be processed
+                changes_by_domain[domain].pop(change.id, None)
+                changes_by_domain[domain][change.id] = change
+
+        bulk_fetch_changes_docs([
+            change for domain_changes in changes_by_domain.values() for change in domain_changes.values()
+        ])
+
+        change_exceptions = []
+        for domain, domain_changes in changes_by_domain.items():
+            with TimingContext() as timer:
+                change_exceptions.extend(self._process_domain_changes(domain, list(domain_changes.values())))
+            self.domain_timing_context.update(**{
+                domain: timer.duration
+            })
+        return [], change_exceptions
+
+    def _process_domain_changes(self, domain, changes):
+        change_exceptions = []
+        # make copy to avoid modifying list during iteration
+        adapters = list(self.table_adapters_by_domain[domain])
+        rows_by_adapter = defaultdict(list)
+        docs_by_adapter = defaultdict(list)
+        to_delete_by_adapter = defaultdict(set)
+        for change in changes:
+            if change.deleted:
+                for table in adapters:
+                    to_delete_by_adapter[table].add(change.id)
+
+            try:
+                doc = change.get_document()
+                ensure_document_exists(change)
+                ensure_matched_revisions(change)
+            except Exception as e:
+                change_exceptions.append((change, e))
+                continue
+
+            if doc is None:
+                continue
+
+            async_tables = []
+            eval_context = EvaluationContext(doc)
+            for table in adapters:
+                if table not in self.table_adapters_by_domain[domain]:
+                    # removed after an earlier doc in the chunk found it broken
+                    continue
+                if table.config.filter(doc):
+                    if table.run_asynchronous:
+                        async_tables.append(table.config._id)
+                    else:
+                        try:
+                            rows_by_adapter[table].extend(table.get_all_values(doc, eval_context))
+                        except Exception as e:
+                            self._handle_table_exception(domain, table, doc, e)
+                        else:
+                            docs_by_adapter[table].append(doc)
+                        eval_context.reset_iteration()
+                else:
+                    # deleting rows that may not exist is cheaper than checking
+                    # whether each doc is in the table
+                    to_delete_by_adapter[table].add(doc['_id'])
+
+            if async_tables:
+                try:
+                    AsyncIndicator.update_from_kafka_change(change, async_tables)
+                except Exception as e:
+                    change_exceptions.append((change, e))
+
+        changes_by_id = {change.id: change for change in changes}
+        for table in adapters:
+            if table not in self.table_adapters_by_domain[domain]:
+                continue
+            doc_ids = to_delete_by_adapter[table]
+            try:
+                table.bulk_delete(doc_ids)
+            except Exception as e:
+                self._handle_table_exception(domain, table, {}, e)
+                if table not in self.table_adapters_by_domain[domain]:
+                    continue
+                # the rows are left in the table so the changes need to be retried
+                change_exceptions.extend(
+                    (changes_by_id[doc_id], e) for doc_id in doc_ids if doc_id in changes_by_id
+                )
+            try:
+                self._save_rows_to_table(table, rows_by_adapter[table], docs_by_adapter[table])
+            except UserReportsWarning:
+                self._remove_table(domain, table)
+        return change_exceptions
+
+    def _handle_table_exception(self, domain, table, doc, exception):
+        """Log an error writing to a table and remove the table if it is broken
+        (see ``ErrorRaisingIndicatorSqlAdapter.handle_exception``)
+        """
+        try:
+            table.handle_exception(doc, exception)
+        except UserReportsWarning:
+            self._remove_table(domain, table)
+
+    def _remove_table(self, domain, table):
+        # remove it until the next bootstrap call
+        if table in self.table_adapters_by_domain[domain]:
+            self.table_adapters_by_domain[domain].remove(table)
+
+    def _save_rows_to_table(self, table, rows, docs):
+        if not docs:
+            return
+        try:
+            table.save_rows(rows)
+        except Exception:
+            # fall back to saving one doc at a time so that one bad doc doesn't lose the whole chunk
+            rows_by_doc_id = defaultdict(list)
+            for row in rows:
+                rows_by_doc_id[_get_row_doc_id(row)].append(row)
+            for doc in docs:
+                table._best_effort_save_rows(rows_by_doc_id[doc['_id']], doc)
+
     def checkpoint_updated(self):
         total_duration = sum(self.domain_timing_context.values())
         duration_seen = 0
@@ -267,13 +395,20 @@ class ConfigurableReportPillowProcessor(ConfigurableReportTableManagerMixin, Pil
         self.domain_timing_context.clear()
 
 
+def _get_row_doc_id(row):
+    for column_value in row:
+        if column_value.column.database_column_name == 'doc_id':
+            return column_value.value
+
+
 class ConfigurableReportKafkaPillow(ConstructedPillow):
     # the only reason this is a class is to avoid exposing processors
     # for tests to be able to call bootstrap on it.
     # we could easily remove the class and push all the stuff in __init__ to
     # get_kafka_ucr_pillow below if we wanted.
 
-    def __init__(self, processor, pillow_name, topics, num_processes, process_num, retry_errors=False):
+    def __init__(self, processor, pillow_name, topics, num_processes, process_num, retry_errors=False,
+                 processor_chunk_size=0):
         change_feed = KafkaChangeFeed(
             topics, group_id=pillow_name, num_processes=num_processes, process_num=process_num
         )
@@ -287,7 +422,8 @@ class ConfigurableReportKafkaPillow(ConstructedPillow):
             change_feed=change_feed,
             processor=processor,
             checkpoint=checkpoint,
-            change_processed_event_handler=event_handler
+            change_processed_event_handler=event_handler,
+            processor_chunk_size=processor_chunk_size
         )
         # set by the superclass constructor
         assert self.processors is not None
@@ -308,7 +444,7 @@ class ConfigurableReportKafkaPillow(ConstructedPillow):
 
 def get_kafka_ucr_pillow(pillow_id='kafka-ucr-main', ucr_division=None,
                          include_ucrs=None, exclude_ucrs=None, topics=None,
-                         num_processes=1, process_num=0, **kwargs):
+                         num_processes=1, process_num=0, processor_chunk_size=0, **kwargs):
     topics = topics or KAFKA_TOPICS
     topics = [kafka_bytestring(t) for t in topics]
     return ConfigurableReportKafkaPillow(
@@ -323,12 +459,13 @@ def get_kafka_ucr_pillow(pillow_id='kafka-ucr-main', ucr_division=None,
         topics=topics,
         num_processes=num_processes,
         process_num=process_num,
+        processor_chunk_size=processor_chunk_size,
     )
 
 
 def get_kafka_ucr_static_pillow(pillow_id='kafka-ucr-static', ucr_division=None,
                                 include_ucrs=None, exclude_ucrs=None, topics=None,
-                                num_processes=1, process_num=0, **kwargs):
+                                num_processes=1, process_num=0, processor_chunk_size=0, **kwargs):
     topics = topics or KAFKA_TOPICS
     topics = [kafka_bytestring(t) for t in topics]
     return ConfigurableReportKafkaPillow(
@@ -344,5 +481,6 @@ def get_kafka_ucr_static_pillow(pillow_id='kafka-ucr-static', ucr_division=None,
         topics=topics,
         num_processes=num_processes,
         process_num=process_num,
-        retry_errors=True
+        retry_errors=True,
+        processor_chunk_size=processor_chunk_size,
     )
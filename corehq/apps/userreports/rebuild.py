@@ -1,5 +1,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import json
+from collections import namedtuple
+
 from corehq.apps.userreports.models import id_is_static
 from dimagi.utils.couch import get_redis_client
 
@@ -12,12 +15,33 @@ def get_redis_key_for_config(config):
     return 'ucr_queue-{}:{}'.format(config._id, rev)
 
 
+class RebuildSlice(namedtuple('RebuildSlice', 'case_type_or_xmlns db_alias')):
+    """
+    A part of a data source rebuild that can be processed independently.
+
+    ``db_alias`` is the SQL shard the documents are read from or None if the
+    documents aren't sharded (e.g. couch domains).
+    """
+
+    def to_string(self):
+        return json.dumps([self.case_type_or_xmlns, self.db_alias])
+
+    @classmethod
+    def from_string(cls, value):
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return cls(*json.loads(value))
+
+
 class DataSourceResumeHelper(object):
 
     def __init__(self, config):
         self.config = config
         self._client = get_redis_client().client.get_client()
         self._key = get_redis_key_for_config(config)
+        self._slices_key = '{}:slices'.format(self._key)
+        self._completed_slices_key = '{}:completed_slices'.format(self._key)
+        self._finished_key = '{}:finished'.format(self._key)
 
     def get_completed_case_type_or_xmlns(self):
         return self._client.lrange(self._key, 0, -1)
@@ -26,7 +50,49 @@ class DataSourceResumeHelper(object):
         self._client.rpush(self._key, case_type_or_xmlns)
 
     def clear_resume_info(self):
-        self._client.delete(self._key)
+        self._client.delete(self._key, self._slices_key, self._completed_slices_key)
 
     def has_resume_info(self):
         return self._client.exists(self._key)
+
+    def set_slices(self, slices):
+        self._client.set(self._slices_key, json.dumps([s.to_string() for s in slices]))
+        self._client.delete(self._finished_key)
+
+    def get_slices(self):
+        value = self._client.get(self._slices_key)
+        if value is None:
+            return []
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return [RebuildSlice.from_string(s) for s in json.loads(value)]
+
+    def has_slice_info(self):
+        return self._client.exists(self._slices_key)
+
+    def add_completed_slice(self, rebuild_slice):
+        self._client.sadd(self._completed_slices_key, rebuild_slice.to_string())
+
+    def is_slice_pending(self, rebuild_slice):
+        """
+        :return: True if the slice is part of the current rebuild and has not completed,
+                 False if it has completed or the rebuild has finished
+        """
+        return (
+            rebuild_slice in self.get_slices()
+            and not self._client.sismember(self._completed_slices_key, rebuild_slice.to_string())
+        )
+
+    def get_completed_slices(self):
+        return {RebuildSlice.from_string(s) for s in self._client.smembers(self._completed_slices_key)}
+
+    def all_slices_completed(self):
+        slices = self.get_slices()
+        return bool(slices) and set(slices) <= self.get_completed_slices()
+
+    def claim_finish(self):
+        """
+        :return: True for exactly one caller once all slices have completed so that
+                 the build is only marked as finished once.
+        """
+        return bool(self._client.set(self._finished_key, 1, nx=True, ex=24 * 60 * 60))
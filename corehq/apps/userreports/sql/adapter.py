@@ -184,6 +184,14 @@ class IndicatorSqlAdapter(IndicatorAdapter):
         with self.session_helper.session_context() as session:
             session.execute(delete)
 
+    def bulk_delete(self, doc_ids):
+        if not doc_ids:
+            return
+        table = self.get_table()
+        delete = table.delete(table.c.doc_id.in_(doc_ids))
+        with self.session_helper.session_context() as session:
+            session.execute(delete)
+
     def doc_exists(self, doc):
         with self.session_helper.session_context() as session:
             query = session.query(self.get_table()).filter_by(doc_id=doc['_id'])
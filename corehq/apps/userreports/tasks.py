@@ -2,6 +2,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
 from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import logging
 
@@ -18,6 +19,7 @@ from django.utils.translation import ugettext as _
 from elasticsearch.exceptions import ConnectionTimeout
 
 from couchexport.models import Format
+from couchforms.models import all_known_formlike_doc_types
 from soil.util import get_download_file_path, expose_download
 
 from corehq import toggles
@@ -28,7 +30,7 @@ from corehq.apps.userreports.const import (
 )
 from corehq.apps.change_feed.data_sources import get_document_store_for_doc_type
 from corehq.apps.userreports.exceptions import StaticDataSourceConfigurationNotFoundError
-from corehq.apps.userreports.rebuild import DataSourceResumeHelper
+from corehq.apps.userreports.rebuild import DataSourceResumeHelper, RebuildSlice
 from corehq.apps.userreports.specs import EvaluationContext
 from corehq.apps.userreports.models import (
     AsyncIndicator,
@@ -40,10 +42,14 @@ from corehq.apps.userreports.models import (
 from corehq.apps.userreports.reports.data_source import ConfigurableReportDataSource
 from corehq.apps.userreports.util import get_indicator_adapter, get_async_indicator_modify_lock_key
 from corehq.elastic import ESError
+from corehq.form_processor.models import CommCareCaseSQL, XFormInstanceSQL
+from corehq.form_processor.utils.general import should_use_sql_backend
+from corehq.sql_db.util import get_db_aliases_for_partitioned_query
 from corehq.util.context_managers import notify_someone
 from corehq.util.datadog.gauges import datadog_gauge, datadog_histogram, datadog_counter
 from corehq.util.decorators import serial_task
 from corehq.util.quickcache import quickcache
+from corehq.util.soft_assert import soft_assert
 from corehq.util.timer import TimingContext
 from corehq.util.view_utils import reverse
 from custom.icds_reports.ucr.expressions import icds_get_related_docs_ids
@@ -120,15 +126,143 @@ def resume_building_indicators(indicator_config_id, initiated_by=None):
     success = _('Your UCR table {} has finished rebuilding').format(config.table_id)
     failure = _('There was an error rebuilding Your UCR table {}.').format(config.table_id)
     send = toggles.SEND_UCR_REBUILD_INFO.enabled(initiated_by)
+    resume_helper = DataSourceResumeHelper(config)
+    if resume_helper.has_slice_info():
+        # the slice tasks send their own notifications
+        _queue_slice_builds(config, resume_helper, initiated_by if send else None)
+        return
+
     with notify_someone(initiated_by, success_message=success, error_message=failure, send=send):
+        _iteratively_build_table(config, resume_helper)
+
+
+@task(queue=UCR_CELERY_QUEUE, ignore_result=True)
+def rebuild_indicators_in_slices(indicator_config_id, initiated_by=None):
+    """
+    Rebuild a data source by splitting the documents into slices by case type / xmlns
+    and SQL shard and building each slice in a separate task.
+
+    Progress is tracked per slice so a resumed rebuild only builds the slices
+    that have not completed. The build is marked as finished by whichever slice
+    task completes last.
+    """
+    config = _get_config_by_id(indicator_config_id)
+    if not toggles.SEND_UCR_REBUILD_INFO.enabled(initiated_by):
+        initiated_by = None
+    with _notify_slice_failure(initiated_by, config):
+        adapter = get_indicator_adapter(config, can_handle_laboratory=True)
+        if not id_is_static(indicator_config_id):
+            config.meta.build.initiated = datetime.utcnow()
+            config.meta.build.finished = False
+            config.meta.build.rebuilt_asynchronously = False
+            config.save()
+
+        adapter.rebuild_table()
         resume_helper = DataSourceResumeHelper(config)
+        resume_helper.clear_resume_info()
+        resume_helper.set_slices(_get_rebuild_slices(config))
+        _queue_slice_builds(config, resume_helper, initiated_by)
 
-        _iteratively_build_table(config, resume_helper)
+
+@task(queue=UCR_CELERY_QUEUE, ignore_result=True, acks_late=True)
+def build_indicators_for_slice(indicator_config_id, case_type_or_xmlns, db_alias, initiated_by=None):
+    config = _get_config_by_id(indicator_config_id)
+    resume_helper = DataSourceResumeHelper(config)
+    rebuild_slice = RebuildSlice(case_type_or_xmlns, db_alias)
+    with _notify_slice_failure(initiated_by, config):
+        if resume_helper.is_slice_pending(rebuild_slice):
+            document_store = get_document_store_for_doc_type(
+                config.domain, config.referenced_doc_type, case_type_or_xmlns=case_type_or_xmlns
+            )
+            for relevant_ids in chunked(_iter_slice_document_ids(config, rebuild_slice), ID_CHUNK_SIZE):
+                _build_indicators(config, document_store, list(relevant_ids))
+            resume_helper.add_completed_slice(rebuild_slice)
+        elif not resume_helper.has_slice_info():
+            # redelivered after the rebuild finished and its slice info was cleared
+            return
+
+        if resume_helper.all_slices_completed() and resume_helper.claim_finish():
+            _finish_build(config, resume_helper)
+            _send_rebuild_message(
+                initiated_by, _('Your UCR table {} has finished rebuilding').format(config.table_id)
+            )
+
+
+@contextmanager
+def _notify_slice_failure(initiated_by, config):
+    try:
+        yield
+    except BaseException as e:
+        _send_rebuild_message(
+            initiated_by, _('There was an error rebuilding Your UCR table {}.').format(config.table_id), e
+        )
+        raise
+
+
+def _send_rebuild_message(initiated_by, message, exception=None):
+    if initiated_by:
+        soft_assert(to=initiated_by, notify_admins=False, send_to_ops=False)(False, message, exception)
+
+
+def _queue_slice_builds(config, resume_helper, initiated_by=None):
+    completed_slices = resume_helper.get_completed_slices()
+    remaining_slices = [s for s in resume_helper.get_slices() if s not in completed_slices]
+    if not remaining_slices:
+        if resume_helper.claim_finish():
+            _finish_build(config, resume_helper)
+        return
+
+    for rebuild_slice in remaining_slices:
+        build_indicators_for_slice.delay(
+            config._id, rebuild_slice.case_type_or_xmlns, rebuild_slice.db_alias, initiated_by
+        )
+
+
+def _get_rebuild_slices(config):
+    """
+    :return: A list of ``RebuildSlice`` covering all the documents relevant to the data source
+    """
+    from corehq.apps.change_feed.document_types import CASE_DOC_TYPES
+    if should_use_sql_backend(config.domain) and (
+        config.referenced_doc_type in all_known_formlike_doc_types()
+        or config.referenced_doc_type in CASE_DOC_TYPES
+    ):
+        db_aliases = get_db_aliases_for_partitioned_query()
+    else:
+        db_aliases = [None]
+
+    return [
+        RebuildSlice(case_type_or_xmlns, db_alias)
+        for case_type_or_xmlns in config.get_case_type_or_xmlns_filter()
+        for db_alias in db_aliases
+    ]
+
+
+def _iter_slice_document_ids(config, rebuild_slice):
+    case_type_or_xmlns, db_alias = rebuild_slice
+    if db_alias is None:
+        document_store = get_document_store_for_doc_type(
+            config.domain, config.referenced_doc_type, case_type_or_xmlns=case_type_or_xmlns
+        )
+        return document_store.iter_document_ids()
+
+    if config.referenced_doc_type in all_known_formlike_doc_types():
+        queryset = XFormInstanceSQL.objects.using(db_alias).filter(
+            domain=config.domain, state=XFormInstanceSQL.NORMAL
+        )
+        if case_type_or_xmlns:
+            queryset = queryset.filter(xmlns=case_type_or_xmlns)
+        id_field = 'form_id'
+    else:
+        queryset = CommCareCaseSQL.objects.using(db_alias).filter(domain=config.domain, deleted=False)
+        if case_type_or_xmlns:
+            queryset = queryset.filter(type=case_type_or_xmlns)
+        id_field = 'case_id'
+    return queryset.values_list(id_field, flat=True).iterator()
 
 
 def _iteratively_build_table(config, resume_helper=None, in_place=False, limit=-1):
     resume_helper = resume_helper or DataSourceResumeHelper(config)
-    indicator_config_id = config._id
     case_type_or_xmlns_list = config.get_case_type_or_xmlns_filter()
     completed_ct_xmlns = resume_helper.get_completed_case_type_or_xmlns()
     if completed_ct_xmlns:
@@ -157,6 +291,11 @@ def _iteratively_build_table(config, resume_helper=None, in_place=False, limit=-
 
         resume_helper.add_completed_case_type_or_xmlns(case_type_or_xmlns)
 
+    _finish_build(config, resume_helper, in_place=in_place)
+
+
+def _finish_build(config, resume_helper, in_place=False):
+    indicator_config_id = config._id
     resume_helper.clear_resume_info()
     if not id_is_static(indicator_config_id):
         if in_place:
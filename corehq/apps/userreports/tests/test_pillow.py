@@ -142,6 +142,36 @@ class IndicatorPillowTest(TestCase):
         self.pillow.process_change(doc_to_change(sample_doc))
         self._check_sample_doc_state(expected_indicators)
 
+    def test_process_changes_chunk(self):
+        bad_ints = ['a', '', None]
+        changes = [
+            doc_to_change({
+                '_id': uuid.uuid4().hex,
+                'doc_type': 'CommCareCase',
+                'domain': 'user-reports',
+                'type': 'ticket',
+                'priority': bad_value
+            })
+            for bad_value in bad_ints
+        ]
+        retry_changes, change_exceptions = self.pillow.process_changes_chunk(changes)
+        self.assertEqual([], retry_changes)
+        self.assertEqual([], change_exceptions)
+        self.adapter.refresh_table()
+        self.assertEqual(len(bad_ints), self.adapter.get_query_object().count())
+
+    @patch('corehq.apps.userreports.specs.datetime')
+    def test_process_changes_chunk_filter_no_longer_pass(self, datetime_mock):
+        datetime_mock.utcnow.return_value = self.fake_time_now
+        sample_doc, expected_indicators = get_sample_doc_and_indicators(self.fake_time_now)
+        self.pillow.process_changes_chunk([doc_to_change(sample_doc)])
+        self._check_sample_doc_state(expected_indicators)
+
+        sample_doc['type'] = 'wrong_type'
+        self.pillow.process_changes_chunk([doc_to_change(sample_doc)])
+        self.adapter.refresh_table()
+        self.assertEqual(0, self.adapter.get_query_object().count())
+
     @patch('corehq.apps.userreports.specs.datetime')
     def test_not_relevant_to_domain(self, datetime_mock):
         datetime_mock.utcnow.return_value = self.fake_time_now
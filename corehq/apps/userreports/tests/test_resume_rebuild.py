@@ -1,7 +1,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from django.test import SimpleTestCase
-from corehq.apps.userreports.rebuild import DataSourceResumeHelper
+from corehq.apps.userreports.rebuild import DataSourceResumeHelper, RebuildSlice
 from corehq.apps.userreports.tests.utils import get_sample_data_source
 
 
@@ -39,3 +39,37 @@ class DataSourceResumeBuildTest(SimpleTestCase):
     def test_has_resume_info_true(self):
         self._resume_helper.add_completed_case_type_or_xmlns('type1')
         self.assertEqual(True, self._resume_helper.has_resume_info())
+
+    def test_slices(self):
+        slices = [RebuildSlice('type1', 'p1'), RebuildSlice('type1', 'p2'), RebuildSlice(None, None)]
+        self._resume_helper.set_slices(slices)
+        self.assertTrue(self._resume_helper.has_slice_info())
+        self.assertEqual(slices, self._resume_helper.get_slices())
+        self.assertFalse(self._resume_helper.all_slices_completed())
+
+        for rebuild_slice in slices:
+            self._resume_helper.add_completed_slice(rebuild_slice)
+        self.assertEqual(set(slices), self._resume_helper.get_completed_slices())
+        self.assertTrue(self._resume_helper.all_slices_completed())
+
+    def test_slice_pending(self):
+        rebuild_slice = RebuildSlice('type1', 'p1')
+        self.assertFalse(self._resume_helper.is_slice_pending(rebuild_slice))
+        self._resume_helper.set_slices([rebuild_slice])
+        self.assertTrue(self._resume_helper.is_slice_pending(rebuild_slice))
+        self._resume_helper.add_completed_slice(rebuild_slice)
+        self.assertFalse(self._resume_helper.is_slice_pending(rebuild_slice))
+        self._resume_helper.clear_resume_info()
+        self.assertFalse(self._resume_helper.is_slice_pending(rebuild_slice))
+
+    def test_claim_finish_once(self):
+        self._resume_helper.set_slices([RebuildSlice('type1', None)])
+        self.assertTrue(self._resume_helper.claim_finish())
+        self.assertFalse(self._resume_helper.claim_finish())
+
+    def test_clear_slice_info(self):
+        self._resume_helper.set_slices([RebuildSlice('type1', None)])
+        self._resume_helper.add_completed_slice(RebuildSlice('type1', None))
+        self._resume_helper.clear_resume_info()
+        self.assertFalse(self._resume_helper.has_slice_info())
+        self.assertEqual(set(), self._resume_helper.get_completed_slices())
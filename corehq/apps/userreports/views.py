@@ -1141,7 +1141,7 @@ def resume_building_data_source(request, domain, config_id):
                 config.display_name
             )
         )
-    elif not DataSourceResumeHelper(config).has_resume_info():
+    elif not _can_resume(DataSourceResumeHelper(config)):
         messages.warning(
             request,
             _('Table "{}" did not finish building but resume information is not available. '
@@ -1160,6 +1160,11 @@ def resume_building_data_source(request, domain, config_id):
     ))
 
 
+def _can_resume(resume_helper):
+    # sliced rebuilds keep their progress in the slice keys only
+    return resume_helper.has_resume_info() or resume_helper.has_slice_info()
+
+
 @toggles.USER_CONFIGURABLE_REPORTS.required_decorator()
 @require_POST
 def build_data_source_in_place(request, domain, config_id):
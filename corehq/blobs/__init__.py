@@ -18,10 +18,24 @@ def get_blob_db():
             db = _get_migrating_db(db, _get_fs_db(settings))
         elif getattr(settings, "BLOB_DB_MIGRATING_FROM_S3_TO_S3", False):
             db = _get_migrating_db(db, _get_s3_db(settings, "OLD_S3_BLOB_DB_SETTINGS"))
+        cache_config = getattr(settings, "BLOB_DB_CACHE_SETTINGS", None)
+        if cache_config is not None:
+            db = _get_caching_db(db, cache_config)
         _db.append(db)
     return _db[-1]
 
 
+def get_uncached_blob_db():
+    """Get the blob db without its local disk cache (if there is one)
+
+    Use this to find out which backend is configured, e.g. whether it is
+    a ``MigratingBlobDB``.
+    """
+    from .cachingdb import CachingBlobDB
+    db = get_blob_db()
+    return db.db if isinstance(db, CachingBlobDB) else db
+
+
 def _get_s3_db(settings, key="S3_BLOB_DB_SETTINGS"):
     from .s3db import S3BlobDB
     config = getattr(settings, key, None)
@@ -42,6 +56,17 @@ def _get_migrating_db(new_db, old_db):
     return MigratingBlobDB(new_db, old_db)
 
 
+def _get_caching_db(db, config):
+    """Wrap db with a local disk cache
+
+    :param config: dict with "cachedir" and optional "max_size" (bytes),
+    "max_age" (seconds) and "buckets" (buckets whose blobs never change)
+    keys.
+    """
+    from .cachingdb import CachingBlobDB
+    return CachingBlobDB(db, **config)
+
+
 class BlobInfo(namedtuple("BlobInfo", ["identifier", "length", "digest"])):
 
     @property
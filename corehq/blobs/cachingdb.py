@@ -0,0 +1,266 @@
+"""Local disk cache for blobs stored in another blob db
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict, namedtuple
+from hashlib import sha1
+from io import open
+from os.path import isabs, isdir, join
+from threading import RLock
+
+from corehq.blobs import DEFAULT_BUCKET
+from corehq.blobs.interface import AbstractBlobDB
+from corehq.util.datadog.gauges import datadog_counter
+import six
+from six.moves import zip
+
+CHUNK_SIZE = 4096
+DEFAULT_MAX_CACHE_SIZE = 1024 ** 3  # 1GB
+DEFAULT_MAX_CACHE_AGE = 24 * 60 * 60  # seconds
+# buckets of SQL form and case attachments, which are never changed
+# once written since each attachment is put with a new identifier
+DEFAULT_CACHED_BUCKETS = ("form", "case")
+
+
+class CachingBlobDB(AbstractBlobDB):
+    """Read-through cache on local disk in front of another blob db
+
+    Only blobs in ``buckets`` (or buckets nested inside them) are cached.
+    Since a cached copy is only invalidated in the process that deletes
+    or overwrites the blob, these must be buckets whose blobs never
+    change once written. Blobs in other buckets, e.g. caches that are
+    replaced under a fixed identifier, are always read from the backing
+    db.
+
+    Blobs are cached when they are read (``get``) and when they are
+    written (``put``). Cached blobs are evicted least recently used first
+    when the total size of the cache exceeds ``max_size`` bytes, and are
+    not served once they are older than ``max_age`` seconds. Blobs put
+    with a timeout are not cached since they will expire in the backing
+    db.
+
+    The cache index is kept in memory so each instance uses its own
+    directory inside ``cachedir``, which is removed on exit.
+    """
+
+    def __init__(self, db, cachedir, max_size=DEFAULT_MAX_CACHE_SIZE, max_age=DEFAULT_MAX_CACHE_AGE,
+                 buckets=DEFAULT_CACHED_BUCKETS):
+        assert isabs(cachedir), cachedir
+        self.db = db
+        self.buckets = tuple(buckets)
+        self.max_size = max_size
+        self.max_age = max_age
+        if not isdir(cachedir):
+            os.makedirs(cachedir)
+        self.cachedir = tempfile.mkdtemp(prefix="blobcache-", dir=cachedir)
+        self._entries = OrderedDict()  # least recently used first
+        self._size = 0
+        self._lock = RLock()
+        atexit.register(self.close)
+
+    def put(self, content, identifier, bucket=DEFAULT_BUCKET, timeout=None):
+        info = self.db.put(content, identifier, bucket=bucket, timeout=timeout)
+        self._cache_put(content, info, bucket, timeout)
+        return info
+
+    def bulk_put(self, items, timeout=None):
+        items = list(items)
+        infos = self.db.bulk_put(items, timeout=timeout)
+        for (content, identifier, bucket), info in zip(items, infos):
+            self._cache_put(content, info, bucket, timeout)
+        return infos
+
+    def get(self, identifier, bucket=DEFAULT_BUCKET):
+        if not self.is_cached_bucket(bucket):
+            return self.db.get(identifier, bucket)
+        path = self.db.get_path(identifier, bucket)
+        fileobj = self._get_cached(path)
+        if fileobj is not None:
+            datadog_counter('commcare.blobs.cache.hit')
+            return fileobj
+        datadog_counter('commcare.blobs.cache.miss')
+        with self.db.get(identifier, bucket) as content:
+            return self._add(path, content)
+
+    def bulk_get(self, keys):
+        blobs = {}
+        missing = []
+        uncached = []
+        for key in keys:
+            if not self.is_cached_bucket(key[1]):
+                uncached.append(key)
+                continue
+            fileobj = self._get_cached(self.db.get_path(*key))
+            if fileobj is not None:
+                blobs[key] = fileobj
+            else:
+                missing.append(key)
+        if blobs:
+            datadog_counter('commcare.blobs.cache.hit', value=len(blobs))
+        if missing:
+            datadog_counter('commcare.blobs.cache.miss', value=len(missing))
+        if missing or uncached:
+            missing_keys = set(missing)
+            for key, content in six.iteritems(self.db.bulk_get(missing + uncached)):
+                if key in missing_keys:
+                    with content:
+                        blobs[key] = self._add(self.db.get_path(*key), content)
+                else:
+                    blobs[key] = content
+        return blobs
+
+    def size(self, identifier, bucket=DEFAULT_BUCKET):
+        entry = self._get_entry(self.db.get_path(identifier, bucket))
+        if entry is not None:
+            return entry.size
+        return self.db.size(identifier, bucket)
+
+    def exists(self, identifier, bucket=DEFAULT_BUCKET):
+        if self._get_entry(self.db.get_path(identifier, bucket)) is not None:
+            return True
+        return self.db.exists(identifier, bucket)
+
+    def bulk_exists(self, keys):
+        existing = set()
+        missing = []
+        for key in keys:
+            if self._get_entry(self.db.get_path(*key)) is not None:
+                existing.add(key)
+            else:
+                missing.append(key)
+        if missing:
+            existing |= self.db.bulk_exists(missing)
+        return existing
+
+    def delete(self, *args, **kw):
+        identifier, bucket = self.get_args_for_delete(*args, **kw)
+        if identifier is None:
+            self._invalidate_bucket(self.db.get_path(bucket=bucket))
+        else:
+            self._invalidate(self.db.get_path(identifier, bucket))
+        return self.db.delete(*args, **kw)
+
+    def bulk_delete(self, paths):
+        for path in paths:
+            self._invalidate(path)
+        return self.db.bulk_delete(paths)
+
+    def copy_blob(self, content, info, bucket):
+        self._invalidate(self.db.get_path(info.identifier, bucket))
+        self.db.copy_blob(content, info, bucket)
+
+    def get_path(self, *args, **kw):
+        return self.db.get_path(*args, **kw)
+
+    def is_cached_bucket(self, bucket):
+        return any(bucket == b or bucket.startswith(b + "/") for b in self.buckets)
+
+    def close(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            if self.cachedir is not None:
+                shutil.rmtree(self.cachedir, ignore_errors=True)
+                self.cachedir = None
+
+    def _cache_put(self, content, info, bucket, timeout):
+        path = self.db.get_path(info.identifier, bucket)
+        self._invalidate(path)
+        if timeout is None and info.length <= self.max_size and self.is_cached_bucket(bucket):
+            try:
+                content.seek(0)
+            except (AttributeError, IOError, ValueError):
+                # content is not seekable: cache it on the next read
+                return
+            self._add(path, content).close()
+
+    def _get_entry(self, path):
+        """Get the cache entry for the given blob path or None if it is not cached"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            if time.time() - entry.timestamp > self.max_age:
+                self._remove(path)
+                datadog_counter('commcare.blobs.cache.evicted', tags=['reason:age'])
+                return None
+            # mark as most recently used
+            del self._entries[path]
+            self._entries[path] = entry
+            return entry
+
+    def _get_cached(self, path):
+        entry = self._get_entry(path)
+        if entry is None:
+            return None
+        try:
+            return open(entry.cache_path, "rb")
+        except IOError:
+            self._invalidate(path)
+            return None
+
+    def _add(self, path, content):
+        """Copy content into the cache
+
+        :returns: An open file with the cached content. Blobs larger than
+        the cache are not kept but the file can still be read.
+        """
+        fd, temp_path = tempfile.mkstemp(prefix="tmp-", dir=self.cachedir)
+        size = 0
+        with os.fdopen(fd, "wb") as fh:
+            while True:
+                chunk = content.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                fh.write(chunk)
+                size += len(chunk)
+        fileobj = open(temp_path, "rb")
+        if size > self.max_size:
+            os.remove(temp_path)
+            return fileobj
+
+        cache_path = join(self.cachedir, sha1(path.encode("utf-8")).hexdigest())
+        with self._lock:
+            os.rename(temp_path, cache_path)
+            if path in self._entries:
+                # the file was replaced by the rename
+                self._size -= self._entries.pop(path).size
+            self._entries[path] = _CacheEntry(cache_path, size, time.time())
+            self._size += size
+            self._evict()
+        return fileobj
+
+    def _evict(self):
+        evicted = 0
+        while self._size > self.max_size:
+            self._remove(next(iter(self._entries)))
+            evicted += 1
+        if evicted:
+            datadog_counter('commcare.blobs.cache.evicted', value=evicted, tags=['reason:size'])
+
+    def _invalidate(self, path):
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+
+    def _invalidate_bucket(self, bucket_path):
+        prefix = bucket_path.rstrip("/") + "/"
+        with self._lock:
+            for path in [p for p in self._entries if p.startswith(prefix)]:
+                self._remove(path)
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        self._size -= entry.size
+        try:
+            os.remove(entry.cache_path)
+        except OSError:
+            pass
+
+
+_CacheEntry = namedtuple("_CacheEntry", "cache_path size timestamp")
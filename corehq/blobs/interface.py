@@ -5,7 +5,7 @@ import re
 from abc import ABCMeta, abstractmethod
 
 from corehq.blobs import DEFAULT_BUCKET
-from corehq.blobs.exceptions import ArgumentError
+from corehq.blobs.exceptions import ArgumentError, NotFound
 import six
 
 SAFENAME = re.compile("^[a-z0-9_./{}-]+$", re.IGNORECASE)
@@ -100,6 +100,51 @@ class AbstractBlobDB(six.with_metaclass(ABCMeta, object)):
         """
         raise NotImplementedError
 
+    def bulk_get(self, keys):
+        """Get multiple blobs
+
+        The default implementation gets each blob in turn.
+
+        :param keys: An iterable of `(identifier, bucket)` tuples.
+        :returns: A dict mapping each `(identifier, bucket)` tuple to a
+        file-like object in binary read mode. Blobs that were not found
+        are omitted. The returned objects should be closed when finished
+        reading.
+        """
+        blobs = {}
+        for key in keys:
+            try:
+                blobs[key] = self.get(*key)
+            except NotFound:
+                pass
+        return blobs
+
+    def bulk_put(self, items, timeout=None):
+        """Put multiple blobs in persistent storage
+
+        The default implementation puts each blob in turn.
+
+        :param items: An iterable of `(content, identifier, bucket)`
+        tuples. See `put` for a description of each.
+        :param timeout: See `put`. This applies to all of the blobs.
+        :returns: A list of `BlobInfo` named tuples in the same order as
+        `items`.
+        """
+        return [
+            self.put(content, identifier, bucket=bucket, timeout=timeout)
+            for content, identifier, bucket in items
+        ]
+
+    def bulk_exists(self, keys):
+        """Check which of multiple blobs exist
+
+        The default implementation checks each blob in turn.
+
+        :param keys: An iterable of `(identifier, bucket)` tuples.
+        :returns: The set of `(identifier, bucket)` tuples that exist.
+        """
+        return {key for key in keys if self.exists(*key)}
+
     @abstractmethod
     def copy_blob(self, content, info, bucket):
         """Copy blob from other blob database
@@ -11,7 +11,7 @@ from django.core.management import BaseCommand, CommandError
 
 import corehq.apps.app_manager.models as apps
 from corehq.apps.export import models as exports
-from corehq.blobs import get_blob_db
+from corehq.blobs import get_uncached_blob_db
 from corehq.blobs.migratingdb import MigratingBlobDB
 from corehq.util.decorators import change_log_level
 from io import open
@@ -53,7 +53,7 @@ class Command(BaseCommand):
     @change_log_level('boto3', logging.WARNING)
     @change_log_level('botocore', logging.WARNING)
     def handle(self, files, migrate=False, **options):
-        blob_db = get_blob_db()
+        blob_db = get_uncached_blob_db()
         if not isinstance(blob_db, MigratingBlobDB):
             raise CommandError(
                 "Expected to find migrating blob db backend (got %r)" % blob_db)
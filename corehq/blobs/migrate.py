@@ -84,7 +84,7 @@ from corehq.apps.builds.models import CommCareBuild
 from corehq.apps.domain.models import Domain
 from corehq.apps.export import models as exports
 from corehq.apps.ota.models import DemoUserRestore
-from corehq.blobs import get_blob_db, DEFAULT_BUCKET, BlobInfo
+from corehq.blobs import get_blob_db, get_uncached_blob_db, DEFAULT_BUCKET, BlobInfo
 from corehq.blobs.exceptions import NotFound
 from corehq.blobs.migratingdb import MigratingBlobDB
 from corehq.blobs.mixin import BlobHelper, BlobMeta
@@ -270,7 +270,7 @@ class BlobDbBackendMigrator(BaseDocMigrator):
 
     def __init__(self, *args, **kw):
         super(BlobDbBackendMigrator, self).__init__(*args, **kw)
-        self.db = get_blob_db()
+        self.db = get_uncached_blob_db()
         self.total_blobs = 0
         self.not_found = 0
         self.bad_blobs_state = 0
@@ -291,23 +291,25 @@ class BlobDbBackendMigrator(BaseDocMigrator):
                 "doc_id": obj._id,
                 "error": "blobs != external_blobs",
             })
-        for name, meta in six.iteritems(obj.external_blobs):
-            self.total_blobs += 1
-            try:
-                content = self.db.old_db.get(meta.id, bucket)
-            except NotFound:
-                if not self.db.new_db.exists(meta.id, bucket):
-                    super(BlobDbBackendMigrator, self)._backup_doc({
-                        "doc_type": obj.doc_type,
-                        "doc_id": obj._id,
-                        "blob_identifier": meta.id,
-                        "blob_bucket": bucket,
-                        "error": "not found",
-                    })
-                    self.not_found += 1
-            else:
-                with content:
+        metas = list(obj.external_blobs.values())
+        self.total_blobs += len(metas)
+        contents = self.db.old_db.bulk_get([(meta.id, bucket) for meta in metas])
+        missing = [(meta.id, bucket) for meta in metas if (meta.id, bucket) not in contents]
+        already_migrated = self.db.new_db.bulk_exists(missing) if missing else set()
+        for meta in metas:
+            key = (meta.id, bucket)
+            if key in contents:
+                with contents[key] as content:
                     self.db.copy_blob(content, meta.info, bucket)
+            elif key not in already_migrated:
+                super(BlobDbBackendMigrator, self)._backup_doc({
+                    "doc_type": obj.doc_type,
+                    "doc_id": obj._id,
+                    "blob_identifier": meta.id,
+                    "blob_bucket": bucket,
+                    "error": "not found",
+                })
+                self.not_found += 1
         return True
 
     def processing_complete(self, skipped):
@@ -347,15 +349,16 @@ class BlobDbBackendExporter(BaseDocProcessor):
         bucket = obj._blobdb_bucket()
         assert obj.external_blobs and obj.external_blobs == obj.blobs, doc
         from_db = get_blob_db()
-        for name, meta in six.iteritems(obj.blobs):
-            self.total_blobs += 1
-            try:
-                content = from_db.get(meta.id, bucket)
-            except NotFound:
-                self.not_found += 1
-            else:
-                with content:
+        metas = list(obj.blobs.values())
+        self.total_blobs += len(metas)
+        contents = from_db.bulk_get([(meta.id, bucket) for meta in metas])
+        for meta in metas:
+            key = (meta.id, bucket)
+            if key in contents:
+                with contents[key] as content:
                     self.db.copy_blob(content, meta.info, bucket)
+            else:
+                self.not_found += 1
         return True
 
     def processing_complete(self, skipped):
@@ -41,6 +41,25 @@ class MigratingBlobDB(object):
         old_result = self.old_db.bulk_delete(paths)
         return new_result or old_result
 
+    def bulk_get(self, keys):
+        keys = list(keys)
+        blobs = self.new_db.bulk_get(keys)
+        missing = [key for key in keys if key not in blobs]
+        if missing:
+            blobs.update(self.old_db.bulk_get(missing))
+        return blobs
+
+    def bulk_put(self, *args, **kw):
+        return self.new_db.bulk_put(*args, **kw)
+
+    def bulk_exists(self, keys):
+        keys = list(keys)
+        existing = self.new_db.bulk_exists(keys)
+        missing = [key for key in keys if key not in existing]
+        if missing:
+            existing |= self.old_db.bulk_exists(missing)
+        return existing
+
     def get_path(self, *args, **kw):
         return self.new_db.get_path(*args, **kw)
 
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import os
 import weakref
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from io import UnsupportedOperation
 
@@ -21,6 +22,8 @@ from botocore.exceptions import ClientError
 from botocore.utils import fix_s3_host
 
 DEFAULT_S3_BUCKET = "blobdb"
+# maximum number of concurrent requests made by bulk operations
+MAX_BULK_WORKERS = 10
 
 
 class S3BlobDB(AbstractBlobDB):
@@ -58,19 +61,25 @@ class S3BlobDB(AbstractBlobDB):
         ], timing_buckets=(.03, .1, .3, 1, 3, 10, 30, 100), callback=record_long_request)
 
     def put(self, content, identifier, bucket=DEFAULT_BUCKET, timeout=None):
+        self._s3_bucket(create=True)
+        return self._put(content, identifier, bucket, timeout)
+
+    def _put(self, content, identifier, bucket, timeout):
+        # uses the (thread safe) client rather than the s3 bucket resource
+        # so it can be called from bulk_put worker threads
         path = self.get_path(identifier, bucket)
-        s3_bucket = self._s3_bucket(create=True)
+        client = self.db.meta.client
         if isinstance(content, BlobStream) and content.blob_db is self:
             source = {"Bucket": self.s3_bucket_name, "Key": content.blob_path}
-            s3_bucket.copy(source, path)
-            obj = s3_bucket.Object(path)
+            client.copy(source, self.s3_bucket_name, path)
+            obj = client.head_object(Bucket=self.s3_bucket_name, Key=path)
             # unfortunately cannot get content-md5 here
-            return BlobInfo(identifier, obj.content_length, None)
+            return BlobInfo(identifier, obj["ContentLength"], None)
         content.seek(0)
         content_md5 = get_content_md5(content)
         content_length = get_file_size(content)
         with self.report_timing('put', identifier, bucket):
-            s3_bucket.upload_fileobj(content, path)
+            client.upload_fileobj(content, self.s3_bucket_name, path)
         if timeout is not None:
             set_blob_expire_object(bucket, identifier, content_length, timeout)
         datadog_counter('commcare.blobs.added.count')
@@ -100,6 +109,69 @@ class S3BlobDB(AbstractBlobDB):
         except NotFound:
             return False
 
+    def bulk_get(self, keys):
+        """Get multiple blobs concurrently
+
+        The requests are made concurrently but, as with `get`, the content
+        of each blob is streamed when it is read rather than held in
+        memory. Each returned blob holds a connection open until it is
+        closed.
+        """
+        client = self.db.meta.client
+
+        def get_blob(key):
+            identifier, bucket = key
+            path = self.get_path(identifier, bucket)
+            try:
+                with maybe_not_found(throw=NotFound(identifier, bucket)), \
+                        self.report_timing('get', identifier, bucket):
+                    resp = client.get_object(Bucket=self.s3_bucket_name, Key=path)
+                return key, BlobStream(resp["Body"], self, path)
+            except NotFound:
+                return key, None
+
+        return {
+            key: content
+            for key, content in self._map_concurrently(get_blob, keys)
+            if content is not None
+        }
+
+    def bulk_put(self, items, timeout=None):
+        self._s3_bucket(create=True)
+
+        def put_blob(item):
+            content, identifier, bucket = item
+            return self._put(content, identifier, bucket, timeout)
+
+        return self._map_concurrently(put_blob, items)
+
+    def bulk_exists(self, keys):
+        client = self.db.meta.client
+
+        def blob_exists(key):
+            identifier, bucket = key
+            path = self.get_path(identifier, bucket)
+            try:
+                with maybe_not_found(throw=NotFound(identifier, bucket)), \
+                        self.report_timing('exists', identifier, bucket):
+                    client.head_object(Bucket=self.s3_bucket_name, Key=path)
+                return key, True
+            except NotFound:
+                return key, False
+
+        return {key for key, exists in self._map_concurrently(blob_exists, keys) if exists}
+
+    def _map_concurrently(self, func, items):
+        """Call ``func`` for each item using a bounded thread pool
+
+        :returns: A list of results in the same order as ``items``.
+        """
+        items = list(items)
+        if len(items) < 2:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(MAX_BULK_WORKERS, len(items))) as executor:
+            return list(executor.map(func, items))
+
     def delete(self, *args, **kw):
         identifier, bucket = self.get_args_for_delete(*args, **kw)
         path = self.get_path(identifier, bucket)
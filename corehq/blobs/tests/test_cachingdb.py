@@ -0,0 +1,153 @@
+from __future__ import unicode_literals
+from __future__ import absolute_import
+from io import BytesIO
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+import corehq.blobs.cachingdb as mod
+from corehq.blobs import DEFAULT_BUCKET
+from corehq.blobs.exceptions import NotFound
+from corehq.blobs.fsdb import FilesystemBlobDB
+from corehq.blobs.tests.test_fsdb import _BlobDBTests
+from corehq.blobs.tests.util import get_id
+from corehq.util.test_utils import patch_datadog
+
+CACHED_BUCKETS = [DEFAULT_BUCKET, "doc.cached", "doc.cached.bucket"]
+
+
+class TestCachingBlobDB(TestCase, _BlobDBTests):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCachingBlobDB, cls).setUpClass()
+        cls.rootdir = mkdtemp(prefix="blobdb")
+        cls.cachedir = mkdtemp(prefix="blobcache")
+        cls.fsdb = FilesystemBlobDB(cls.rootdir)
+        cls.db = mod.CachingBlobDB(cls.fsdb, cls.cachedir, buckets=CACHED_BUCKETS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+        cls.db = None
+        cls.fsdb = None
+        rmtree(cls.rootdir)
+        rmtree(cls.cachedir)
+        super(TestCachingBlobDB, cls).tearDownClass()
+
+    def test_get_caches_blob(self):
+        info = self.fsdb.put(BytesIO(b"content"), get_id())
+        with patch_datadog() as stats:
+            with self.db.get(info.identifier) as fh:
+                self.assertEqual(fh.read(), b"content")
+            self.fsdb.delete(info.identifier)
+            with self.db.get(info.identifier) as fh:
+                self.assertEqual(fh.read(), b"content")
+        self.assertEqual(sum(stats["commcare.blobs.cache.miss"]), 1)
+        self.assertEqual(sum(stats["commcare.blobs.cache.hit"]), 1)
+        self.assertTrue(self.db.exists(info.identifier))
+        self.assertEqual(self.db.size(info.identifier), 7)
+
+    def test_put_writes_through(self):
+        info = self.db.put(BytesIO(b"content"), get_id())
+        with self.fsdb.get(info.identifier) as fh:
+            self.assertEqual(fh.read(), b"content")
+        self.fsdb.delete(info.identifier)
+        with self.db.get(info.identifier) as fh:
+            self.assertEqual(fh.read(), b"content")
+
+    def test_put_with_timeout_not_cached(self):
+        identifier = get_id()
+        self.db.put(BytesIO(b"content"), identifier, timeout=60)
+        self.fsdb.delete(identifier)
+        with self.assertRaises(NotFound):
+            self.db.get(identifier)
+
+    def test_other_buckets_not_cached(self):
+        identifier = get_id()
+        self.db.put(BytesIO(b"content"), identifier, bucket="mutable")
+        with self.db.get(identifier, "mutable") as fh:
+            self.assertEqual(fh.read(), b"content")
+        # overwritten by another process
+        self.fsdb.put(BytesIO(b"changed"), identifier, bucket="mutable")
+        with self.db.get(identifier, "mutable") as fh:
+            self.assertEqual(fh.read(), b"changed")
+        blobs = self.db.bulk_get([(identifier, "mutable")])
+        with blobs[(identifier, "mutable")] as fh:
+            self.assertEqual(fh.read(), b"changed")
+
+    def test_nested_bucket_cached(self):
+        db = mod.CachingBlobDB(self.fsdb, self.cachedir, buckets=["form"])
+        info = self.fsdb.put(BytesIO(b"content"), get_id(), bucket="form/abc")
+        db.get(info.identifier, "form/abc").close()
+        self.fsdb.delete(info.identifier, "form/abc")
+        with db.get(info.identifier, "form/abc") as fh:
+            self.assertEqual(fh.read(), b"content")
+        self.assertFalse(db.is_cached_bucket("formplayer"))
+        db.close()
+
+    def test_delete_invalidates_cache(self):
+        info = self.db.put(BytesIO(b"content"), get_id())
+        self.assertTrue(self.db.delete(info.identifier))
+        with self.assertRaises(NotFound):
+            self.db.get(info.identifier)
+        self.assertFalse(self.db.exists(info.identifier))
+
+    def test_bulk_delete_invalidates_cache(self):
+        info = self.db.put(BytesIO(b"content"), get_id(), bucket="doc.cached")
+        paths = [self.db.get_path(info.identifier, "doc.cached")]
+        self.assertTrue(self.db.bulk_delete(paths))
+        with self.assertRaises(NotFound):
+            self.db.get(info.identifier, "doc.cached")
+
+    def test_delete_bucket_invalidates_cache(self):
+        info = self.db.put(BytesIO(b"content"), get_id(), bucket="doc.cached.bucket")
+        self.assertTrue(self.db.delete(bucket="doc.cached.bucket"))
+        with self.assertRaises(NotFound):
+            self.db.get(info.identifier, "doc.cached.bucket")
+
+
+class TestCachingBlobDBEviction(TestCase):
+
+    def setUp(self):
+        self.rootdir = mkdtemp(prefix="blobdb")
+        self.cachedir = mkdtemp(prefix="blobcache")
+        self.fsdb = FilesystemBlobDB(self.rootdir)
+
+    def tearDown(self):
+        rmtree(self.rootdir)
+        rmtree(self.cachedir)
+
+    def test_evict_by_size(self):
+        db = mod.CachingBlobDB(self.fsdb, self.cachedir, max_size=10, buckets=CACHED_BUCKETS)
+        first = db.put(BytesIO(b"content"), get_id())
+        with patch_datadog() as stats:
+            second = db.put(BytesIO(b"content"), get_id())
+        self.assertEqual(sum(stats["commcare.blobs.cache.evicted.reason:size"]), 1)
+        self.fsdb.delete(first.identifier)
+        self.fsdb.delete(second.identifier)
+        with self.assertRaises(NotFound):
+            db.get(first.identifier)
+        with db.get(second.identifier) as fh:
+            self.assertEqual(fh.read(), b"content")
+        db.close()
+
+    def test_blob_larger_than_cache(self):
+        db = mod.CachingBlobDB(self.fsdb, self.cachedir, max_size=4, buckets=CACHED_BUCKETS)
+        info = self.fsdb.put(BytesIO(b"content"), get_id())
+        with db.get(info.identifier) as fh:
+            self.assertEqual(fh.read(), b"content")
+        self.fsdb.delete(info.identifier)
+        with self.assertRaises(NotFound):
+            db.get(info.identifier)
+        db.close()
+
+    def test_evict_by_age(self):
+        db = mod.CachingBlobDB(self.fsdb, self.cachedir, max_age=-1, buckets=CACHED_BUCKETS)
+        info = db.put(BytesIO(b"content"), get_id())
+        self.fsdb.delete(info.identifier)
+        with patch_datadog() as stats:
+            with self.assertRaises(NotFound):
+                db.get(info.identifier)
+        self.assertEqual(sum(stats["commcare.blobs.cache.evicted.reason:age"]), 1)
+        db.close()
@@ -108,6 +108,32 @@ class _BlobDBTests(object):
 
         return paths
 
+    def test_bulk_get(self):
+        bucket = "doc.bulk.get"
+        infos = [self.db.put(BytesIO(content), get_id(), bucket=bucket) for content in [b"one", b"two"]]
+        missing = (get_id(), bucket)
+        keys = [(info.identifier, bucket) for info in infos] + [missing]
+        blobs = self.db.bulk_get(keys)
+        self.assertEqual(set(blobs), set(keys[:2]))
+        for key, content in zip(keys, [b"one", b"two"]):
+            with blobs[key] as fh:
+                self.assertEqual(fh.read(), content)
+
+    def test_bulk_put(self):
+        bucket = "doc.bulk.put"
+        items = [(BytesIO(b"one"), get_id(), bucket), (BytesIO(b"two"), get_id(), bucket)]
+        infos = self.db.bulk_put(items)
+        self.assertEqual([info.identifier for info in infos], [item[1] for item in items])
+        self.assertEqual([info.length for info in infos], [3, 3])
+        with self.db.get(items[1][1], bucket) as fh:
+            self.assertEqual(fh.read(), b"two")
+
+    def test_bulk_exists(self):
+        bucket = "doc.bulk.exists"
+        info = self.db.put(BytesIO(b"content"), get_id(), bucket=bucket)
+        key = (info.identifier, bucket)
+        self.assertEqual(self.db.bulk_exists([key, (get_id(), bucket)]), {key})
+
     def test_delete_bucket(self):
         bucket = join("doctype", "ys7v136b")
         info = self.db.put(BytesIO(b"content"), get_id(), bucket=bucket)
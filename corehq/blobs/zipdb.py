@@ -41,6 +41,16 @@ class ZipBlobDB(AbstractBlobDB):
         path = self.get_path(identifier, bucket)
         return path in self.zipfile.namelist()
 
+    def bulk_exists(self, keys):
+        names = set(self.zipfile.namelist())
+        return {key for key in keys if self.get_path(*key) in names}
+
+    def bulk_get(self, keys):
+        raise NotImplementedError
+
+    def bulk_put(self, items, timeout=None):
+        raise NotImplementedError
+
     def size(self, identifier, bucket=DEFAULT_BUCKET):
         raise NotImplementedError
 
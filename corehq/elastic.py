@@ -27,7 +27,7 @@ from corehq.pillows.mappings.sms_mapping import SMS_INDEX_INFO
 from corehq.pillows.mappings.user_mapping import USER_INDEX_INFO
 from corehq.pillows.mappings.xform_mapping import XFORM_INDEX_INFO
 from memoized import memoized
-from pillowtop.processors.elastic import send_to_elasticsearch as send_to_es
+from pillowtop.processors.elastic import ElasticsearchBulkWriter, send_to_elasticsearch as send_to_es
 import six
 from six.moves import range
 
@@ -123,6 +123,22 @@ def send_to_elasticsearch(index_name, doc, delete=False, es_merge_update=False):
     )
 
 
+def get_bulk_writer(name, **kwargs):
+    """
+    Get an ``ElasticsearchBulkWriter`` for sending many docs to elasticsearch.
+    Use this rather than calling ``send_to_elasticsearch`` in a loop:
+
+        with get_bulk_writer('my-task') as writer:
+            for doc in docs:
+                writer.index(ES_META['forms'], doc['_id'], doc)
+        for error in writer.error_collector.errors:
+            ...
+
+    :param kwargs: passed through to ``ElasticsearchBulkWriter``
+    """
+    return ElasticsearchBulkWriter(get_es_new(), name, **kwargs)
+
+
 def refresh_elasticsearch_index(index_name):
     es_meta = ES_META[index_name]
     es = get_es_new()
@@ -52,3 +52,17 @@ class CaseDBFixture(object):
             element.append(get_casedb_element(case))
 
         return ElementTree.tostring(element, encoding="utf-8")
+
+    @staticmethod
+    def get_case_xml(case):
+        return ElementTree.tostring(get_casedb_element(case), encoding="utf-8")
+
+    @classmethod
+    def get_fixture_from_case_xml(cls, case_xml_list):
+        """Same as ``fixture`` but for cases already rendered by ``get_case_xml``
+        """
+        return b''.join(
+            ['<results id="{}">'.format(cls.id).encode('utf-8')]
+            + list(case_xml_list)
+            + [b'</results>']
+        )
@@ -102,6 +102,9 @@ class OTARestoreUser(object):
     def get_fixture_data_items(self):
         raise NotImplementedError()
 
+    def get_fixture_data_item_owners(self):
+        raise NotImplementedError()
+
     def get_groups(self):
         raise NotImplementedError()
 
@@ -144,6 +147,9 @@ class OTARestoreWebUser(OTARestoreUser):
     def get_fixture_data_items(self):
         return []
 
+    def get_fixture_data_item_owners(self):
+        return []
+
     def get_groups(self):
         return []
 
@@ -182,6 +188,11 @@ class OTARestoreCommCareUser(OTARestoreUser):
 
         return FixtureDataItem.by_user(self._couch_user)
 
+    def get_fixture_data_item_owners(self):
+        from corehq.apps.fixtures.models import FixtureDataItem
+
+        return FixtureDataItem.get_owners_for_user(self._couch_user)
+
     def get_groups(self):
         # this call is only used by bihar custom code and can be removed when that project is inactive
         from corehq.apps.groups.models import Group
@@ -3,7 +3,6 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import logging
 import os
-import shutil
 import tempfile
 import uuid
 from io import BytesIO
@@ -102,11 +101,20 @@ class StockSettings(object):
 
 
 class RestoreContent(object):
+    """
+    Writes the restore payload to a single temporary file in one pass.
+
+    When the item count is requested the header is written up front with a
+    fixed-width blank slot which is patched in place once the count is known,
+    so the body never needs to be copied to a second file.
+    """
     start_tag_template = (
         b'<OpenRosaResponse xmlns="http://openrosa.org/http/response"%(items)s>'
         b'<message nature="%(nature)s">Successfully restored account %(username)s!</message>'
     )
     items_template = b' items="%s"'
+    # large enough for any item count, the unused part is padded with whitespace
+    items_slot_width = len(items_template % (b'9' * 12))
     closing_tag = b'</OpenRosaResponse>'
 
     def __init__(self, username=None, items=False):
@@ -116,10 +124,12 @@ class RestoreContent(object):
 
     def __enter__(self):
         self.response_body = tempfile.TemporaryFile('w+b')
+        self._write_start_tag(b' ' * self.items_slot_width if self.items else b'')
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.response_body.close()
+        if self.response_body is not None:
+            self.response_body.close()
 
     def append(self, xml_element):
         self.num_items += 1
@@ -134,29 +144,33 @@ class RestoreContent(object):
         for element in iterable:
             self.append(element)
 
-    def _write_to_file(self, fileobj):
-        # Add 1 to num_items to account for message element
-        items = (self.items_template % (self.num_items + 1)) if self.items else b''
-        fileobj.write(self.start_tag_template % {
+    def _write_start_tag(self, items):
+        self.response_body.write(self.start_tag_template % {
             b"items": items,
             b"username": self.username.encode("utf8"),
             b"nature": ResponseNature.OTA_RESTORE_SUCCESS.encode("utf8"),
         })
 
-        self.response_body.seek(0)
-        shutil.copyfileobj(self.response_body, fileobj)
-
-        fileobj.write(self.closing_tag)
-
     def get_fileobj(self):
-        fileobj = tempfile.TemporaryFile('w+b')
+        """
+        Finish the payload and hand over the file containing it. The caller
+        is responsible for closing the returned file.
+        """
+        fileobj = self.response_body
         try:
-            self._write_to_file(fileobj)
+            fileobj.write(self.closing_tag)
+            if self.items:
+                # Add 1 to num_items to account for message element
+                items = self.items_template % (self.num_items + 1)
+                fileobj.seek(0)
+                self._write_start_tag(items.ljust(self.items_slot_width))
             fileobj.seek(0)
-            return fileobj
         except:
             fileobj.close()
             raise
+        finally:
+            self.response_body = None
+        return fileobj
 
 
 class RestoreResponse(object):
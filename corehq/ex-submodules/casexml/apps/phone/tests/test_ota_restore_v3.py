@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 from django.test import TestCase
 from django.test.testcases import SimpleTestCase
 from django.test.utils import override_settings
+from lxml import etree
 from corehq.apps.users.dbaccessors.all_commcare_users import delete_all_users
 from corehq.apps.domain.models import Domain
 from casexml.apps.case.tests.util import (
@@ -49,6 +50,9 @@ class TestRestoreContent(SimpleTestCase):
 
     def _expected(self, username, body, items=None):
         items_text = (b' items="%s"' % items) if items is not None else b''
+        if items is not None:
+            # the item count is written into a fixed-width slot padded with whitespace
+            items_text = items_text.ljust(RestoreContent.items_slot_width)
         return (
             b'<OpenRosaResponse xmlns="http://openrosa.org/http/response"%(items)s>'
             b'<message nature="ota_restore_success">Successfully restored account %(username)s!</message>'
@@ -77,3 +81,17 @@ class TestRestoreContent(SimpleTestCase):
             response.append(body)
             with response.get_fileobj() as fileobj:
                 self.assertEqual(expected, fileobj.read())
+
+    def test_items_header_is_valid_xml(self):
+        with RestoreContent('user1', True) as response:
+            response.extend([b'<elem>data0</elem>', b'<elem>data1</elem>'])
+            with response.get_fileobj() as fileobj:
+                xml = etree.fromstring(fileobj.read())
+        self.assertEqual('3', xml.get('items'))
+
+    def test_fileobj_outlives_context(self):
+        with RestoreContent('user1', False) as response:
+            response.append(b'<elem>data0</elem>')
+            fileobj = response.get_fileobj()
+        with fileobj:
+            self.assertEqual(self._expected('user1', b'<elem>data0</elem>'), fileobj.read())
@@ -84,6 +84,17 @@ class CsvFileWriterTests(SimpleTestCase):
         file_start = writer.get_file().read(6)
         self.assertEqual(file_start, BOM_UTF8 + b'100')
 
+    def test_csv_file_writer_rows(self):
+        writer = CsvFileWriter()
+        writer.open('Spam')
+        writer.write_row(['ham', 'spam'])
+        writer.write_rows([['hám', 1], [b'eggs', '']])
+        writer.finish()
+        self.assertEqual(
+            writer.get_file().read(),
+            BOM_UTF8 + 'ham,spam\r\nhám,1\r\neggs,\r\n'.encode('utf-8')
+        )
+
 
 class HtmlExportWriterTests(SimpleTestCase):
 
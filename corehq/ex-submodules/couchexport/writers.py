@@ -26,6 +26,12 @@ from six.moves import zip
 from six.moves import map
 
 
+# Source: http://stackoverflow.com/questions/1707890/fast-way-to-filter-illegal-xml-unicode-chars-in-python
+XML_DIRTY_CHARS = re.compile(
+    '[\x00-\x08\x0b-\x1f\x7f-\x84\x86-\x9f\ud800-\udfff\ufdd0-\ufddf\ufffe-\uffff]'
+)
+
+
 class UniqueHeaderGenerator(object):
 
     def __init__(self, max_column_size=None):
@@ -94,6 +100,14 @@ class ExportFileWriter(object):
     def write_row(self, row):
         raise NotImplementedError
 
+    def write_rows(self, rows):
+        """
+        Write a block of rows. Subclasses that can write many rows more
+        efficiently than one at a time should override this.
+        """
+        for row in rows:
+            self.write_row(row)
+
     def _end_file(self):
         pass
 
@@ -115,11 +129,14 @@ class CsvFileWriter(ExportFileWriter):
         self._file.write(BOM_UTF8)
 
     def write_row(self, row):
+        self.write_rows([row])
+
+    def write_rows(self, rows):
         buffer = io.StringIO()
         csvwriter = csv.writer(buffer, csv.excel)
-        csvwriter.writerow([
-            col.decode('utf-8') if isinstance(col, six.binary_type) else col
-            for col in row
+        csvwriter.writerows([
+            [col.decode('utf-8') if isinstance(col, six.binary_type) else col for col in row]
+            for row in rows
         ])
         self._file.write(buffer.getvalue().encode('utf-8'))
 
@@ -240,6 +257,14 @@ class ExportWriter(object):
         """
         return self._write_row(table_index, headers)
 
+    def write_rows(self, table_index, rows):
+        """
+        Write a block of rows to a single table. Unlike ``write`` this does not
+        touch the ids of the rows, so it should only be used for rows without ids.
+        """
+        assert self._isopen
+        return self._write_rows(table_index, rows)
+
     def close(self):
         """
         Close any open file references, do any cleanup.
@@ -257,6 +282,10 @@ class ExportWriter(object):
     def _write_row(self, sheet_index, row):
         raise NotImplementedError
 
+    def _write_rows(self, sheet_index, rows):
+        for row in rows:
+            self._write_row(sheet_index, row)
+
     def _close(self):
         raise NotImplementedError
 
@@ -283,18 +312,21 @@ class OnDiskExportWriter(ExportWriter):
         writer.open(table_title)
         self.table_names[table_index] = table_title
 
-    def _write_row(self, sheet_index, row):
+    @staticmethod
+    def _transform(val):
+        if isinstance(val, six.text_type):
+            return val.encode("utf8")
+        elif val is None:
+            return ''
+        else:
+            return val
 
-        def _transform(val):
-            if isinstance(val, six.text_type):
-                return val.encode("utf8")
-            elif val is None:
-                return ''
-            else:
-                return val
+    def _write_row(self, sheet_index, row):
+        self._write_rows(sheet_index, [row])
 
-        row = list(map(_transform, row))
-        self.tables[sheet_index].write_row(row)
+    def _write_rows(self, sheet_index, rows):
+        transform = self._transform
+        self.tables[sheet_index].write_rows([list(map(transform, row)) for row in rows])
 
     def _close(self):
         """
@@ -379,30 +411,31 @@ class Excel2007ExportWriter(ExportWriter):
         self.tables[table_index] = sheet
         self.table_indices[table_index] = 0
 
-    def _write_row(self, sheet_index, row):
-        sheet = self.tables[sheet_index]
+    @staticmethod
+    def _get_write_value(value):
+        if isinstance(value, six.integer_types + (float,)):
+            return value
+        if isinstance(value, str):
+            value = six.text_type(value, encoding="utf-8")
+        elif value is not None:
+            value = six.text_type(value)
+        else:
+            value = ''
+        return XML_DIRTY_CHARS.sub('?', value)
 
-        # Source: http://stackoverflow.com/questions/1707890/fast-way-to-filter-illegal-xml-unicode-chars-in-python
-        dirty_chars = re.compile(
-            '[\x00-\x08\x0b-\x1f\x7f-\x84\x86-\x9f\ud800-\udfff\ufdd0-\ufddf\ufffe-\uffff]'
-        )
+    def _write_row(self, sheet_index, row):
+        self._write_rows(sheet_index, [row])
 
-        def get_write_value(value):
-            if isinstance(value, six.integer_types + (float,)):
-                return value
-            if isinstance(value, str):
-                value = six.text_type(value, encoding="utf-8")
-            elif value is not None:
-                value = six.text_type(value)
-            else:
-                value = ''
-            return dirty_chars.sub('?', value)
-
-        cells = [WriteOnlyCell(sheet, get_write_value(val)) for val in row]
-        if self.format_as_text:
-            for cell in cells:
-                cell.number_format = numbers.FORMAT_TEXT
-        sheet.append(cells)
+    def _write_rows(self, sheet_index, rows):
+        sheet = self.tables[sheet_index]
+        get_write_value = self._get_write_value
+        format_as_text = self.format_as_text
+        for row in rows:
+            cells = [WriteOnlyCell(sheet, get_write_value(val)) for val in row]
+            if format_as_text:
+                for cell in cells:
+                    cell.number_format = numbers.FORMAT_TEXT
+            sheet.append(cells)
 
     def _close(self):
         """
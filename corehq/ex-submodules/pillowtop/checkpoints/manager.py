@@ -131,7 +131,8 @@ class PillowCheckpointEventHandler(ChangeEventHandler):
         self.checkpoint_callback = checkpoint_callback
 
     def should_update_checkpoint(self, context):
-        frequency_hit = context.changes_seen % self.checkpoint_frequency == 0
+        # true if a multiple of checkpoint_frequency was reached in the last processing step
+        frequency_hit = context.changes_seen % self.checkpoint_frequency < context.last_step_size
         time_hit = False
         if self.max_checkpoint_delay:
             seconds_since_last_update = (datetime.utcnow() - self.last_update).total_seconds()
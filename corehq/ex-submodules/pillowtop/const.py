@@ -1,3 +1,4 @@
 
 CHECKPOINT_FREQUENCY = 100
 CHECKPOINT_MIN_WAIT = 300
+CHUNK_PROCESSING_TIMEOUT = 5  # seconds
@@ -11,11 +11,12 @@ from corehq.util.datadog.gauges import datadog_counter, datadog_gauge, datadog_h
 from corehq.util.timer import TimingContext
 from dimagi.utils.logging import notify_exception
 from kafka.common import TopicAndPartition
-from pillowtop.const import CHECKPOINT_MIN_WAIT
+from pillowtop.const import CHECKPOINT_MIN_WAIT, CHUNK_PROCESSING_TIMEOUT
 from pillowtop.dao.exceptions import DocumentMissingError
 from pillowtop.utils import force_seq_int
 from pillowtop.exceptions import PillowtopCheckpointReset
 from pillowtop.logger import pillow_logging
+from pillowtop.processors.interface import BulkPillowProcessor
 import six
 
 
@@ -37,6 +38,9 @@ class PillowRuntimeContext(object):
 
     def __init__(self, changes_seen=0):
         self.changes_seen = changes_seen
+        # number of changes processed in the last processing step. This is 1 unless
+        # the pillow is processing changes in chunks.
+        self.last_step_size = 1
 
 
 class PillowBase(six.with_metaclass(ABCMeta, object)):
@@ -48,6 +52,13 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
     # set to true to disable saving pillow retry errors
     retry_errors = True
 
+    # set to a positive number to process changes in chunks of that size
+    # (requires support from the pillow, see ``process_changes_chunk``)
+    processor_chunk_size = 0
+
+    # max number of seconds to hold on to a partial chunk before processing it
+    processor_chunk_timeout = CHUNK_PROCESSING_TIMEOUT
+
     @abstractproperty
     def pillow_id(self):
         """
@@ -113,38 +124,134 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
         """
         context = PillowRuntimeContext(changes_seen=0)
         try:
-            for change in self.get_change_feed().iter_changes(since=since or None, forever=forever):
-                if change:
-                    context.changes_seen += 1
-                    self.process_with_error_handling(change, context)
-                else:
-                    self._update_checkpoint(None, None)
+            if self.processor_chunk_size:
+                self._process_changes_in_chunks(since, forever, context)
+            else:
+                for change in self.get_change_feed().iter_changes(since=since or None, forever=forever):
+                    if change:
+                        context.changes_seen += 1
+                        self.process_with_error_handling(change, context)
+                    else:
+                        self._update_checkpoint(None, None)
         except PillowtopCheckpointReset:
             self.process_changes(since=self.get_last_checkpoint_sequence(), forever=forever)
 
+    def _process_changes_in_chunks(self, since, forever, context):
+        """
+        Accumulate changes until ``processor_chunk_size`` changes have been seen or
+        ``processor_chunk_timeout`` seconds have passed since the chunk was started
+        and then process them all at once. The checkpoint is only updated once the
+        whole chunk has been processed.
+
+        Note that the timeout is only checked when the change feed yields, so a feed
+        that blocks waiting for changes will hold on to a partial chunk until the
+        next change (or heartbeat) arrives.
+        """
+        changes_chunk = []
+        chunk_started = datetime.utcnow()
+        for change in self.get_change_feed().iter_changes(since=since or None, forever=forever):
+            if change:
+                if not changes_chunk:
+                    chunk_started = datetime.utcnow()
+                changes_chunk.append(change)
+
+            chunk_full = len(changes_chunk) >= self.processor_chunk_size
+            chunk_timed_out = (
+                changes_chunk
+                and (datetime.utcnow() - chunk_started).total_seconds() >= self.processor_chunk_timeout
+            )
+            if chunk_full or chunk_timed_out:
+                self._batch_process_with_error_handling(changes_chunk, context)
+                changes_chunk = []
+            elif not change:
+                self._update_checkpoint(None, None)
+
+        if changes_chunk:
+            self._batch_process_with_error_handling(changes_chunk, context)
+
     def process_with_error_handling(self, change, context):
         timer = TimingContext()
+        if self._process_change_with_error_handling(change, timer):
+            self._update_checkpoint(change, context)
+            self._record_change_success_in_datadog(change)
+        self._record_change_in_datadog(change, timer)
+
+    def _process_change_with_error_handling(self, change, timer):
+        """
+        :returns: ``True`` if the change was processed successfully
+        """
         try:
             with timer:
                 self.process_change(change)
         except Exception as ex:
-            try:
-                handle_pillow_error(self, change, ex)
-            except Exception as e:
-                notify_exception(None, 'processor error in pillow {} {}'.format(
-                    self.get_name(), e,
-                ))
-                self._record_change_exception_in_datadog(change)
-                raise
-        else:
-            self._update_checkpoint(change, context)
-            self._record_change_success_in_datadog(change)
-        self._record_change_in_datadog(change, timer)
+            self._handle_pillow_error(change, ex)
+            return False
+        return True
+
+    def _batch_process_with_error_handling(self, changes_chunk, context):
+        """
+        Process a chunk of changes with ``process_changes_chunk``.
+
+        Changes that the chunk processing asks to retry are processed again one at a time.
+        Changes that failed are sent to ``PillowError`` in the same way as failures
+        in ``process_with_error_handling``. Each change is counted once in datadog,
+        with its final outcome.
+        """
+        timer = TimingContext()
+        try:
+            with timer:
+                retry_changes, change_exceptions = self.process_changes_chunk(changes_chunk)
+        except Exception as ex:
+            notify_exception(None, 'chunk processing error in pillow {} {}'.format(
+                self.get_name(), ex,
+            ))
+            retry_changes, change_exceptions = changes_chunk, []
+
+        failed_changes = set()
+        for change, exception in change_exceptions:
+            failed_changes.add(id(change))
+            self._handle_pillow_error(change, exception)
+
+        for change in retry_changes:
+            if not self._process_change_with_error_handling(change, TimingContext()):
+                failed_changes.add(id(change))
+
+        for change in changes_chunk:
+            if id(change) not in failed_changes:
+                self._record_change_success_in_datadog(change)
+            self._record_change_in_datadog(change)
+
+        context.changes_seen += len(changes_chunk)
+        context.last_step_size = len(changes_chunk)
+        self._update_checkpoint(changes_chunk[-1], context)
+        context.last_step_size = 1
+        self._record_chunk_in_datadog(changes_chunk, timer)
+
+    def _handle_pillow_error(self, change, exception):
+        try:
+            handle_pillow_error(self, change, exception)
+        except Exception as e:
+            notify_exception(None, 'processor error in pillow {} {}'.format(
+                self.get_name(), e,
+            ))
+            self._record_change_exception_in_datadog(change)
+            raise
 
     @abstractmethod
     def process_change(self, change):
         pass
 
+    def process_changes_chunk(self, changes_chunk):
+        """
+        Process a list of changes at once. Only called when ``processor_chunk_size`` is set.
+
+        :return: A tuple of ``(retry_changes, change_exceptions)`` where ``retry_changes``
+                 is a list of changes that should be processed again individually and
+                 ``change_exceptions`` is a list of ``(change, exception)`` tuples for
+                 changes that failed.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def fire_change_processed_event(self, change, context):
         """
@@ -183,9 +290,14 @@ class PillowBase(six.with_metaclass(ABCMeta, object)):
                 _topic_for_ddog(topic),
             ])
 
-    def _record_change_in_datadog(self, change, timer):
+    def _record_change_in_datadog(self, change, timer=None):
         self.__record_change_metric_in_datadog('commcare.change_feed.changes.count', change, timer)
 
+    def _record_chunk_in_datadog(self, changes_chunk, timer):
+        tags = ['pillow_name:{}'.format(self.get_name())]
+        datadog_histogram('commcare.change_feed.chunk_size', len(changes_chunk), tags=tags)
+        datadog_histogram('commcare.change_feed.chunked_processing_time', timer.duration, tags=tags)
+
     def _record_change_success_in_datadog(self, change):
         self.__record_change_metric_in_datadog('commcare.change_feed.changes.success', change)
 
@@ -231,7 +343,7 @@ class ConstructedPillow(PillowBase):
     """
 
     def __init__(self, name, checkpoint, change_feed, processor,
-                 change_processed_event_handler=None):
+                 change_processed_event_handler=None, processor_chunk_size=0):
         self._name = name
         self._checkpoint = checkpoint
         self._change_feed = change_feed
@@ -241,6 +353,7 @@ class ConstructedPillow(PillowBase):
             self.processors = [processor]
 
         self._change_processed_event_handler = change_processed_event_handler
+        self.processor_chunk_size = processor_chunk_size
 
     @property
     def pillow_id(self):
@@ -263,12 +376,48 @@ class ConstructedPillow(PillowBase):
         for processor in self.processors:
             processor.process_change(self, change)
 
+    def process_changes_chunk(self, changes_chunk):
+        retry_changes = []
+        change_exceptions = []
+        for processor in self.processors:
+            if isinstance(processor, BulkPillowProcessor):
+                retry, exceptions = processor.process_changes_chunk(self, changes_chunk)
+                retry_changes.extend(retry)
+                change_exceptions.extend(exceptions)
+            else:
+                for change in changes_chunk:
+                    try:
+                        processor.process_change(self, change)
+                    except Exception as e:
+                        change_exceptions.append((change, e))
+
+        # a change only needs to be handled once even if several processors failed on it
+        retry_changes = _unique_changes(retry_changes)
+        retry_ids = {id(change) for change in retry_changes}
+        seen = set()
+        unique_exceptions = []
+        for change, exception in change_exceptions:
+            if id(change) not in retry_ids and id(change) not in seen:
+                seen.add(id(change))
+                unique_exceptions.append((change, exception))
+        return retry_changes, unique_exceptions
+
     def fire_change_processed_event(self, change, context):
         if self._change_processed_event_handler is not None:
             return self._change_processed_event_handler.fire_change_processed(change, context)
         return False
 
 
+def _unique_changes(changes):
+    seen = set()
+    unique = []
+    for change in changes:
+        if id(change) not in seen:
+            seen.add(id(change))
+            unique.append(change)
+    return unique
+
+
 def handle_pillow_error(pillow, change, exception):
     from pillow_retry.models import PillowError
     error_id = e = None
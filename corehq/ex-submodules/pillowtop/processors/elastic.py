@@ -2,14 +2,26 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import math
 import time
+from collections import OrderedDict
 
-from elasticsearch.exceptions import RequestError, ConnectionError, NotFoundError, ConflictError
+import simplejson
+
+from elasticsearch.exceptions import RequestError, ConnectionError, NotFoundError, ConflictError, TransportError
+from six.moves import range
+
+from corehq.util.datadog.gauges import datadog_counter, datadog_histogram
 
 from pillowtop.dao.exceptions import DocumentNotFoundError
-from pillowtop.utils import ensure_matched_revisions, ensure_document_exists
+from pillowtop.utils import (
+    ChangeError,
+    ErrorCollector,
+    bulk_fetch_changes_docs,
+    ensure_document_exists,
+    ensure_matched_revisions,
+)
 from pillowtop.exceptions import PillowtopIndexingError
 from pillowtop.logger import pillow_logging
-from .interface import PillowProcessor
+from .interface import BulkPillowProcessor
 
 
 def identity(x):
@@ -17,9 +29,13 @@ def identity(x):
 
 RETRY_INTERVAL = 2  # seconds, exponentially increasing
 MAX_RETRIES = 4  # exponential factor threshold for alerts
+MAX_BULK_PAYLOAD_SIZE = 10 ** 7  # ~10 MB
+DEFAULT_BULK_DOCS = 1000
+# too many requests, service unavailable
+REJECTED_STATUS_CODES = (429, 503)
 
 
-class ElasticProcessor(PillowProcessor):
+class ElasticProcessor(BulkPillowProcessor):
 
     def __init__(self, elasticsearch, index_info, doc_prep_fn=None, doc_filter_fn=None):
         self.doc_filter_fn = doc_filter_fn
@@ -56,6 +72,50 @@ class ElasticProcessor(PillowProcessor):
             update=self._doc_exists(change.id),
         )
 
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        Fetch all the documents in the chunk from their document stores in bulk and
+        send them to elasticsearch using the ``_bulk`` API.
+
+        Changes that fail before being sent to elasticsearch or that are rejected by
+        elasticsearch (after retrying) are returned as exceptions.
+        """
+        bulk_fetch_changes_docs(changes_chunk)
+
+        error_collector = ErrorCollector()
+        # only the latest change for each document needs to be sent
+        changes_by_id = OrderedDict()
+        for change in changes_chunk:
+            changes_by_id.pop(change.id, None)
+            changes_by_id[change.id] = change
+
+        writer = ElasticsearchBulkWriter(
+            self.elasticsearch, pillow_instance.get_name(), max_docs=None, error_collector=error_collector
+        )
+        for change in changes_by_id.values():
+            try:
+                self._add_to_bulk_writer(writer, change)
+            except Exception as e:
+                error_collector.add_error(ChangeError(change, e))
+        writer.flush()
+
+        return [], [(error.change, error.exception) for error in error_collector.errors]
+
+    def _add_to_bulk_writer(self, writer, change):
+        if change.deleted and change.id:
+            writer.delete(self.index_info, change.id, key=change)
+            return
+
+        doc = change.get_document()
+
+        ensure_document_exists(change)
+        ensure_matched_revisions(change)
+
+        if doc is None or (self.doc_filter_fn and self.doc_filter_fn(doc)):
+            return
+
+        writer.index(self.index_info, change.id, self.doc_transform_fn(doc), key=change)
+
     def _doc_exists(self, doc_id):
         return self.elasticsearch.exists(self.index_info.index, self.index_info.type, doc_id)
 
@@ -64,6 +124,212 @@ class ElasticProcessor(PillowProcessor):
             self.elasticsearch.delete(self.index_info.index, self.index_info.type, doc_id)
 
 
+class ElasticsearchBulkWriter(object):
+    """
+    Buffer index, update and delete actions and send them to elasticsearch
+    with the ``_bulk`` API.
+
+    The buffer is flushed when it holds ``max_docs`` actions, when adding an
+    action would make the payload bigger than ``max_bytes`` or, if
+    ``flush_interval`` is set, when an action is added more than
+    ``flush_interval`` seconds after the oldest buffered action. Call ``flush``
+    once all actions have been added (or use the writer as a context manager).
+
+    Requests that fail are retried with exponential backoff and items that
+    elasticsearch rejects because it is overloaded are retried individually.
+    Items that still fail are added to ``error_collector`` as
+    ``ChangeError(key, exception)`` where ``key`` is the object passed when
+    adding the action (the doc ID by default).
+    """
+
+    def __init__(self, elasticsearch, name, max_docs=DEFAULT_BULK_DOCS, max_bytes=MAX_BULK_PAYLOAD_SIZE,
+                 flush_interval=None, retries=MAX_RETRIES, error_collector=None):
+        self.elasticsearch = elasticsearch
+        self.name = name
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.error_collector = error_collector if error_collector is not None else ErrorCollector()
+        self.failed_requests = 0
+        self._actions = []  # (key, payload lines)
+        self._size = 0
+        self._first_action_time = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+
+    def index(self, index_info, doc_id, doc, key=None):
+        self._add(doc_id if key is None else key, [{"index": _get_action_meta(index_info, doc_id)}, doc])
+
+    def update(self, index_info, doc_id, doc, key=None):
+        """Merge ``doc`` into the existing document"""
+        self._add(doc_id if key is None else key, [
+            {"update": dict(_get_action_meta(index_info, doc_id), _retry_on_conflict=2)},
+            {"doc": doc},
+        ])
+
+    def delete(self, index_info, doc_id, key=None):
+        self._add(doc_id if key is None else key, [{"delete": _get_action_meta(index_info, doc_id)}])
+
+    def flush(self):
+        actions = self._actions
+        self._actions = []
+        self._size = 0
+        self._first_action_time = None
+
+        payload_actions = []
+        payload = b''
+        for key, lines in actions:
+            if payload and len(payload) + len(lines) > self.max_bytes:
+                self._send(payload_actions, payload)
+                payload_actions = []
+                payload = b''
+            payload_actions.append((key, lines))
+            payload += lines
+        if payload:
+            self._send(payload_actions, payload)
+
+    def _add(self, key, action):
+        lines = b''.join(simplejson.dumps(line).encode('utf-8') + b'\n' for line in action)
+        if self._actions and self._size + len(lines) > self.max_bytes:
+            self.flush()
+        if self._first_action_time is None:
+            self._first_action_time = time.time()
+        self._actions.append((key, lines))
+        self._size += len(lines)
+
+        if (
+            (self.max_docs and len(self._actions) >= self.max_docs)
+            or (self.flush_interval is not None and time.time() - self._first_action_time >= self.flush_interval)
+        ):
+            self.flush()
+
+    def _send(self, actions, payload):
+        tags = ['bulk_writer:{}'.format(self.name)]
+        keys = [key for key, lines in actions]
+        start = time.time()
+        try:
+            response = self._bulk_with_retries(payload)
+        except TransportError as e:
+            self.failed_requests += 1
+            datadog_counter('commcare.elasticsearch.bulk.failed_requests', tags=tags)
+            datadog_counter('commcare.elasticsearch.bulk.errors', value=len(keys), tags=tags)
+            for key in keys:
+                self.error_collector.add_error(ChangeError(key, PillowtopIndexingError(
+                    "[{}] Bulk request failed: {}".format(self.name, e)
+                )))
+            return
+
+        datadog_histogram('commcare.elasticsearch.bulk.request_time', time.time() - start, tags=tags)
+        datadog_histogram('commcare.elasticsearch.bulk.bytes', len(payload), tags=tags)
+        datadog_counter('commcare.elasticsearch.bulk.docs', value=len(keys), tags=tags)
+        if not response.get('errors'):
+            return
+
+        rejected = _get_rejected_actions(response, actions)
+        if rejected:
+            pillow_logging.warning("[%s] %s bulk items rejected. Retrying.", self.name, len(rejected))
+            datadog_counter('commcare.elasticsearch.bulk.rejected', value=len(rejected), tags=tags)
+        errors = _get_bulk_item_errors(response, keys)
+        if rejected:
+            errors.extend(self._retry_rejected(rejected))
+
+        if errors:
+            datadog_counter('commcare.elasticsearch.bulk.errors', value=len(errors), tags=tags)
+        for key, exception in errors:
+            self.error_collector.add_error(ChangeError(key, exception))
+
+    def _bulk_with_retries(self, payload):
+        tries = 0
+        while True:
+            try:
+                return self.elasticsearch.bulk(payload)
+            except TransportError as e:
+                # RequestError (400) means the payload is bad so there is no point retrying
+                tries += 1
+                if isinstance(e, RequestError) or tries >= self.retries:
+                    raise
+                pillow_logging.error("[%s] bulk request error %s attempt %d/%d" % (
+                    self.name, e, tries, self.retries))
+                time.sleep(math.pow(RETRY_INTERVAL, tries))
+
+    def _retry_rejected(self, rejected):
+        """Resend rejected items in a single bulk request per backoff round
+
+        Items rejected again are carried over to the next round.
+
+        :returns: list of ``(key, exception)`` tuples, empty if all the items succeeded
+        """
+        errors = []
+        for tries in range(1, self.retries + 1):
+            time.sleep(math.pow(RETRY_INTERVAL, tries))
+            keys = [key for key, lines in rejected]
+            try:
+                response = self._bulk_with_retries(b''.join(lines for key, lines in rejected))
+            except TransportError as e:
+                return errors + [
+                    (key, PillowtopIndexingError("[{}] Bulk request failed: {}".format(self.name, e)))
+                    for key in keys
+                ]
+            if response.get('errors'):
+                errors.extend(_get_bulk_item_errors(response, keys))
+            rejected = _get_rejected_actions(response, rejected)
+            if not rejected:
+                return errors
+        return errors + [
+            (key, PillowtopIndexingError(
+                "[{}] Bulk item rejected after {} retries: {}".format(self.name, self.retries, key)
+            ))
+            for key, lines in rejected
+        ]
+
+
+def _get_action_meta(index_info, doc_id):
+    return {
+        "_index": index_info.index,
+        "_type": index_info.type,
+        "_id": doc_id,
+    }
+
+
+def _get_rejected_actions(response, actions):
+    """Get the actions that elasticsearch rejected because it was too busy to process them"""
+    return [
+        action for action, item in zip(actions, response['items'])
+        if _is_rejected_item(item)
+    ]
+
+
+def _is_rejected_item(item):
+    (op_type, result), = item.items()
+    return result.get('status') in REJECTED_STATUS_CODES
+
+
+def _get_bulk_item_errors(response, changes):
+    """
+    The items in a bulk response are in the same order as the actions in the request
+    so they can be matched up with the changes that produced them.
+
+    Items that were rejected because elasticsearch was overloaded are not
+    included since they can be retried.
+    """
+    errors = []
+    for change, item in zip(changes, response['items']):
+        (op_type, result), = item.items()
+        if op_type == 'delete' and result.get('status') == 404:
+            continue  # the doc was already gone
+        if 'error' in result and not _is_rejected_item(item):
+            errors.append((change, PillowtopIndexingError(
+                "Bulk {} error on {}: {}".format(op_type, getattr(change, 'id', change), result['error'])
+            )))
+    return errors
+
+
 def send_to_elasticsearch(index, doc_type, doc_id, es_getter, name, data=None, retries=MAX_RETRIES,
                           except_on_failure=False, update=False, delete=False, es_merge_update=False):
     """
@@ -10,3 +10,20 @@ class PillowProcessor(six.with_metaclass(ABCMeta, object)):
 
     def checkpoint_updated(self):
         pass
+
+
+class BulkPillowProcessor(PillowProcessor):
+    """
+    A processor that can process a chunk of changes at once. Used by pillows
+    that have ``processor_chunk_size`` set.
+    """
+
+    @abstractmethod
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        :return: A tuple of ``(retry_changes, change_exceptions)`` where ``retry_changes``
+                 is a list of changes that should be processed again individually and
+                 ``change_exceptions`` is a list of ``(change, exception)`` tuples for
+                 changes that failed.
+        """
+        pass
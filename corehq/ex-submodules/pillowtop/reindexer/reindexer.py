@@ -4,7 +4,6 @@ from __future__ import unicode_literals
 from abc import ABCMeta, abstractmethod
 import argparse
 from datetime import datetime
-import time
 
 from elasticsearch import TransportError
 import six
@@ -15,10 +14,9 @@ from pillowtop.es_utils import set_index_reindex_settings, \
     set_index_normal_settings, initialize_mapping_if_necessary
 from pillowtop.feed.interface import Change
 from pillowtop.logger import pillow_logging
-from pillowtop.utils import prepare_bulk_payloads, build_bulk_payload, ErrorCollector
+from pillowtop.processors.elastic import ElasticsearchBulkWriter
+from pillowtop.utils import ChangeError, ErrorCollector
 
-MAX_TRIES = 3
-RETRY_TIME_DELAY_FACTOR = 15
 MAX_PAYLOAD_SIZE = 10 ** 7  # ~10 MB
 DATE_FORMAT = "%Y-%m-%d"
 
@@ -216,47 +214,28 @@ class BulkPillowReindexProcessor(BaseDocProcessor):
         changes = [self._doc_to_change(doc) for doc in docs]
         error_collector = ErrorCollector()
 
-        bulk_changes = build_bulk_payload(self.index_info, changes, self.doc_transform, error_collector)
+        writer = ElasticsearchBulkWriter(
+            self.es, 'reindex-{}'.format(self.index_info.index),
+            max_docs=None, max_bytes=MAX_PAYLOAD_SIZE, error_collector=error_collector
+        )
+        for change in changes:
+            if change.deleted and change.id:
+                writer.delete(self.index_info, change.id, key=change)
+            elif not change.deleted:
+                try:
+                    doc = change.get_document()
+                    if self.doc_transform:
+                        doc = self.doc_transform(doc)
+                    writer.index(self.index_info, doc['_id'], doc, key=change)
+                except Exception as e:
+                    error_collector.add_error(ChangeError(change, e))
+        writer.flush()
 
         for change, exception in error_collector.errors:
             pillow_logging.error("Error procesing doc %s: %s (%s)", change.id, type(exception), exception)
 
-        payloads = prepare_bulk_payloads(bulk_changes, MAX_PAYLOAD_SIZE)
-        if len(payloads) > 1:
-            pillow_logging.info("Payload split into %s parts" % len(payloads))
-
-        for payload in payloads:
-            success = self._send_payload_with_retries(payload)
-            if not success:
-                # stop the reindexer if we're unable to send a payload to ES
-                return False
-
-        return True
-
-    def _send_payload_with_retries(self, payload):
-        pillow_logging.info("Sending payload to ES")
-
-        retries = 0
-        bulk_start = datetime.utcnow()
-        success = False
-        while retries < MAX_TRIES:
-            if retries:
-                retry_time = (datetime.utcnow() - bulk_start).seconds + retries * RETRY_TIME_DELAY_FACTOR
-                pillow_logging.warning("\tRetrying in %s seconds" % retry_time)
-                time.sleep(retry_time)
-                pillow_logging.warning("\tRetrying now ...")
-                # reset timestamp when looping again
-                bulk_start = datetime.utcnow()
-
-            try:
-                self.es.bulk(payload)
-                success = True
-                break
-            except Exception:
-                retries += 1
-                pillow_logging.exception("\tException sending payload to ES")
-
-        return success
+        # stop the reindexer if we're unable to send a payload to ES
+        return not writer.failed_requests
 
     @staticmethod
     def _doc_to_change(doc):
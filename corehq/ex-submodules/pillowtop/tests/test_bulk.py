@@ -4,38 +4,103 @@ from __future__ import unicode_literals
 import json
 
 from django.test import SimpleTestCase
+from elasticsearch.exceptions import ConnectionError
+from mock import patch
 
-from corehq.util.test_utils import generate_cases
-from pillowtop.utils import prepare_bulk_payloads
+from pillowtop.es_utils import ElasticsearchIndexInfo
+from pillowtop.processors.elastic import ElasticsearchBulkWriter
 from six.moves import range
 
 
-class BulkTest(SimpleTestCase):
-
-    def test_prepare_bulk_payloads_unicode(self):
-        unicode_domain = 'हिंदी'
-        bulk_changes = [
-            {'id': 'doc1'},
-            {'id': 'doc2', 'domain': unicode_domain},
-        ]
-        payloads = prepare_bulk_payloads(bulk_changes, max_size=10, chunk_size=1)
-        self.assertEqual(2, len(payloads))
-        self.assertEqual(unicode_domain, json.loads(payloads[1])['domain'])
-
-
-@generate_cases([
-    (100, 1, 3),
-    (100, 10, 1),
-    (1, 1, 10),
-    (1, 2, 5),
-], BulkTest)
-def test_prepare_bulk_payloads2(self, max_size, chunk_size, expected_payloads):
-    bulk_changes = [{'id': 'doc%s' % i} for i in range(10)]
-    payloads = prepare_bulk_payloads(bulk_changes, max_size=max_size, chunk_size=chunk_size)
-    self.assertEqual(expected_payloads, len(payloads))
-    self.assertTrue(all(payloads))
-
-    # check that we can reform the original list of changes
-    json_docs = ''.join(payloads).strip().split('\n')
-    reformed_changes = [json.loads(doc) for doc in json_docs]
-    self.assertEqual(bulk_changes, reformed_changes)
+class FakeBulkElasticsearch(object):
+
+    def __init__(self, statuses=None, fail_requests=0):
+        self.payloads = []
+        self.statuses = statuses or {}
+        self.fail_requests = fail_requests
+
+    def bulk(self, payload):
+        self.payloads.append(payload)
+        if self.fail_requests:
+            self.fail_requests -= 1
+            raise ConnectionError('N/A', 'connection refused', None)
+        lines = [json.loads(line) for line in payload.decode('utf-8').strip().split('\n')]
+        items = []
+        for line in lines:
+            (op_type, meta), = line.items()
+            if op_type not in ('index', 'update', 'delete'):
+                continue  # a document line
+            statuses = self.statuses.get(meta['_id'], [200])
+            status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+            result = {'_id': meta['_id'], 'status': status}
+            if status >= 400:
+                result['error'] = 'error {}'.format(status)
+            items.append({op_type: result})
+        return {'errors': any('error' in list(item.values())[0] for item in items), 'items': items}
+
+
+@patch('pillowtop.processors.elastic.time.sleep', new=lambda seconds: None)
+class ElasticsearchBulkWriterTest(SimpleTestCase):
+    index_info = ElasticsearchIndexInfo(index='test-index', type='test')
+
+    def test_flush_on_max_docs(self):
+        es = FakeBulkElasticsearch()
+        with ElasticsearchBulkWriter(es, 'test', max_docs=2) as writer:
+            for i in range(5):
+                writer.index(self.index_info, 'doc{}'.format(i), {'_id': 'doc{}'.format(i)})
+            self.assertEqual(2, len(es.payloads))
+        self.assertEqual(3, len(es.payloads))
+        self.assertEqual([], writer.error_collector.errors)
+
+    def test_flush_on_max_bytes(self):
+        es = FakeBulkElasticsearch()
+        writer = ElasticsearchBulkWriter(es, 'test', max_docs=None, max_bytes=200)
+        for i in range(5):
+            writer.delete(self.index_info, 'doc{}'.format(i))
+        writer.flush()
+        self.assertTrue(len(es.payloads) > 1)
+        self.assertTrue(all(len(payload) <= 200 for payload in es.payloads))
+
+    def test_rejected_items_retried(self):
+        es = FakeBulkElasticsearch(statuses={'doc1': [429, 429, 200]})
+        with ElasticsearchBulkWriter(es, 'test') as writer:
+            for i in range(3):
+                writer.index(self.index_info, 'doc{}'.format(i), {'_id': 'doc{}'.format(i)})
+        self.assertEqual([], writer.error_collector.errors)
+        self.assertEqual(3, len(es.payloads))
+        self.assertIn(b'"doc1"', es.payloads[-1])
+        self.assertNotIn(b'"doc0"', es.payloads[-1])
+
+    def test_rejected_items_resent_together(self):
+        es = FakeBulkElasticsearch(statuses={'doc1': [429, 200], 'doc2': [429, 429, 200]})
+        with ElasticsearchBulkWriter(es, 'test') as writer:
+            for i in range(3):
+                writer.index(self.index_info, 'doc{}'.format(i), {'_id': 'doc{}'.format(i)})
+        self.assertEqual([], writer.error_collector.errors)
+        self.assertEqual(3, len(es.payloads))
+        self.assertIn(b'"doc1"', es.payloads[1])
+        self.assertIn(b'"doc2"', es.payloads[1])
+        self.assertNotIn(b'"doc1"', es.payloads[2])
+        self.assertIn(b'"doc2"', es.payloads[2])
+
+    def test_item_errors(self):
+        es = FakeBulkElasticsearch(statuses={'doc1': [400], 'doc2': [404], 'doc3': [429]})
+        with ElasticsearchBulkWriter(es, 'test', retries=2) as writer:
+            writer.index(self.index_info, 'doc0', {'_id': 'doc0'})
+            writer.index(self.index_info, 'doc1', {'_id': 'doc1'}, key='change1')
+            writer.delete(self.index_info, 'doc2')
+            writer.update(self.index_info, 'doc3', {'name': 'three'})
+        self.assertEqual(['change1', 'doc3'], [error.change for error in writer.error_collector.errors])
+
+    def test_failed_request(self):
+        es = FakeBulkElasticsearch(fail_requests=2)
+        with ElasticsearchBulkWriter(es, 'test', retries=2) as writer:
+            writer.index(self.index_info, 'doc0', {'_id': 'doc0'})
+        self.assertEqual(1, writer.failed_requests)
+        self.assertEqual(['doc0'], [error.change for error in writer.error_collector.errors])
+
+        es = FakeBulkElasticsearch(fail_requests=1)
+        with ElasticsearchBulkWriter(es, 'test', retries=2) as writer:
+            writer.index(self.index_info, 'doc0', {'_id': 'doc0'})
+        self.assertEqual(0, writer.failed_requests)
+        self.assertEqual(2, len(es.payloads))
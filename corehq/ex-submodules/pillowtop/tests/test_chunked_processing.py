@@ -0,0 +1,135 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from django.test import SimpleTestCase
+from mock import patch
+
+from pillowtop.checkpoints.manager import PillowCheckpointEventHandler
+from pillowtop.feed.interface import Change
+from pillowtop.feed.mock import MockChangeFeed
+from pillowtop.pillow.interface import ConstructedPillow, PillowRuntimeContext
+from pillowtop.processors.elastic import _get_bulk_item_errors
+from pillowtop.processors.interface import BulkPillowProcessor
+from pillowtop.processors.sample import TestProcessor
+from six.moves import range
+
+
+class ChunkRecordingProcessor(BulkPillowProcessor):
+
+    def __init__(self, fail_ids=(), retry_ids=()):
+        self.chunks = []
+        self.single_changes = []
+        self.fail_ids = fail_ids
+        self.retry_ids = retry_ids
+
+    def process_change(self, pillow_instance, change):
+        self.single_changes.append(change)
+
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        self.chunks.append([change.id for change in changes_chunk])
+        retry = [change for change in changes_chunk if change.id in self.retry_ids]
+        errors = [(change, Exception('fail')) for change in changes_chunk if change.id in self.fail_ids]
+        return retry, errors
+
+
+class ListChangeFeed(MockChangeFeed):
+
+    def iter_changes(self, since, forever=False):
+        self._since = 0
+        for change in self._queue:
+            yield change
+            self._since += 1
+
+
+def _make_pillow(processor, num_changes, chunk_size):
+    changes = [Change(id='doc{}'.format(i), sequence_id=i) for i in range(num_changes)]
+    return ConstructedPillow(
+        name='chunk-test-pillow',
+        checkpoint=None,
+        change_feed=ListChangeFeed(changes),
+        processor=processor,
+        processor_chunk_size=chunk_size,
+    )
+
+
+class ChunkedProcessingTest(SimpleTestCase):
+
+    def test_changes_processed_in_chunks(self):
+        processor = ChunkRecordingProcessor()
+        pillow = _make_pillow(processor, 5, chunk_size=2)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual(
+            [['doc0', 'doc1'], ['doc2', 'doc3'], ['doc4']],
+            processor.chunks
+        )
+        self.assertEqual([], processor.single_changes)
+
+    def test_failed_changes_handled(self):
+        processor = ChunkRecordingProcessor(fail_ids=['doc1'])
+        pillow = _make_pillow(processor, 3, chunk_size=3)
+        with patch('pillowtop.pillow.interface.handle_pillow_error') as handle_error:
+            pillow.process_changes(since=0, forever=False)
+        self.assertEqual(1, handle_error.call_count)
+        self.assertEqual('doc1', handle_error.call_args[0][1].id)
+
+    def test_retry_changes_processed_individually(self):
+        processor = ChunkRecordingProcessor(retry_ids=['doc0', 'doc2'])
+        pillow = _make_pillow(processor, 3, chunk_size=3)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual(['doc0', 'doc2'], [change.id for change in processor.single_changes])
+
+    def test_retried_changes_counted_once(self):
+        processor = ChunkRecordingProcessor(retry_ids=['doc0'], fail_ids=['doc1'])
+        pillow = _make_pillow(processor, 3, chunk_size=3)
+        with patch.object(pillow, '_record_change_in_datadog') as record_change, \
+                patch.object(pillow, '_record_change_success_in_datadog') as record_success, \
+                patch('pillowtop.pillow.interface.handle_pillow_error'):
+            pillow.process_changes(since=0, forever=False)
+        self.assertEqual(
+            ['doc0', 'doc1', 'doc2'],
+            sorted(call[0][0].id for call in record_change.call_args_list)
+        )
+        self.assertEqual(
+            ['doc0', 'doc2'],
+            sorted(call[0][0].id for call in record_success.call_args_list)
+        )
+
+    def test_non_bulk_processor(self):
+        processor = TestProcessor()
+        pillow = _make_pillow(processor, 3, chunk_size=2)
+        pillow.process_changes(since=0, forever=False)
+        self.assertEqual(['doc0', 'doc1', 'doc2'], [change.id for change in processor.changes_seen])
+
+
+class ChunkedCheckpointFrequencyTest(SimpleTestCase):
+
+    def _should_update(self, changes_seen, last_step_size, frequency=100):
+        handler = PillowCheckpointEventHandler(checkpoint=None, checkpoint_frequency=frequency)
+        handler.max_checkpoint_delay = 0
+        context = PillowRuntimeContext(changes_seen=changes_seen)
+        context.last_step_size = last_step_size
+        return handler.should_update_checkpoint(context)
+
+    def test_single_changes(self):
+        self.assertTrue(self._should_update(100, 1))
+        self.assertFalse(self._should_update(101, 1))
+
+    def test_chunk_crosses_frequency(self):
+        self.assertTrue(self._should_update(130, 40))
+        self.assertFalse(self._should_update(170, 40))
+
+
+class BulkResponseErrorsTest(SimpleTestCase):
+
+    def test_get_bulk_item_errors(self):
+        changes = [Change(id='doc{}'.format(i), sequence_id=i) for i in range(3)]
+        response = {
+            'errors': True,
+            'items': [
+                {'index': {'_id': 'doc0', 'status': 201}},
+                {'index': {'_id': 'doc1', 'status': 400, 'error': 'MapperParsingException'}},
+                {'delete': {'_id': 'doc2', 'status': 404, 'found': False}},
+            ]
+        }
+        errors = _get_bulk_item_errors(response, changes)
+        self.assertEqual(['doc1'], [change.id for change, exception in errors])
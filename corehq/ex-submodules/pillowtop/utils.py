@@ -1,23 +1,19 @@
 from __future__ import division
 from __future__ import absolute_import
 from __future__ import unicode_literals
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from copy import deepcopy
 from datetime import datetime
 import json
-import sys
 
-import simplejson
 from django.conf import settings
 
-from dimagi.utils.chunked import chunked
 from dimagi.utils.modules import to_function
 
 from pillowtop.exceptions import PillowNotFoundError
 from pillowtop.logger import pillow_logging
 from pillowtop.dao.exceptions import DocumentMismatchError, DocumentMissingError
 import six
-from six.moves import map
 
 
 def _get_pillow_instance(full_class_str):
@@ -202,50 +198,41 @@ class ErrorCollector(object):
         self.errors.append(error)
 
 
-def build_bulk_payload(index_info, changes, doc_transform=None, error_collector=None):
-    doc_transform = doc_transform or (lambda x: x)
-    payload = []
+def bulk_fetch_changes_docs(changes):
+    """
+    Fetch the documents for a list of changes in bulk from their document stores
+    and set them on the changes.
+
+    Changes whose documents are not returned by the bulk fetch are left untouched
+    so that ``change.get_document`` falls back to fetching them individually (and
+    records any ``DocumentNotFoundError``).
+    """
+    changes_by_store = defaultdict(list)
     for change in changes:
-        if change.deleted and change.id:
-            payload.append({
-                "delete": {
-                    "_index": index_info.index,
-                    "_type": index_info.type,
-                    "_id": change.id
-                }
-            })
-        elif not change.deleted:
-            try:
-                doc = change.get_document()
-                doc = doc_transform(doc)
-                payload.append({
-                    "index": {
-                        "_index": index_info.index,
-                        "_type": index_info.type,
-                        "_id": doc['_id']
-                    }
-                })
-                payload.append(doc)
-            except Exception as e:
-                if not error_collector:
-                    raise
-                error_collector.add_error(ChangeError(change, e))
-    return payload
-
-
-def prepare_bulk_payloads(bulk_changes, max_size, chunk_size=100):
-    payloads = [b'']
-    for bulk_chunk in chunked(bulk_changes, chunk_size):
-        current_payload = payloads[-1]
-        payload_chunk = b'\n'.join(map(simplejson.dumps, bulk_chunk)) + b'\n'
-        appended_payload = current_payload + payload_chunk
-        new_payload_size = sys.getsizeof(appended_payload)
-        if new_payload_size > max_size:
-            payloads.append(payload_chunk)
-        else:
-            payloads[-1] = appended_payload
+        if change.document is None and change.document_store is not None and not change.deleted:
+            if change.metadata is not None:
+                key = (
+                    change.metadata.data_source_type,
+                    change.metadata.data_source_name,
+                    change.metadata.domain,
+                )
+            else:
+                key = id(change.document_store)
+            changes_by_store[key].append(change)
+
+    for store_changes in changes_by_store.values():
+        document_store = store_changes[0].document_store
+        changes_by_id = defaultdict(list)
+        for change in store_changes:
+            changes_by_id[change.id].append(change)
+        try:
+            docs = list(document_store.iter_documents(list(changes_by_id)))
+        except NotImplementedError:
+            continue
 
-    return [_f for _f in payloads if _f]
+        for doc in docs:
+            for change in changes_by_id.get(doc['_id'], []):
+                change.set_document(doc)
 
 
 def ensure_matched_revisions(change):
@@ -2,7 +2,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 import redis
 from casexml.apps.case.exceptions import IllegalCaseId
-from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL
+from corehq.form_processor.backends.sql.dbaccessors import CaseAccessorSQL, ShardedBatchLoader
 from corehq.form_processor.backends.sql.update_strategy import SqlCaseUpdateStrategy
 from corehq.form_processor.casedb_base import AbstractCaseDbCache
 from corehq.form_processor.exceptions import CaseNotFound
@@ -27,7 +27,10 @@ class CaseDbCacheSQL(AbstractCaseDbCache):
                 raise IllegalCaseId("Case [%s] is deleted " % case.case_id)
 
     def _iter_cases(self, case_ids):
-        return iter(CaseAccessorSQL.get_cases(case_ids))
+        if len(case_ids) < ShardedBatchLoader.concurrency_threshold:
+            return iter(CaseAccessorSQL.get_cases(case_ids))
+        # only large sets of cases are worth loading from each shard concurrently
+        return iter(CaseAccessorSQL.get_batch_loader().get_many(case_ids))
 
     def get_cases_for_saving(self, now):
         cases = self.get_changed()
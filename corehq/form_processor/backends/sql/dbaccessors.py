@@ -57,7 +57,7 @@ from corehq.form_processor.utils.sql import (
 )
 from corehq.sql_db.config import get_sql_db_aliases_in_use, partition_config
 from corehq.sql_db.routers import get_cursor
-from corehq.sql_db.util import split_list_by_db_partition
+from corehq.sql_db.util import map_across_db_aliases, split_list_by_db_partition
 from corehq.util.queries import fast_distinct_in_domain
 from dimagi.utils.chunked import chunked
 
@@ -375,6 +375,18 @@ class FormAccessorSQL(AbstractFormAccessor):
 
         return forms
 
+    @staticmethod
+    def get_batch_loader(with_attachments=False):
+        """Get a loader for loading forms in batches, see ``ShardedBatchLoader``
+
+        :param with_attachments: Also load the attachment metadata for the forms
+        (as ``get_forms_with_attachments_meta`` does)
+        """
+        return ShardedBatchLoader(
+            XFormInstanceSQL, 'form_id', XFormNotFound,
+            prefetch=_prefetch_form_attachments if with_attachments else None
+        )
+
     @staticmethod
     def get_attachments(form_id):
         return list(XFormAttachmentSQL.objects.raw('SELECT * from get_form_attachments(%s)', [form_id]))
@@ -819,6 +831,11 @@ class CaseAccessorSQL(AbstractCaseAccessor):
 
         return cases
 
+    @staticmethod
+    def get_batch_loader():
+        """Get a loader for loading cases in batches, see ``ShardedBatchLoader``"""
+        return ShardedBatchLoader(CommCareCaseSQL, 'case_id', CaseNotFound)
+
     @staticmethod
     def case_exists(case_id):
         return CommCareCaseSQL.objects.partitioned_query(case_id).filter(case_id=case_id).exists()
@@ -1404,6 +1421,99 @@ class LedgerAccessorSQL(AbstractLedgerAccessor):
                 yield trans
 
 
+class ShardedBatchLoader(object):
+    """Load partitioned docs by ID with one query per shard
+
+    Callers register the IDs they are going to need and the next lookup
+    (or an explicit ``flush``) loads all of them at once with one query per
+    shard, with the shards queried concurrently for large batches. Loaded docs are kept so
+    repeated lookups of the same ID do not hit the database again, which
+    means a loader should only live as long as one request, submission or
+    restore. Use ``discard`` for docs that have been changed since they were
+    loaded.
+
+    Use ``FormAccessorSQL.get_batch_loader`` or ``CaseAccessorSQL.get_batch_loader``
+    rather than creating this directly.
+    """
+
+    # Flushes of fewer docs than this query the shards one after another in
+    # the calling thread, reusing its connections, rather than starting a
+    # thread and opening a connection for each shard.
+    concurrency_threshold = 100
+
+    def __init__(self, model_class, id_field, not_found_exception, prefetch=None):
+        """
+        :param prefetch: optional function ``prefetch(db_name, docs_by_id)``
+        called for each shard to load related models for the docs
+        """
+        self.model_class = model_class
+        self.id_field = id_field
+        self.not_found_exception = not_found_exception
+        self.prefetch = prefetch
+        self._docs = {}
+        self._missing = set()
+        self._pending = set()
+
+    def register(self, doc_ids):
+        """Register IDs to load in the next flush"""
+        for doc_id in doc_ids:
+            if doc_id not in self._docs and doc_id not in self._missing:
+                self._pending.add(doc_id)
+
+    def flush(self):
+        """Load all registered docs that have not been loaded yet"""
+        if not self._pending:
+            return
+        doc_ids = list(self._pending)
+        self._pending = set()
+        ids_by_db = split_list_by_db_partition(doc_ids)
+        if len(doc_ids) < self.concurrency_threshold:
+            docs_by_db = {db_name: self._load_docs(db_name, ids) for db_name, ids in ids_by_db}
+        else:
+            docs_by_db = map_across_db_aliases(self._load_docs, ids_by_db)
+        for docs in six.itervalues(docs_by_db):
+            self._docs.update(docs)
+        self._missing.update(doc_id for doc_id in doc_ids if doc_id not in self._docs)
+
+    def get(self, doc_id):
+        """Get one doc, loading it along with any registered docs if necessary
+
+        :raises: ``XFormNotFound`` or ``CaseNotFound``
+        """
+        self.register([doc_id])
+        self.flush()
+        try:
+            return self._docs[doc_id]
+        except KeyError:
+            raise self.not_found_exception(doc_id)
+
+    def get_many(self, doc_ids, ordered=False):
+        """Get docs, loading them along with any registered docs if necessary
+
+        Docs that do not exist are left out of the result as they are by
+        ``FormAccessorSQL.get_forms`` and ``CaseAccessorSQL.get_cases``.
+        """
+        self.register(doc_ids)
+        self.flush()
+        docs = [self._docs[doc_id] for doc_id in set(doc_ids) if doc_id in self._docs]
+        if ordered:
+            _sort_with_id_list(docs, doc_ids, self.id_field)
+        return docs
+
+    def discard(self, doc_ids):
+        """Forget loaded docs so they are loaded again on the next lookup"""
+        for doc_id in doc_ids:
+            self._docs.pop(doc_id, None)
+            self._missing.discard(doc_id)
+
+    def _load_docs(self, db_name, doc_ids):
+        docs = self.model_class.objects.using(db_name).filter(**{self.id_field + '__in': doc_ids})
+        docs_by_id = {getattr(doc, self.id_field): doc for doc in docs}
+        if self.prefetch is not None and docs_by_id:
+            self.prefetch(db_name, docs_by_id)
+        return docs_by_id
+
+
 def _sort_with_id_list(object_list, id_list, id_property):
     """Sort object list in the same order as given list of ids
 
@@ -1425,3 +1535,10 @@ def _attach_prefetch_models(objects_by_id, prefetched_models, link_field_name, c
     for obj_id, group in prefetched_groups:
         obj = objects_by_id[obj_id]
         setattr(obj, cached_attrib_name, list(group))
+
+
+def _prefetch_form_attachments(db_name, forms_by_id):
+    attachments = XFormAttachmentSQL.objects.using(db_name).filter(
+        form_id__in=list(forms_by_id)
+    ).order_by('form_id')
+    _attach_prefetch_models(forms_by_id, attachments, 'form_id', 'cached_attachments')
@@ -254,6 +254,8 @@ class FormProcessorSQL(object):
                     affected_cases.update(case_update.id for case_update in get_case_updates(xform))
 
             rebuild_detail = FormEditRebuild(deprecated_form_id=deprecated_form.form_id)
+            # the cases are mostly rebuilt from the same forms
+            form_loader = FormAccessorSQL.get_batch_loader(with_attachments=True)
             for case_id in affected_cases:
                 case = case_db.get(case_id)
                 is_creation = False
@@ -263,7 +265,7 @@ class FormProcessorSQL(object):
                     case_db.set(case_id, case)
                 previous_owner = case.owner_id
                 case, _ = FormProcessorSQL._rebuild_case_from_transactions(
-                    case, rebuild_detail, updated_xforms=xforms
+                    case, rebuild_detail, updated_xforms=xforms, form_loader=form_loader
                 )
                 if case:
                     touched_cases[case.case_id] = CaseUpdateMetadata(
@@ -284,7 +286,11 @@ class FormProcessorSQL(object):
         return touched_cases
 
     @staticmethod
-    def hard_rebuild_case(domain, case_id, detail, lock=True):
+    def hard_rebuild_case(domain, case_id, detail, lock=True, form_loader=None):
+        """
+        :param form_loader: batch loader from ``FormAccessorSQL.get_batch_loader`` to
+        share the forms loaded between cases rebuilt together
+        """
         case, lock_obj = FormProcessorSQL.get_case_with_lock(case_id, lock=lock)
         found = bool(case)
         if not found:
@@ -295,7 +301,9 @@ class FormProcessorSQL(object):
 
         try:
             assert case.domain == domain, (case.domain, domain)
-            case, rebuild_transaction = FormProcessorSQL._rebuild_case_from_transactions(case, detail)
+            case, rebuild_transaction = FormProcessorSQL._rebuild_case_from_transactions(
+                case, detail, form_loader=form_loader
+            )
             if case.is_deleted and not case.is_saved():
                 return None
 
@@ -307,8 +315,10 @@ class FormProcessorSQL(object):
             release_lock(lock_obj, degrade_gracefully=True)
 
     @staticmethod
-    def _rebuild_case_from_transactions(case, detail, updated_xforms=None):
-        transactions = get_case_transactions(case.case_id, updated_xforms=updated_xforms)
+    def _rebuild_case_from_transactions(case, detail, updated_xforms=None, form_loader=None):
+        transactions = get_case_transactions(
+            case.case_id, updated_xforms=updated_xforms, form_loader=form_loader
+        )
         strategy = SqlCaseUpdateStrategy(case)
 
         rebuild_transaction = CaseTransaction.rebuild_transaction(case, detail)
@@ -348,7 +358,7 @@ class FormProcessorSQL(object):
         return CaseAccessorSQL.case_exists(case_id)
 
 
-def get_case_transactions(case_id, updated_xforms=None):
+def get_case_transactions(case_id, updated_xforms=None, form_loader=None):
     """
     This fetches all the transactions required to rebuild the case along
     with all the forms for those transactions.
@@ -358,6 +368,8 @@ def get_case_transactions(case_id, updated_xforms=None):
 
     :param case_id: ID of case to rebuild
     :param updated_xforms: list of forms that have been changed.
+    :param form_loader: batch loader from ``FormAccessorSQL.get_batch_loader(with_attachments=True)``
+    to load the forms with, so that forms are only loaded once when rebuilding several cases.
     :return: list of ``CaseTransaction`` objects with their associated forms attached.
     """
     transactions = CaseAccessorSQL.get_transactions_for_case_rebuild(case_id)
@@ -367,7 +379,11 @@ def get_case_transactions(case_id, updated_xforms=None):
     } if updated_xforms else {}
 
     form_ids_to_fetch = list(form_ids - set(updated_xforms_map.keys()))
-    xform_map = {form.form_id: form for form in FormAccessorSQL.get_forms_with_attachments_meta(form_ids_to_fetch)}
+    if form_loader is not None:
+        forms = form_loader.get_many(form_ids_to_fetch)
+    else:
+        forms = FormAccessorSQL.get_forms_with_attachments_meta(form_ids_to_fetch)
+    xform_map = {form.form_id: form for form in forms}
 
     def get_form(form_id):
         if form_id in updated_xforms_map:
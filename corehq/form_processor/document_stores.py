@@ -3,12 +3,13 @@ from __future__ import unicode_literals
 from collections import defaultdict
 
 from corehq.blobs import Error as BlobError
-from corehq.form_processor.backends.sql.dbaccessors import LedgerAccessorSQL, CaseAccessorSQL
+from corehq.form_processor.backends.sql.dbaccessors import LedgerAccessorSQL, CaseAccessorSQL, FormAccessorSQL
 from corehq.form_processor.exceptions import CaseNotFound, XFormNotFound, LedgerValueNotFound
 from corehq.form_processor.interfaces.dbaccessors import FormAccessors, CaseAccessors
 from corehq.form_processor.models import XFormInstanceSQL
 from corehq.form_processor.utils.general import should_use_sql_backend
 from corehq.util.quickcache import quickcache
+from dimagi.utils.chunked import chunked
 from pillowtop.dao.django import DjangoDocumentStore
 from pillowtop.dao.exceptions import DocumentNotFoundError
 from pillowtop.dao.interface import ReadOnlyDocumentStore
@@ -37,8 +38,15 @@ class ReadonlyFormDocumentStore(ReadOnlyDocumentStore):
         return iter(self.form_accessors.iter_form_ids_by_xmlns(self.xmlns))
 
     def iter_documents(self, ids):
-        for wrapped_form in self.form_accessors.iter_forms(ids):
-            yield wrapped_form.to_json()
+        if should_use_sql_backend(self.domain):
+            # match the output of get_document which includes the attachment metadata
+            for chunk in chunked(ids, 100):
+                chunk = [_f for _f in chunk if _f]
+                for form in FormAccessorSQL.get_forms_with_attachments_meta(chunk):
+                    yield form.to_json(include_attachments=True)
+        else:
+            for wrapped_form in self.form_accessors.iter_forms(ids):
+                yield wrapped_form.to_json()
 
 
 class ReadonlyCaseDocumentStore(ReadOnlyDocumentStore):
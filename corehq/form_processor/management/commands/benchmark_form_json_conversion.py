@@ -0,0 +1,134 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+import time
+import uuid
+from collections import OrderedDict
+from io import open
+
+from django.core.management.base import BaseCommand
+
+from corehq.apps.tzmigration.api import force_phone_timezones_should_be_processed
+from corehq.form_processor.utils.xform import (
+    FormSubmissionBuilder,
+    adjust_datetimes,
+    convert_xform_to_json,
+    convert_xform_to_json_streaming,
+)
+from six.moves import range
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the speed and output of convert_xform_to_json + adjust_datetimes "
+        "with convert_xform_to_json_streaming on a corpus of form XML files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Form XML files or directories containing them.'
+        )
+        parser.add_argument(
+            '--generate', type=int, default=0, metavar='N',
+            help='Also benchmark generated forms with 1, 10, ... N repeat entries.'
+        )
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--process-timezones', action='store_true', default=False)
+
+    def handle(self, paths, generate, iterations, process_timezones, **options):
+        forms = list(_iter_corpus(paths))
+        size = 1
+        while size <= generate:
+            forms.append(('generated-{}-repeats'.format(size), _get_generated_form_xml(size)))
+            size *= 10
+        if not forms:
+            self.stderr.write("No forms to benchmark. Pass some paths or --generate.")
+            return
+
+        with force_phone_timezones_should_be_processed() if process_timezones else _noop():
+            self._run(forms, iterations)
+
+    def _run(self, forms, iterations):
+        total_legacy = total_streaming = 0
+        mismatches = []
+        self.stdout.write("{:<50} {:>10} {:>14} {:>14}".format('form', 'bytes', 'current (ms)', 'streaming (ms)'))
+        for name, xml in forms:
+            legacy_time, legacy_json = _time(_convert_legacy, xml, iterations)
+            streaming_time, streaming_json = _time(convert_xform_to_json_streaming, xml, iterations)
+            total_legacy += legacy_time
+            total_streaming += streaming_time
+            if legacy_json != streaming_json:
+                mismatches.append(name)
+            self.stdout.write("{:<50} {:>10} {:>14.2f} {:>14.2f}".format(
+                name[-50:], len(xml), legacy_time, streaming_time
+            ))
+
+        self.stdout.write("{:<50} {:>10} {:>14.2f} {:>14.2f}".format('total', '', total_legacy, total_streaming))
+        if mismatches:
+            self.stderr.write("Output differs for {} forms:".format(len(mismatches)))
+            for name in mismatches:
+                self.stderr.write("  {}".format(name))
+        else:
+            self.stdout.write("Output is identical for all {} forms".format(len(forms)))
+
+
+def _convert_legacy(xml):
+    return adjust_datetimes(convert_xform_to_json(xml))
+
+
+def _time(func, xml, iterations):
+    """:returns: (average milliseconds per call, result of last call)"""
+    start = time.time()
+    for i in range(iterations):
+        result = func(xml)
+    return (time.time() - start) * 1000 / iterations, result
+
+
+def _iter_corpus(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            filenames = sorted(
+                os.path.join(dirpath, filename)
+                for dirpath, dirnames, filenames in os.walk(path)
+                for filename in filenames if filename.endswith('.xml')
+            )
+        else:
+            filenames = [path]
+        for filename in filenames:
+            with open(filename, 'rb') as f:
+                yield filename, f.read()
+
+
+def _get_generated_form_xml(num_repeats):
+    """A form shaped like a typical large submission: some questions
+    and a repeat group with dates, datetimes and free text"""
+    form_properties = OrderedDict()
+    form_properties['name'] = 'Generated form'
+    form_properties['visit_date'] = '2018-03-14'
+    form_properties['household'] = OrderedDict([
+        ('address', 'Somewhere'),
+        ('gps', '12.5 34.2 0.0 10.0'),
+    ])
+    form_properties['member'] = [
+        OrderedDict([
+            ('member_name', 'Member {}'.format(i)),
+            ('dob', '1990-01-{:02d}'.format(i % 28 + 1)),
+            ('registered_on', '2018-03-14T10:{:02d}:00.000+03'.format(i % 60)),
+            ('age', str(i % 90)),
+            ('notes', 'some free text describing member {}'.format(i)),
+        ])
+        for i in range(num_repeats)
+    ]
+    return FormSubmissionBuilder(uuid.uuid4().hex, form_properties=form_properties).as_xml_string()
+
+
+class _noop(object):
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -164,13 +164,16 @@ def reprocess_form(form, save=True, lock_form=True):
                     FormProcessorSQL.publish_changes_to_kafka(ProcessedForms(form, None), cases, stock_result)
 
                 # rebuild cases and ledgers that were affected
+                form_loader = FormAccessorSQL.get_batch_loader(with_attachments=True)
                 for case in cases:
                     if case.case_id in cases_needing_rebuild:
                         logger.info('Rebuilding case: %s', case.case_id)
                         if save:
                             # only rebuild cases that were updated
                             detail = FormReprocessRebuild(form_id=form.form_id)
-                            interface.hard_rebuild_case(case.case_id, detail, lock=False)
+                            FormProcessorSQL.hard_rebuild_case(
+                                form.domain, case.case_id, detail, lock=False, form_loader=form_loader
+                            )
 
                 for ledger in ledgers:
                     if ledger.ledger_reference in ledgers_updated:
@@ -58,6 +58,23 @@ class CaseAccessorTestsSQL(TestCase):
         self.assertEqual(case1.case_id, cases[0].case_id)
         self.assertEqual(case2.case_id, cases[1].case_id)
 
+    def test_batch_loader(self):
+        case1 = _create_case()
+        case2 = _create_case()
+
+        loader = CaseAccessorSQL.get_batch_loader()
+        loader.register([case1.case_id, case2.case_id])
+        self.assertEqual(case2.case_id, loader.get(case2.case_id).case_id)
+        with self.assertNumQueries(0, using=case1.db):
+            self.assertEqual(case1.case_id, loader.get(case1.case_id).case_id)
+
+        loader.discard([case1.case_id])
+        with self.assertNumQueries(1, using=case1.db):
+            self.assertEqual([case1.case_id], [case.case_id for case in loader.get_many([case1.case_id])])
+
+        with self.assertRaises(CaseNotFound):
+            loader.get('missing_case')
+
     def test_get_case_xform_ids(self):
         form_id1 = uuid.uuid4().hex
         case = _create_case(form_id=form_id1)
@@ -0,0 +1,72 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import uuid
+from io import BytesIO, open
+
+from django.test import SimpleTestCase
+
+from corehq.apps.tzmigration.test_utils import run_pre_and_post_timezone_migration
+from corehq.form_processor.utils import (
+    adjust_datetimes,
+    convert_xform_to_json,
+    convert_xform_to_json_streaming,
+)
+from corehq.form_processor.utils.xform import FormSubmissionBuilder
+from corehq.util.test_utils import TestFileMixin
+from couchforms import XMLSyntaxError
+from six.moves import range
+
+
+class ConvertXFormToJsonStreamingTest(SimpleTestCase, TestFileMixin):
+    file_path = ('data', 'posts')
+    root = os.path.join(os.path.dirname(__file__), '..', '..', 'ex-submodules', 'couchforms', 'tests')
+
+    def _get_xml(self, name):
+        with open(self.get_path(name, 'xml'), 'rb') as f:
+            return f.read()
+
+    def _assert_same_json(self, xml):
+        self.assertEqual(
+            convert_xform_to_json_streaming(xml),
+            adjust_datetimes(convert_xform_to_json(xml))
+        )
+
+    @run_pre_and_post_timezone_migration
+    def test_posts(self):
+        for name in ['cloudant-template', 'decimalmeta', 'duplicate', 'meta',
+                     'meta_dict_appversion', 'namespaces', 'unicode']:
+            self._assert_same_json(self._get_xml(name))
+
+    def test_repeats(self):
+        xml = FormSubmissionBuilder(uuid.uuid4().hex, form_properties={
+            'name': 'Repeats',
+            'group': {'question': ''},
+            'repeat': [
+                {'position': str(i), 'when': '2018-03-14T10:00:00.000+03'}
+                for i in range(3)
+            ],
+        }).as_xml_string()
+        form_json = convert_xform_to_json_streaming(xml)
+        self.assertEqual(['0', '1', '2'], [r['position'] for r in form_json['repeat']])
+        self.assertEqual({'question': ''}, form_json['group'])
+        self._assert_same_json(xml)
+
+    def test_file_object(self):
+        xml = self._get_xml('meta')
+        self.assertEqual(
+            convert_xform_to_json_streaming(BytesIO(xml)),
+            convert_xform_to_json_streaming(xml)
+        )
+
+    def test_no_datetime_normalization(self):
+        xml = self._get_xml('meta')
+        self.assertEqual(
+            convert_xform_to_json_streaming(xml, normalize_datetimes=False),
+            convert_xform_to_json(xml)
+        )
+
+    def test_invalid_xml(self):
+        with self.assertRaises(XMLSyntaxError):
+            convert_xform_to_json_streaming('<data><unclosed></data>')
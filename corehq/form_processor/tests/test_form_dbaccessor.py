@@ -67,6 +67,21 @@ class FormAccessorTestsSQL(TestCase):
         self.assertEqual(form1.form_id, forms[0].form_id)
         self.assertEqual(form2.form_id, forms[1].form_id)
 
+    def test_batch_loader(self):
+        form1 = create_form_for_test(DOMAIN)
+        form2 = create_form_for_test(DOMAIN)
+
+        loader = FormAccessorSQL.get_batch_loader(with_attachments=True)
+        loader.register([form1.form_id, form2.form_id, 'missing_form'])
+        forms = loader.get_many([form2.form_id, form1.form_id], ordered=True)
+        self.assertEqual([form2.form_id, form1.form_id], [form.form_id for form in forms])
+        self.assertEqual(['form.xml'], [att.name for att in forms[0].cached_attachments])
+
+        with self.assertNumQueries(0, using=form1.db), self.assertNumQueries(0, using=form2.db):
+            self.assertEqual(form1.form_id, loader.get(form1.form_id).form_id)
+            with self.assertRaises(XFormNotFound):
+                loader.get('missing_form')
+
     def test_get_forms_by_last_modified(self):
         start = datetime(2016, 1, 1)
         end = datetime(2018, 1, 1)
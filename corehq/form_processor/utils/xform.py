@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 from datetime import datetime
+from io import BytesIO
 from lxml import etree
 
 import iso8601
@@ -171,6 +172,101 @@ def convert_xform_to_json(xml_string):
     return json_form
 
 
+def convert_xform_to_json_streaming(xml, normalize_datetimes=True, process_timezones=None):
+    """
+    Single pass alternative to ``convert_xform_to_json`` followed by
+    ``adjust_datetimes``. The form JSON is built from lxml.iterparse events
+    and datetime-like strings are normalized as they are read.
+
+    Elements are discarded as soon as they have been converted, so the memory
+    used is that of the resulting JSON rather than JSON plus XML tree.
+    To avoid loading very large submissions into memory pass a
+    file-like object rather than a string.
+
+    :param xml: the xform payload as a string or a file-like object in
+    binary read mode
+    :param normalize_datetimes: apply ``adjust_datetimes`` to the values
+    :returns: the form json, as ``convert_xform_to_json``
+    """
+    if isinstance(xml, six.text_type):
+        xml = xml.encode('utf-8')
+    if isinstance(xml, bytes):
+        xml = BytesIO(xml)
+
+    if normalize_datetimes:
+        process_timezones = process_timezones or phone_timezones_should_be_processed()
+
+        def adjust(text):
+            return _adjust_datetime_text(text, process_timezones)
+    else:
+        def adjust(text):
+            return text
+
+    # each frame is (name, xmlns, json) for an element that has been started but not ended
+    stack = []
+    name = json_form = None
+    try:
+        for event, elem in etree.iterparse(xml, events=('start', 'end')):
+            if event == 'start':
+                name, xmlns = _split_xml_name(elem.tag)
+                json_node = {}
+                if xmlns != (stack[-1][1] if stack else ''):
+                    json_node['@xmlns'] = xmlns
+                for attr, value in elem.attrib.items():
+                    json_node['@' + _split_xml_name(attr)[0]] = adjust(value)
+                stack.append((name, xmlns, json_node))
+                continue
+
+            name, xmlns, json_node = stack.pop()
+            text = elem.text
+            if json_node:
+                if text and text.strip():
+                    json_node['#text'] = adjust(text)
+            else:
+                json_node = adjust(text) if text else ''
+
+            if stack:
+                parent = stack[-1][2]
+                if name not in parent:
+                    parent[name] = json_node
+                elif isinstance(parent[name], list):
+                    parent[name].append(json_node)
+                else:
+                    parent[name] = [parent[name], json_node]
+            else:
+                json_form = json_node
+
+            # free the converted element and any siblings before it
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        from couchforms import XMLSyntaxError
+        raise XMLSyntaxError('Invalid XML: %s' % e)
+
+    json_form['#type'] = name
+    return json_form
+
+
+def _split_xml_name(tag):
+    """'{xmlns}name' -> ('name', 'xmlns')"""
+    if tag.startswith('{'):
+        xmlns, name = tag[1:].split('}', 1)
+        return name, xmlns
+    return tag, ''
+
+
+def _adjust_datetime_text(text, process_timezones):
+    if jsonobject.re_loose_datetime.match(text):
+        try:
+            return six.text_type(json_format_datetime(
+                adjust_text_to_datetime(text, process_timezones=process_timezones)
+            ))
+        except iso8601.ParseError:
+            pass
+    return text
+
+
 def adjust_text_to_datetime(text, process_timezones=None):
     matching_datetime = iso8601.parse_date(text)
     if process_timezones or phone_timezones_should_be_processed():
@@ -197,12 +293,7 @@ def adjust_datetimes(data, parent=None, key=None, process_timezones=None):
     # this strips the timezone like we've always done
     # todo: in the future this will convert to UTC
     if isinstance(data, six.string_types) and jsonobject.re_loose_datetime.match(data):
-        try:
-            parent[key] = six.text_type(json_format_datetime(
-                adjust_text_to_datetime(data, process_timezones=process_timezones)
-            ))
-        except iso8601.ParseError:
-            pass
+        parent[key] = _adjust_datetime_text(data, process_timezones)
     elif isinstance(data, dict):
         for key, value in data.items():
             adjust_datetimes(value, parent=data, key=key, process_timezones=process_timezones)
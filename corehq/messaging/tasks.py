@@ -11,14 +11,21 @@ from corehq.form_processor.utils import should_use_sql_backend
 from corehq.messaging.scheduling.tasks import delete_schedule_instances_for_cases
 from corehq.messaging.scheduling.util import utcnow
 from corehq.messaging.util import MessagingRuleProgressHelper, use_phone_entries
-from corehq.sql_db.util import run_query_across_partitioned_databases
+from corehq.sql_db.util import run_query_across_partitioned_databases_concurrently, split_list_by_db_partition
 from corehq.toggles import REMINDERS_MIGRATION_IN_PROGRESS
 from corehq.util.celery_utils import no_result_task
+from dimagi.utils.chunked import chunked
 from dimagi.utils.couch import CriticalSection
 from django.conf import settings
 from django.db.models import Q
 from django.db import transaction
 
+# Number of case ids run_messaging_rule sends to each sync_cases_for_messaging_rule task
+MESSAGING_RULE_CASE_CHUNK_SIZE = 100
+# Number of cases sync_cases_for_messaging_rule locks and writes in one transaction.
+# Kept small so a group finishes well within the locks' timeout.
+MESSAGING_RULE_LOCK_GROUP_SIZE = 10
+
 
 def get_sync_key(case_id):
     return 'sync-case-for-messaging-%s' % case_id
@@ -48,6 +55,53 @@ def sync_case_for_messaging_rule(self, domain, case_id, rule_id):
         self.retry(exc=e)
 
 
+@no_result_task(queue=settings.CELERY_REMINDER_CASE_UPDATE_QUEUE, acks_late=True)
+def sync_cases_for_messaging_rule(domain, case_ids, rule_id):
+    """
+    Same as calling sync_case_for_messaging_rule for each case, but the cases
+    are loaded in bulk and their schedule instances are written in one
+    transaction per group of cases in the same database. Any case that fails is handed on to its own
+    sync_case_for_messaging_rule task, which retries it as before.
+    """
+    rule = _get_cached_rule(domain, rule_id)
+    if not rule:
+        return
+
+    progress_helper = MessagingRuleProgressHelper(rule_id)
+    for db_alias, shard_case_ids in split_list_by_db_partition(case_ids):
+        for group_case_ids in chunked(shard_case_ids, MESSAGING_RULE_LOCK_GROUP_SIZE):
+            group_case_ids = list(group_case_ids)
+            try:
+                failed_case_ids = _sync_cases_for_messaging_rule(domain, db_alias, group_case_ids, rule)
+            except Exception:
+                failed_case_ids = group_case_ids
+            for case_id in failed_case_ids:
+                sync_case_for_messaging_rule.delay(domain, case_id, rule_id)
+            progress_helper.increment_current_case_count(count=len(group_case_ids) - len(failed_case_ids))
+
+
+def _sync_cases_for_messaging_rule(domain, db_alias, case_ids, rule):
+    """
+    :param db_alias: the database that the cases' schedule instances are in
+    :return: ids of the cases that could not be synced
+    """
+    failed_case_ids = []
+    # the locks are held until the transaction is committed so that another
+    # sync of the same case can't read the instances before they're written.
+    # The keys are sorted so that tasks locking overlapping cases can't deadlock.
+    with CriticalSection(sorted(get_sync_key(case_id) for case_id in case_ids), timeout=5 * 60):
+        cases = CaseAccessors(domain).get_cases(case_ids)
+        failed_case_ids.extend(set(case_ids) - {case.case_id for case in cases})
+        with transaction.atomic(using=db_alias):
+            for case in cases:
+                try:
+                    with transaction.atomic(using=db_alias):
+                        rule.run_rule(case, utcnow())
+                except Exception:
+                    failed_case_ids.append(case.case_id)
+    return failed_case_ids
+
+
 def _sync_case_for_messaging(domain, case_id):
     try:
         case = CaseAccessors(domain).get_case(case_id)
@@ -108,7 +162,7 @@ def get_case_ids_for_messaging_rule(domain, case_type):
     if not should_use_sql_backend(domain):
         return CaseAccessors(domain).get_case_ids_in_domain(case_type)
     else:
-        return run_query_across_partitioned_databases(
+        return run_query_across_partitioned_databases_concurrently(
             CommCareCaseSQL,
             Q(domain=domain, type=case_type, deleted=False),
             values=['case_id']
@@ -130,9 +184,10 @@ def run_messaging_rule(domain, rule_id):
     total_count = 0
     progress_helper = MessagingRuleProgressHelper(rule_id)
 
-    for case_id in get_case_ids_for_messaging_rule(domain, rule.case_type):
-        sync_case_for_messaging_rule.delay(domain, case_id, rule_id)
-        total_count += 1
+    case_ids = get_case_ids_for_messaging_rule(domain, rule.case_type)
+    for chunk in chunked(case_ids, MESSAGING_RULE_CASE_CHUNK_SIZE):
+        sync_cases_for_messaging_rule.delay(domain, list(chunk), rule_id)
+        total_count += len(chunk)
         if total_count % 1000 == 0:
             progress_helper.set_total_case_count(total_count)
 
@@ -46,7 +46,14 @@ class OpenmrsRepeater(CaseRepeater):
 
     @memoized
     def payload_doc(self, repeat_record):
-        return FormAccessors(repeat_record.domain).get_form(repeat_record.payload_id)
+        form = self._get_prefetched_payload_doc(repeat_record)
+        if form is None:
+            form = FormAccessors(repeat_record.domain).get_form(repeat_record.payload_id)
+        return form
+
+    def get_payload_docs(self, payload_ids):
+        # payloads are forms, not the cases CaseRepeater fetches
+        return {form.form_id: form for form in FormAccessors(self.domain).get_forms(payload_ids)}
 
     @property
     def form_class_name(self):
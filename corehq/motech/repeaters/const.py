@@ -10,6 +10,14 @@ CHECK_REPEATERS_KEY = 'check-repeaters-key'
 
 POST_TIMEOUT = 75  # seconds
 
+# Records are delivered in batches of up to this many per repeater per check
+REPEAT_RECORD_BATCH_SIZE = 500
+# Maximum number of requests a batch sends to its repeater's server at once
+REPEATER_MAX_CONCURRENT_REQUESTS = 5
+# Only one batch runs per repeater at a time. Its lock expires after long
+# enough for every request in a full batch to time out.
+REPEATER_BATCH_LOCK_TIMEOUT = REPEAT_RECORD_BATCH_SIZE // REPEATER_MAX_CONCURRENT_REQUESTS * POST_TIMEOUT
+
 RECORD_PENDING_STATE = 'PENDING'
 RECORD_SUCCESS_STATE = 'SUCCESS'
 RECORD_FAILURE_STATE = 'FAIL'
@@ -0,0 +1,143 @@
+"""Health tracking and circuit breaker for repeater endpoints
+
+When a repeater's requests fail ``CIRCUIT_BREAKER_THRESHOLD`` times in a
+row its circuit is opened. While the circuit is open, records for the
+repeater are postponed as a batch rather than each being sent and left to
+time out. Once the wait is over a single record is sent as a probe. If
+the probe succeeds the circuit is closed. If it fails, the circuit is
+opened again for twice as long, up to ``CIRCUIT_MAX_WAIT``.
+
+State is kept in the cache so that it is shared by all celery workers.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import time
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+
+from corehq.util.datadog.gauges import datadog_counter, datadog_histogram
+from six.moves import range
+
+from .const import POST_TIMEOUT
+
+CIRCUIT_BREAKER_THRESHOLD = 5  # consecutive failures
+CIRCUIT_MIN_WAIT = timedelta(minutes=5)
+CIRCUIT_MAX_WAIT = timedelta(hours=4)
+PROBE_TIMEOUT = 2 * POST_TIMEOUT  # seconds
+
+STATS_BUCKET_SECONDS = 10 * 60
+STATS_BUCKETS = 6  # stats cover the last hour
+
+
+class RepeaterHealth(object):
+
+    def __init__(self, repeater):
+        self.repeater_id = repeater.get_id
+        self.tags = [
+            'domain:{}'.format(repeater.domain),
+            'repeater_type:{}'.format(repeater.doc_type),
+        ]
+
+    def record_success(self, elapsed=None):
+        self._record_request(elapsed, error=False)
+        cache.delete_many([self._key('failures'), self._key('circuit'), self._key('probe')])
+
+    def record_failure(self, elapsed=None):
+        self._record_request(elapsed, error=True)
+        failures = _incr(self._key('failures'), timeout=None)
+        if failures is not None and failures >= CIRCUIT_BREAKER_THRESHOLD:
+            self._open_circuit()
+
+    def is_open(self):
+        return cache.get(self._key('circuit')) is not None
+
+    def get_retry_time(self):
+        """:returns: when the next probe may be sent or ``None`` if the circuit is closed
+        """
+        circuit = cache.get(self._key('circuit'))
+        return circuit['open_until'] if circuit else None
+
+    def allow_request(self):
+        """Whether a request may be sent now
+
+        Always true while the circuit is closed. Once an open circuit's wait
+        is over it is true for the one caller that gets to send the probe.
+        """
+        retry_time = self.get_retry_time()
+        if retry_time is None:
+            return True
+        if datetime.utcnow() < retry_time:
+            return False
+        return cache.add(self._key('probe'), True, PROBE_TIMEOUT)
+
+    def get_stats(self):
+        """Request statistics for the last hour and the circuit's state
+        """
+        keys = {
+            (name, bucket): self._key(name, bucket)
+            for bucket in _get_stats_buckets()
+            for name in ('requests', 'errors', 'latency_ms')
+        }
+        values = cache.get_many(list(keys.values()))
+
+        def total(name):
+            return sum(values.get(key, 0) for (name_, bucket), key in keys.items() if name_ == name)
+
+        requests = total('requests')
+        return {
+            'requests': requests,
+            'errors': total('errors'),
+            'error_rate': total('errors') / requests if requests else None,
+            'average_latency': total('latency_ms') / requests / 1000 if requests else None,
+            'consecutive_failures': cache.get(self._key('failures')) or 0,
+            'circuit_open': self.is_open(),
+            'retry_time': self.get_retry_time(),
+        }
+
+    def _open_circuit(self):
+        now = datetime.utcnow()
+        circuit = cache.get(self._key('circuit'))
+        if circuit is None:
+            wait = CIRCUIT_MIN_WAIT
+        elif circuit['open_until'] > now:
+            # already open, e.g. other requests that were in flight have failed
+            return
+        else:
+            # the probe failed
+            wait = min(circuit['wait'] * 2, CIRCUIT_MAX_WAIT)
+        cache.set(self._key('circuit'), {'open_until': now + wait, 'wait': wait}, None)
+        cache.delete(self._key('probe'))
+        datadog_counter('commcare.repeaters.circuit_opened', tags=self.tags)
+
+    def _record_request(self, elapsed, error):
+        bucket = _get_stats_buckets()[0]
+        timeout = STATS_BUCKET_SECONDS * (STATS_BUCKETS + 1)
+        _incr(self._key('requests', bucket), timeout=timeout)
+        if error:
+            _incr(self._key('errors', bucket), timeout=timeout)
+        if elapsed is not None:
+            _incr(self._key('latency_ms', bucket), int(elapsed * 1000), timeout=timeout)
+            datadog_histogram('commcare.repeaters.request_time', elapsed, tags=self.tags)
+
+    def _key(self, name, bucket=None):
+        key = 'repeater-health.{}.{}'.format(self.repeater_id, name)
+        if bucket is not None:
+            key = '{}.{}'.format(key, bucket)
+        return key
+
+
+def _get_stats_buckets():
+    current = int(time.time()) // STATS_BUCKET_SECONDS
+    return [current - i for i in range(STATS_BUCKETS)]
+
+
+def _incr(key, delta=1, timeout=None):
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # expired between add and incr
+        return None
@@ -1,7 +1,9 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import time
 import warnings
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 import six
@@ -65,6 +67,7 @@ from .dbaccessors import (
     get_cancelled_repeat_record_count
 )
 from .exceptions import RequestConnectionError
+from .health import RepeaterHealth
 from .utils import get_all_repeater_types
 
 
@@ -114,6 +117,10 @@ class Repeater(QuickCachedDocumentMixin, Document, UnicodeMixIn):
 
     payload_generator_classes = ()
 
+    # set for a batch of records by `prefetch_payload_docs` and `use_session`
+    _prefetched_payload_docs = {}
+    _session = None
+
     @classmethod
     def get_custom_url(cls, domain):
         return None
@@ -153,6 +160,34 @@ class Repeater(QuickCachedDocumentMixin, Document, UnicodeMixIn):
     def payload_doc(self, repeat_record):
         raise NotImplementedError
 
+    def get_payload_docs(self, payload_ids):
+        """
+        Fetch payload docs in bulk. Repeaters that can't do that return
+        an empty dict and the docs are fetched one at a time by `payload_doc`
+
+        :returns: dict of payload docs by payload id
+        """
+        return {}
+
+    def prefetch_payload_docs(self, repeat_records):
+        """Fetch the payload docs for a batch of repeat records up front
+        """
+        payload_ids = list({record.payload_id for record in repeat_records})
+        self._prefetched_payload_docs = self.get_payload_docs(payload_ids) if payload_ids else {}
+
+    def _get_prefetched_payload_doc(self, repeat_record):
+        return self._prefetched_payload_docs.get(repeat_record.payload_id)
+
+    @contextmanager
+    def use_session(self, session):
+        """Send requests through ``session`` to reuse its connection pool
+        """
+        self._session = session
+        try:
+            yield
+        finally:
+            self._session = None
+
     @memoized
     def get_payload(self, repeat_record):
         return self.generator.get_payload(repeat_record, self.payload_doc(repeat_record))
@@ -295,26 +330,42 @@ class Repeater(QuickCachedDocumentMixin, Document, UnicodeMixIn):
         headers = self.get_headers(repeat_record)
         auth = self.get_auth()
         url = self.get_url(repeat_record)
-        return simple_post(payload, url, headers=headers, timeout=POST_TIMEOUT, auth=auth, verify=self.verify)
+        return simple_post(payload, url, headers=headers, timeout=POST_TIMEOUT, auth=auth, verify=self.verify,
+                           session=self._session)
+
+    @property
+    @memoized
+    def health(self):
+        return RepeaterHealth(self)
 
     def fire_for_record(self, repeat_record):
         payload = self.get_payload(repeat_record)
+        start = time.time()
         try:
             response = self.send_request(repeat_record, payload)
         except (Timeout, ConnectionError) as error:
             log_repeater_timeout_in_datadog(self.domain)
-            return self.handle_response(RequestConnectionError(error), repeat_record)
+            return self.handle_response(RequestConnectionError(error), repeat_record, time.time() - start)
         except Exception as e:
-            return self.handle_response(e, repeat_record)
+            return self.handle_response(e, repeat_record, time.time() - start)
         else:
-            return self.handle_response(response, repeat_record)
+            return self.handle_response(response, repeat_record, time.time() - start)
 
-    def handle_response(self, result, repeat_record):
+    def handle_response(self, result, repeat_record, elapsed=None):
         """
         route the result to the success, failure, or exception handlers
 
         result may be either a response object or an exception
+
+        elapsed is the time in seconds taken to send the request. Server
+        errors and exceptions count towards opening the repeater's circuit,
+        any other response shows that the endpoint is up.
         """
+        if isinstance(result, Exception) or result.status_code >= 500:
+            self.health.record_failure(elapsed)
+        else:
+            self.health.record_success(elapsed)
+
         if isinstance(result, Exception):
             attempt = repeat_record.handle_exception(result)
             self.generator.handle_exception(result, repeat_record)
@@ -351,7 +402,13 @@ class FormRepeater(Repeater):
 
     @memoized
     def payload_doc(self, repeat_record):
-        return FormAccessors(repeat_record.domain).get_form(repeat_record.payload_id)
+        form = self._get_prefetched_payload_doc(repeat_record)
+        if form is None:
+            form = FormAccessors(repeat_record.domain).get_form(repeat_record.payload_id)
+        return form
+
+    def get_payload_docs(self, payload_ids):
+        return {form.form_id: form for form in FormAccessors(self.domain).get_forms(payload_ids)}
 
     @property
     def form_class_name(self):
@@ -420,7 +477,13 @@ class CaseRepeater(Repeater):
 
     @memoized
     def payload_doc(self, repeat_record):
-        return CaseAccessors(repeat_record.domain).get_case(repeat_record.payload_id)
+        case = self._get_prefetched_payload_doc(repeat_record)
+        if case is None:
+            case = CaseAccessors(repeat_record.domain).get_case(repeat_record.payload_id)
+        return case
+
+    def get_payload_docs(self, payload_ids):
+        return {case.case_id: case for case in CaseAccessors(self.domain).get_cases(payload_ids)}
 
     @property
     def form_class_name(self):
@@ -483,7 +546,13 @@ class ShortFormRepeater(Repeater):
 
     @memoized
     def payload_doc(self, repeat_record):
-        return FormAccessors(repeat_record.domain).get_form(repeat_record.payload_id)
+        form = self._get_prefetched_payload_doc(repeat_record)
+        if form is None:
+            form = FormAccessors(repeat_record.domain).get_form(repeat_record.payload_id)
+        return form
+
+    def get_payload_docs(self, payload_ids):
+        return {form.form_id: form for form in FormAccessors(self.domain).get_forms(payload_ids)}
 
     def allowed_to_forward(self, payload):
         return payload.xmlns != DEVICE_LOG_XMLNS
@@ -528,7 +597,16 @@ class LocationRepeater(Repeater):
 
     @memoized
     def payload_doc(self, repeat_record):
-        return SQLLocation.objects.get(location_id=repeat_record.payload_id)
+        location = self._get_prefetched_payload_doc(repeat_record)
+        if location is None:
+            location = SQLLocation.objects.get(location_id=repeat_record.payload_id)
+        return location
+
+    def get_payload_docs(self, payload_ids):
+        return {
+            location.location_id: location
+            for location in SQLLocation.objects.filter(location_id__in=payload_ids)
+        }
 
     def __unicode__(self):
         return "forwarding locations to: %s" % self.url
@@ -651,10 +729,11 @@ class RepeatRecord(Document):
         for i, attempt in enumerate(self.attempts):
             yield i + 1, attempt
 
-    def postpone_by(self, duration):
+    def postpone_by(self, duration, save=True):
         self.last_checked = datetime.utcnow()
         self.next_check = self.last_checked + duration
-        self.save()
+        if save:
+            self.save()
 
     def make_set_next_try_attempt(self, failure_reason):
         # we use an exponential back-off to avoid submitting to bad urls
@@ -702,11 +781,15 @@ class RepeatRecord(Document):
             succeeded=False,
         )
 
-    def fire(self, force_send=False):
+    def fire(self, force_send=False, repeater=None, save=True):
+        """
+        :param repeater: the record's repeater if it has already been fetched
+        :param save: pass ``False`` to leave saving the record to the caller
+        """
         if self.try_now() or force_send:
             self.overall_tries += 1
             try:
-                attempt = self.repeater.fire_for_record(self)
+                attempt = (repeater or self.repeater).fire_for_record(self)
             except Exception as e:
                 log_repeater_error_in_datadog(self.domain, status_code=None,
                                               repeater_type=self.repeater_type)
@@ -717,7 +800,8 @@ class RepeatRecord(Document):
                 # that'll only happen if fire_for_record raise a non-Exception exception (e.g. SIGINT)
                 # or handle_payload_exception raises an exception. I'm okay with that. -DMR
                 self.add_attempt(attempt)
-                self.save()
+                if save:
+                    self.save()
 
     @staticmethod
     def _format_response(response):
@@ -1,10 +1,15 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+from collections import defaultdict
 from datetime import datetime, timedelta
+
+import requests
 from celery.schedules import crontab
-from couchdbkit import ResourceNotFound
+from concurrent import futures
+from couchdbkit import BulkSaveError, ResourceNotFound
 
 from django.conf import settings
+from django.db import connections
 from celery.task import periodic_task, task
 from celery.utils.log import get_task_logger
 from redis.exceptions import LockError
@@ -15,11 +20,17 @@ from dimagi.utils.couch.undo import DELETED_SUFFIX
 from corehq.motech.repeaters.dbaccessors import iterate_repeat_records, \
     get_overdue_repeat_record_count
 from corehq import toggles
+from corehq.motech.repeaters.models import Repeater, RepeatRecord
 from corehq.motech.repeaters.const import (
     CHECK_REPEATERS_INTERVAL,
     CHECK_REPEATERS_KEY,
     RECORD_PENDING_STATE,
-    RECORD_FAILURE_STATE)
+    RECORD_FAILURE_STATE,
+    REPEAT_RECORD_BATCH_SIZE,
+    REPEATER_BATCH_LOCK_TIMEOUT,
+    REPEATER_MAX_CONCURRENT_REQUESTS,
+)
+from corehq.sql_db.util import in_transaction
 
 logging = get_task_logger(__name__)
 
@@ -42,6 +53,13 @@ def check_repeaters():
     if not check_repeater_lock.acquire(blocking=False):
         return
 
+    # Records are grouped by repeater and each repeater gets at most one batch
+    # per check so that its server isn't sent more than one batch's worth of
+    # concurrent requests. Records that don't fit, or whose repeater still
+    # has a batch running from an earlier check, are picked up next time.
+    batches = defaultdict(list)
+    dispatched_repeater_ids = set()
+    busy_repeater_ids = {}
     for record in iterate_repeat_records(start):
         now = datetime.utcnow()
         lock_key = _get_repeat_record_lock_key(record)
@@ -49,11 +67,28 @@ def check_repeaters():
         if now > cutoff:
             break
 
+        if record.repeater_id in dispatched_repeater_ids:
+            continue
+
+        if record.repeater_id not in busy_repeater_ids:
+            busy_repeater_ids[record.repeater_id] = bool(
+                redis_client.exists(_get_repeater_batch_lock_key(record.repeater_id))
+            )
+        if busy_repeater_ids[record.repeater_id]:
+            continue
+
         lock = redis_client.lock(lock_key, timeout=60 * 60 * 48)
         if not lock.acquire(blocking=False):
             continue
 
-        process_repeat_record.delay(record)
+        batch = batches[record.repeater_id]
+        batch.append(record)
+        if len(batch) >= REPEAT_RECORD_BATCH_SIZE:
+            process_repeat_record_batch.delay(record.repeater_id, batches.pop(record.repeater_id))
+            dispatched_repeater_ids.add(record.repeater_id)
+
+    for repeater_id, batch in batches.items():
+        process_repeat_record_batch.delay(repeater_id, batch)
 
     try:
         check_repeater_lock.release()
@@ -88,9 +123,158 @@ def process_repeat_record(repeat_record):
                 repeat_record.doc_type += DELETED_SUFFIX
                 repeat_record.save()
         elif repeat_record.state == RECORD_PENDING_STATE or repeat_record.state == RECORD_FAILURE_STATE:
+            if repeat_record.repeater.health.allow_request():
                 repeat_record.fire()
+            else:
+                _postpone_until_retry_time(repeat_record, repeat_record.repeater.health)
+                repeat_record.save()
+    except Exception:
+        logging.exception('Failed to process repeat record: {}'.format(repeat_record._id))
+    # saved straight away so that a batch that dies part way through
+    # does not send records that were already sent again
+    repeat_record.save()
+
+
+@task(queue=settings.CELERY_REPEAT_RECORD_QUEUE)
+def process_repeat_record_batch(repeater_id, repeat_records):
+    """
+    Process repeat records belonging to the same repeater
+
+    The outcome for each record is the same as for `process_repeat_record`
+    but the repeater is fetched once, payload docs are fetched in bulk, the
+    payloads are sent concurrently over a shared HTTP session. Records that
+    are not sent are saved in bulk and each record that is sent is saved as
+    soon as its attempt is recorded.
+
+    Only one batch runs for a repeater at a time. If another batch is still
+    running the records are unlocked to be picked up by a later check.
+    """
+    redis_client = get_redis_client().client.get_client()
+    lock = redis_client.lock(_get_repeater_batch_lock_key(repeater_id), timeout=REPEATER_BATCH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        redis_client.delete(*[_get_repeat_record_lock_key(record) for record in repeat_records])
+        return
+
+    try:
+        _process_repeat_record_batch(repeater_id, repeat_records)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # Ignore if the lock expired
+            pass
+
+
+def _process_repeat_record_batch(repeater_id, repeat_records):
+    try:
+        repeater = Repeater.get(repeater_id)
+    except ResourceNotFound:
+        repeater = None
+
+    to_save = []
+    to_fire = []
+    for repeat_record in repeat_records:
+        if (repeat_record.state == RECORD_FAILURE_STATE
+                and repeat_record.overall_tries >= repeat_record.max_possible_tries):
+            repeat_record.cancel()
+            to_save.append(repeat_record)
+        elif repeat_record.cancelled:
+            continue
+        elif repeater is None:
+            repeat_record.cancel()
+            to_save.append(repeat_record)
+        elif repeater.paused:
+            # see process_repeat_record
+            repeat_record.postpone_by(timedelta(hours=1), save=False)
+            to_save.append(repeat_record)
+        elif repeater.doc_type.endswith(DELETED_SUFFIX):
+            if not repeat_record.doc_type.endswith(DELETED_SUFFIX):
+                repeat_record.doc_type += DELETED_SUFFIX
+                to_save.append(repeat_record)
+        elif repeat_record.state == RECORD_PENDING_STATE or repeat_record.state == RECORD_FAILURE_STATE:
+            to_fire.append(repeat_record)
+
+    if to_save:
+        try:
+            RepeatRecord.bulk_save(to_save)
+        except BulkSaveError:
+            logging.exception('Failed to save repeat records for repeater: {}'.format(repeater_id))
+
+    if to_fire:
+        _fire_repeat_records(repeater, to_fire)
+
+
+def _fire_repeat_records(repeater, repeat_records):
+    health = repeater.health
+    if not health.allow_request():
+        for repeat_record in repeat_records:
+            _postpone_until_retry_time(repeat_record, health)
+        return
+
+    try:
+        repeater.prefetch_payload_docs(repeat_records)
+    except Exception:
+        # payload_doc falls back to fetching each doc and handles any errors doing so
+        logging.exception('Failed to fetch payloads for repeater: {}'.format(repeater._id))
+
+    max_workers = min(REPEATER_MAX_CONCURRENT_REQUESTS, len(repeat_records))
+    if in_transaction():
+        # other threads' connections wouldn't see uncommitted changes
+        max_workers = 1
+
+    def fire(repeat_record):
+        if health.is_open():
+            # opened by failures earlier in the batch
+            _postpone_until_retry_time(repeat_record, health)
+        else:
+            _fire_repeat_record(repeater, repeat_record)
+
+    def fire_in_thread(repeat_record):
+        try:
+            fire(repeat_record)
+        finally:
+            connections.close_all()
+
+    with _get_session(max_workers) as session, repeater.use_session(session):
+        if health.is_open():
+            # this batch sends the probe and only sends the rest if it succeeds
+            _fire_repeat_record(repeater, repeat_records[0])
+            repeat_records = repeat_records[1:]
+
+        if max_workers == 1:
+            for repeat_record in repeat_records:
+                fire(repeat_record)
+        else:
+            with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(fire_in_thread, repeat_records))
+
+
+def _fire_repeat_record(repeater, repeat_record):
+    try:
+        repeat_record.fire(repeater=repeater, save=False)
     except Exception:
         logging.exception('Failed to process repeat record: {}'.format(repeat_record._id))
+    # saved straight away so that a batch that dies part way through
+    # does not send records that were already sent again
+    repeat_record.save()
+
+
+def _postpone_until_retry_time(repeat_record, health):
+    """Postpone a record while its repeater's circuit is open
+
+    Unlike a failed attempt this doesn't count towards the record's tries.
+    """
+    now = datetime.utcnow()
+    retry_time = max(health.get_retry_time() or now, now + CHECK_REPEATERS_INTERVAL)
+    repeat_record.postpone_by(retry_time - now)
+
+
+def _get_session(pool_size):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 def _get_repeat_record_lock_key(record):
@@ -101,6 +285,10 @@ def _get_repeat_record_lock_key(record):
     return 'repeat_record_in_progress-{}_{}'.format(record._id, record._rev)
 
 
+def _get_repeater_batch_lock_key(repeater_id):
+    return 'repeater_batch_in_progress-{}'.format(repeater_id)
+
+
 repeaters_overdue = datadog_gauge_task(
     'commcare.repeaters.overdue',
     get_overdue_repeat_record_count,
@@ -0,0 +1,86 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from datetime import datetime, timedelta
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from mock import patch
+
+from corehq.motech.repeaters.health import (
+    CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_MIN_WAIT,
+    RepeaterHealth,
+)
+from corehq.motech.repeaters.models import FormRepeater
+from six.moves import range
+
+locmem_cache = caches['locmem']
+
+
+@patch('corehq.motech.repeaters.health.cache', locmem_cache)
+class RepeaterHealthTest(SimpleTestCase):
+
+    def setUp(self):
+        locmem_cache.clear()
+        self.health = RepeaterHealth(FormRepeater(_id='abc123', domain='health-test'))
+
+    def tearDown(self):
+        locmem_cache.clear()
+
+    def _fail(self, times=CIRCUIT_BREAKER_THRESHOLD):
+        for i in range(times):
+            self.health.record_failure(elapsed=1)
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self._fail(CIRCUIT_BREAKER_THRESHOLD - 1)
+        self.assertFalse(self.health.is_open())
+        self.assertTrue(self.health.allow_request())
+        self._fail(1)
+        self.assertTrue(self.health.is_open())
+        self.assertFalse(self.health.allow_request())
+
+    def test_success_resets_failures(self):
+        self._fail(CIRCUIT_BREAKER_THRESHOLD - 1)
+        self.health.record_success(elapsed=1)
+        self._fail(CIRCUIT_BREAKER_THRESHOLD - 1)
+        self.assertFalse(self.health.is_open())
+
+    def test_probe(self):
+        self._fail()
+        retry_time = self.health.get_retry_time()
+        with patch('corehq.motech.repeaters.health.datetime') as mock_datetime:
+            mock_datetime.utcnow.return_value = retry_time + timedelta(seconds=1)
+            self.assertTrue(self.health.allow_request())
+            # only one caller gets to probe
+            self.assertFalse(self.health.allow_request())
+
+            self.health.record_failure()
+            # the probe failed so the wait doubles
+            self.assertEqual(
+                self.health.get_retry_time(),
+                retry_time + timedelta(seconds=1) + 2 * CIRCUIT_MIN_WAIT
+            )
+
+        self.health.record_success()
+        self.assertFalse(self.health.is_open())
+        self.assertTrue(self.health.allow_request())
+
+    def test_failures_while_open_do_not_extend_wait(self):
+        self._fail()
+        retry_time = self.health.get_retry_time()
+        self._fail()
+        self.assertEqual(self.health.get_retry_time(), retry_time)
+        self.assertLessEqual(retry_time, datetime.utcnow() + CIRCUIT_MIN_WAIT)
+
+    def test_stats(self):
+        self.health.record_success(elapsed=0.5)
+        self.health.record_failure(elapsed=1.5)
+        stats = self.health.get_stats()
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['error_rate'], 0.5)
+        self.assertEqual(stats['average_latency'], 1)
+        self.assertEqual(stats['consecutive_failures'], 1)
+        self.assertFalse(stats['circuit_open'])
+        self.assertIsNone(stats['retry_time'])
@@ -18,7 +18,12 @@ from corehq.apps.receiverwrapper.exceptions import DuplicateFormatException, Ign
 from corehq.apps.receiverwrapper.util import submit_form_locally
 from corehq.motech.repeaters.repeater_generators import FormRepeaterXMLPayloadGenerator, RegisterGenerator, \
     BasePayloadGenerator
-from corehq.motech.repeaters.tasks import check_repeaters, process_repeat_record
+from corehq.motech.repeaters.tasks import (
+    _get_repeater_batch_lock_key,
+    check_repeaters,
+    process_repeat_record,
+    process_repeat_record_batch,
+)
 from corehq.motech.repeaters.models import (
     CaseRepeater,
     FormRepeater,
@@ -32,6 +37,7 @@ from corehq.apps.users.models import CommCareUser
 from corehq.form_processor.tests.utils import run_with_all_backends, FormProcessorTestUtils
 from corehq.form_processor.interfaces.dbaccessors import CaseAccessors, FormAccessors
 from couchforms.const import DEVICE_LOG_XMLNS
+from dimagi.utils.couch.cache.cache_core import get_redis_client
 from dimagi.utils.parsing import json_format_datetime
 from corehq.util.test_utils import flag_enabled
 
@@ -271,11 +277,11 @@ class RepeaterTest(BaseRepeaterTest):
     def test_process_repeat_record_locking(self):
         self.assertEqual(len(RepeatRecord.all()), 2)
 
-        with patch('corehq.motech.repeaters.tasks.process_repeat_record') as mock_process:
+        with patch('corehq.motech.repeaters.tasks.process_repeat_record_batch') as mock_process:
             check_repeaters()
             self.assertEqual(mock_process.delay.call_count, 2)
 
-        with patch('corehq.motech.repeaters.tasks.process_repeat_record') as mock_process:
+        with patch('corehq.motech.repeaters.tasks.process_repeat_record_batch') as mock_process:
             check_repeaters()
             self.assertEqual(mock_process.delay.call_count, 0)
 
@@ -284,10 +290,53 @@ class RepeaterTest(BaseRepeaterTest):
         for record in records:
             record.save()
 
-        with patch('corehq.motech.repeaters.tasks.process_repeat_record') as mock_process:
+        with patch('corehq.motech.repeaters.tasks.process_repeat_record_batch') as mock_process:
             check_repeaters()
             self.assertEqual(mock_process.delay.call_count, 2)
 
+    @run_with_all_backends
+    def test_process_repeat_record_batch(self):
+        repeat_record, = [record for record in RepeatRecord.all() if record.repeater_id == self.form_repeater._id]
+        with patch('corehq.motech.repeaters.models.simple_post',
+                   return_value=MockResponse(status_code=200, reason='')) as mock_post:
+            process_repeat_record_batch(self.form_repeater._id, [repeat_record])
+            self.assertEqual(mock_post.call_count, 1)
+            self.assertIsNotNone(mock_post.call_args[1]['session'])
+
+        repeat_record = RepeatRecord.get(repeat_record._id)
+        self.assertEqual(repeat_record.state, RECORD_SUCCESS_STATE)
+        self.assertEqual(repeat_record.overall_tries, 1)
+
+    @run_with_all_backends
+    def test_process_repeat_record_batch_locked(self):
+        redis_client = get_redis_client().client.get_client()
+        lock = redis_client.lock(_get_repeater_batch_lock_key(self.form_repeater._id), timeout=60)
+        lock.acquire()
+        try:
+            with patch('corehq.motech.repeaters.tasks.process_repeat_record_batch') as mock_process:
+                check_repeaters()
+                self.assertEqual(mock_process.delay.call_count, 1)  # only the case repeater's batch
+
+            repeat_record, = [record for record in RepeatRecord.all()
+                              if record.repeater_id == self.form_repeater._id]
+            with patch('corehq.motech.repeaters.models.simple_post') as mock_post:
+                process_repeat_record_batch(self.form_repeater._id, [repeat_record])
+                self.assertEqual(mock_post.call_count, 0)
+        finally:
+            lock.release()
+
+    @run_with_all_backends
+    def test_process_repeat_record_batch_paused(self):
+        self.form_repeater.pause()
+        repeat_record, = [record for record in RepeatRecord.all() if record.repeater_id == self.form_repeater._id]
+        with patch('corehq.motech.repeaters.models.simple_post') as mock_post:
+            process_repeat_record_batch(self.form_repeater._id, [repeat_record])
+            self.assertEqual(mock_post.call_count, 0)
+
+        repeat_record = RepeatRecord.get(repeat_record._id)
+        self.assertEqual(repeat_record.overall_tries, 0)
+        self.assertGreater(repeat_record.next_check, datetime.utcnow() + timedelta(minutes=59))
+
     @run_with_all_backends
     def test_automatic_cancel_repeat_record(self):
         repeat_record = self.case_repeater.register(CaseAccessors(self.domain).get_case(CASE_ID))
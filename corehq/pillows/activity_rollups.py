@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from corehq.apps.change_feed import topics
+from corehq.apps.change_feed.consumer.feed import KafkaChangeFeed, KafkaCheckpointEventHandler
+from corehq.apps.change_feed.document_types import CASE_DOC_TYPES
+from corehq.apps.reports.rollups import mark_stale, uses_activity_rollups
+from dimagi.utils.parsing import string_to_utc_datetime
+from pillowtop.checkpoints.manager import KafkaPillowCheckpoint
+from pillowtop.pillow.interface import ConstructedPillow
+from pillowtop.processors.interface import PillowProcessor
+
+
+class ActivityRollupProcessor(PillowProcessor):
+    """
+    Marks the days a form or case counts towards in the worker activity
+    rollups as needing to be recalculated. See ``corehq.apps.reports.rollups``
+    """
+
+    def process_change(self, pillow_instance, change):
+        if change.metadata is None or not change.metadata.domain:
+            return
+
+        domain = change.metadata.domain
+        if not uses_activity_rollups(domain):
+            return
+
+        doc = change.get_document()
+        if not doc:
+            return
+
+        if doc.get('doc_type') in CASE_DOC_TYPES:
+            date_values = [doc.get('opened_on'), doc.get('closed_on')]
+        else:
+            date_values = [doc.get('received_on'), doc.get('form', {}).get('meta', {}).get('timeEnd')]
+        dates = [_to_date(value) for value in date_values if value]
+        dates = [date for date in dates if date is not None]
+        if dates:
+            mark_stale(domain, dates)
+
+
+def _to_date(value):
+    try:
+        return string_to_utc_datetime(value).date()
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def get_activity_rollup_pillow(pillow_id='ActivityRollupPillow', num_processes=1, process_num=0, **kwargs):
+    """
+    Marks days whose form and case activity rollups need updating for domains
+    that use them
+    """
+    change_feed = KafkaChangeFeed(
+        topics=topics.FORM_TOPICS + topics.CASE_TOPICS, group_id='activity-rollups',
+        num_processes=num_processes, process_num=process_num
+    )
+    checkpoint = KafkaPillowCheckpoint('activity-rollups', topics.FORM_TOPICS + topics.CASE_TOPICS)
+    return ConstructedPillow(
+        name=pillow_id,
+        checkpoint=checkpoint,
+        change_feed=change_feed,
+        processor=ActivityRollupProcessor(),
+        change_processed_event_handler=KafkaCheckpointEventHandler(
+            checkpoint=checkpoint, checkpoint_frequency=100, change_feed=change_feed,
+        ),
+    )
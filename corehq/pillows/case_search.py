@@ -14,6 +14,7 @@ from corehq.apps.case_search.const import (
     SYSTEM_PROPERTIES,
     VALUE,
 )
+from corehq.apps.case_search.cache import invalidate_search_results
 from corehq.apps.case_search.exceptions import CaseSearchNotEnabledException
 from corehq.apps.case_search.models import case_search_enabled_domains
 from corehq.apps.change_feed import topics
@@ -95,15 +96,48 @@ class CaseSearchPillowProcessor(ElasticProcessor):
 
     def process_change(self, pillow_instance, change):
         assert isinstance(change, Change)
-        if change.metadata is not None:
-            # Comes from KafkaChangeFeed (i.e. running pillowtop)
-            domain = change.metadata.domain
-        else:
-            # comes from ChangeProvider (i.e reindexing)
-            domain = change.get_document()['domain']
-
+        domain = _get_change_domain(change)
         if domain and domain_needs_search_index(domain):
             super(CaseSearchPillowProcessor, self).process_change(pillow_instance, change)
+            _invalidate_cached_search_results(domain, change)
+
+    def process_changes_chunk(self, pillow_instance, changes_chunk):
+        """
+        Apply the same domain filter and search cache invalidation as
+        ``process_change`` to a chunk of changes.
+        """
+        changes_by_domain = [(_get_change_domain(change), change) for change in changes_chunk]
+        changes_by_domain = [
+            (domain, change) for domain, change in changes_by_domain
+            if domain and domain_needs_search_index(domain)
+        ]
+        retry, errors = super(CaseSearchPillowProcessor, self).process_changes_chunk(
+            pillow_instance, [change for domain, change in changes_by_domain]
+        )
+        failed = {id(change) for change in retry} | {id(change) for change, exception in errors}
+        for domain, change in changes_by_domain:
+            if id(change) not in failed:
+                _invalidate_cached_search_results(domain, change)
+        return retry, errors
+
+
+def _get_change_domain(change):
+    if change.metadata is not None:
+        # Comes from KafkaChangeFeed (i.e. running pillowtop)
+        return change.metadata.domain
+    # comes from ChangeProvider (i.e reindexing)
+    return change.get_document()['domain']
+
+
+def _invalidate_cached_search_results(domain, change):
+    if change.deleted:
+        # the case type of a deleted case is not known
+        invalidate_search_results(domain)
+        return
+    doc = change.get_document()
+    if doc is not None:
+        # the case was indexed
+        invalidate_search_results(domain, doc.get('type'))
 
 
 def get_case_search_to_elasticsearch_pillow(pillow_id='CaseSearchToElasticsearchPillow', num_processes=1,
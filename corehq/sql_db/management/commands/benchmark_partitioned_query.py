@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from corehq.sql_db.util import (
+    MAX_PARTITIONED_QUERY_WORKERS,
+    get_db_aliases_for_partitioned_query,
+    run_query_across_partitioned_databases,
+    run_query_across_partitioned_databases_concurrently,
+)
+from six.moves import range
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the time taken to query all partitioned databases one after "
+        "another with querying them concurrently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='Partitioned model e.g. form_processor.CommCareCaseSQL')
+        parser.add_argument('domain')
+        parser.add_argument(
+            '--values', nargs='+', default=None,
+            help='Fields to fetch instead of whole objects'
+        )
+        parser.add_argument('--order-by', nargs='+', default=None)
+        parser.add_argument('--workers', type=int, default=MAX_PARTITIONED_QUERY_WORKERS)
+        parser.add_argument('--iterations', type=int, default=3)
+
+    def handle(self, model, domain, values, order_by, workers, iterations, **options):
+        model_class = apps.get_model(model)
+        q_expression = Q(domain=domain)
+        print("Querying {} databases".format(len(get_db_aliases_for_partitioned_query())))
+
+        def serial():
+            return run_query_across_partitioned_databases(model_class, q_expression, values=values)
+
+        def concurrent():
+            return run_query_across_partitioned_databases_concurrently(
+                model_class, q_expression, values=values, order_by=order_by, max_workers=workers
+            )
+
+        for name, query in [('serial', serial), ('concurrent', concurrent)]:
+            timings = []
+            first_result_timings = []
+            for i in range(iterations):
+                start = time.time()
+                count = 0
+                for result in query():
+                    if not count:
+                        first_result_timings.append(time.time() - start)
+                    count += 1
+                timings.append(time.time() - start)
+            print("{:<12} {} results, first after {:.3f}s, all after {:.3f}s (best of {})".format(
+                name, count, min(first_result_timings or [0]), min(timings), iterations
+            ))
@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+from collections import namedtuple
+
+from django.test import SimpleTestCase
+
+from corehq.sql_db.util import _ConcurrentQueryRunner, _get_order_key, _merge_sorted
+from six.moves import range
+
+
+class FakeQuerySet(object):
+
+    def __init__(self, results, error=None, started=None):
+        self.results = results
+        self.error = error
+        self.started = started
+
+    def iterator(self):
+        if self.started is not None:
+            self.started.set()
+        for result in self.results:
+            yield result
+        if self.error is not None:
+            raise self.error
+
+
+class FakeConnection(object):
+    connection = None
+
+    def close(self):
+        pass
+
+
+class FakeQueryRunner(_ConcurrentQueryRunner):
+
+    @staticmethod
+    def _get_connection(db_name):
+        return FakeConnection()
+
+
+class ConcurrentQueryRunnerTest(SimpleTestCase):
+
+    def _get_runner(self, querysets):
+        return FakeQueryRunner(querysets.get, list(querysets))
+
+    def test_iter_results(self):
+        runner = self._get_runner({
+            'default': FakeQuerySet(list(range(250))),
+            'other': FakeQuerySet(list(range(250, 300))),
+        })
+        self.assertEqual(sorted(runner.iter_results(max_workers=1)), list(range(300)))
+
+    def test_iter_merged(self):
+        runner = self._get_runner({
+            'default': FakeQuerySet([1, 4, 5, 8]),
+            'other': FakeQuerySet([2, 3, 6]),
+            'empty': FakeQuerySet([]),
+        })
+        self.assertEqual(list(runner.iter_merged(lambda result: result)), [1, 2, 3, 4, 5, 6, 8])
+
+    def test_error_is_raised(self):
+        runner = self._get_runner({
+            'default': FakeQuerySet([1, 2], error=ValueError('boom')),
+            'other': FakeQuerySet([3]),
+        })
+        with self.assertRaises(ValueError):
+            list(runner.iter_results(max_workers=2))
+
+    def test_close_cancels_queries(self):
+        started = threading.Event()
+        runner = self._get_runner({
+            'default': FakeQuerySet(range(10 ** 9), started=started),
+        })
+        results = runner.iter_results(max_workers=1)
+        self.assertEqual(next(results), 0)
+        results.close()
+        self.assertTrue(started.is_set())
+        self.assertTrue(runner.cancelled.is_set())
+
+
+class MergeSortedTest(SimpleTestCase):
+
+    def test_merge(self):
+        self.assertEqual(
+            list(_merge_sorted([[1, 3], [], [2, 2, 4]], key=lambda x: x)),
+            [1, 2, 2, 3, 4]
+        )
+
+    def test_order_key(self):
+        Row = namedtuple('Row', 'a b')
+        self.assertEqual(_get_order_key(['b'], None)(Row(1, 2)), 2)
+        self.assertEqual(_get_order_key(['a'], ['a'])('x'), 'x')
+        self.assertEqual(_get_order_key(['b', 'a'], ['a', 'b'])((1, 2)), (2, 1))
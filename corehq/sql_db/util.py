@@ -1,8 +1,15 @@
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
+import heapq
+import itertools
+import sys
+import threading
 import uuid
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
 from numpy import random
 
 from django.conf import settings
@@ -12,6 +19,7 @@ from functools import wraps
 from psycopg2._psycopg import InterfaceError as Psycopg2InterfaceError
 import six
 from memoized import memoized
+from six.moves.queue import Full, Queue
 
 from corehq.sql_db.config import partition_config
 from corehq.util.quickcache import quickcache
@@ -19,6 +27,7 @@ from corehq.util.quickcache import quickcache
 
 ACCEPTABLE_STANDBY_DELAY_SECONDS = 3
 STALE_CHECK_FREQUENCY = 30
+MAX_PARTITIONED_QUERY_WORKERS = 16
 
 
 def run_query_across_partitioned_databases(model_class, q_expression, values=None, annotate=None):
@@ -47,21 +56,286 @@ def run_query_across_partitioned_databases(model_class, q_expression, values=Non
         raise ValueError("Expected a list or tuple")
 
     for db_name in db_names:
-        qs = model_class.objects.using(db_name)
-        if annotate:
-            qs = qs.annotate(**annotate)
-
-        qs = qs.filter(q_expression)
-        if values:
-            if len(values) == 1:
-                qs = qs.values_list(*values, flat=True)
-            else:
-                qs = qs.values_list(*values)
-
+        qs = _get_partitioned_queryset(db_name, model_class, q_expression, values, annotate)
         for result in qs.iterator():
             yield result
 
 
+def run_query_across_partitioned_databases_concurrently(model_class, q_expression, values=None,
+        annotate=None, order_by=None, max_workers=MAX_PARTITIONED_QUERY_WORKERS, timeout=None):
+    """
+    Same as `run_query_across_partitioned_databases` but the query is run
+    on all partitioned databases at the same time, each in its own thread
+    with its own connection. Results are yielded as they arrive so
+    results from different databases are interleaved unless `order_by`
+    is given.
+
+    If the calling thread is in a transaction on any of the databases the
+    queries are run one after another in the calling thread so that
+    uncommitted changes are visible.
+
+    Closing the generator (or letting it be garbage collected) stops the
+    queries that are still running.
+
+    :param order_by: (optional) A list of field names to order the results
+    of each database by. The ordered results are merged so the whole
+    result is ordered. If `values` is given it must include these fields.
+    Descending order is not supported.
+
+    :param max_workers: Maximum number of databases to query at the same
+    time. Ignored if `order_by` is given since the merge must read from
+    all databases at the same time.
+
+    :param timeout: (optional) Statement timeout in seconds for each query.
+    A query that runs longer than this is cancelled and the error raised.
+
+    :return: A generator with the results
+    """
+    db_names = get_db_aliases_for_partitioned_query()
+
+    if values and not isinstance(values, (list, tuple)):
+        raise ValueError("Expected a list or tuple")
+    if order_by:
+        if any(field.startswith('-') for field in order_by):
+            raise ValueError("Descending order is not supported")
+        if values and not set(order_by) <= set(values):
+            raise ValueError("values must include the order_by fields")
+
+    def get_queryset(db_name):
+        qs = _get_partitioned_queryset(db_name, model_class, q_expression, values, annotate)
+        return qs.order_by(*order_by) if order_by else qs
+
+    if len(db_names) == 1 or in_transaction(db_names):
+        if order_by:
+            querysets = [get_queryset(db_name).iterator() for db_name in db_names]
+            return _merge_sorted(querysets, _get_order_key(order_by, values))
+        return itertools.chain.from_iterable(get_queryset(db_name).iterator() for db_name in db_names)
+
+    runner = _ConcurrentQueryRunner(get_queryset, db_names, timeout)
+    if order_by:
+        return runner.iter_merged(_get_order_key(order_by, values))
+    return runner.iter_results(max_workers)
+
+
+def map_across_db_aliases(func, args_by_db_alias, max_workers=MAX_PARTITIONED_QUERY_WORKERS):
+    """
+    Call `func(db_alias, args)` for each item in `args_by_db_alias`
+    with the calls for different databases running at the same time. The
+    first call is made in the calling thread and each of the others in its
+    own thread with its own connection.
+
+    As with `run_query_across_partitioned_databases_concurrently` the calls
+    are made one after another in the calling thread if it is in a
+    transaction on any of the databases.
+
+    :param args_by_db_alias: list of `(db_alias, args)` tuples as returned
+    by `split_list_by_db_partition`
+    :return: dict of `db_alias -> result`. If any call raises an exception
+    it is raised here once all calls have finished.
+    """
+    args_by_db_alias = list(args_by_db_alias)
+    db_names = [db_name for db_name, args in args_by_db_alias]
+    if len(db_names) < 2 or in_transaction(db_names):
+        return {db_name: func(db_name, args) for db_name, args in args_by_db_alias}
+
+    def call(db_name, args):
+        try:
+            return func(db_name, args)
+        finally:
+            # worker threads are not cleaned up after a request like the main thread is
+            db.connections[db_name].close()
+
+    # the first call is made in the calling thread so it reuses its connection
+    (first_db_name, first_args), rest = args_by_db_alias[0], args_by_db_alias[1:]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(rest))) as executor:
+        futures = {
+            db_name: executor.submit(call, db_name, args)
+            for db_name, args in rest
+        }
+        first_result = func(first_db_name, first_args)
+    results = {db_name: future.result() for db_name, future in six.iteritems(futures)}
+    results[first_db_name] = first_result
+    return results
+
+
+def in_transaction(db_names=None):
+    """Check if the calling thread is in a transaction on any of the databases,
+    or on any database if ``db_names`` is ``None``
+
+    Other connections would not see uncommitted changes made in it.
+    """
+    if db_names is None:
+        db_names = db.connections
+    return any(db.connections[db_name].in_atomic_block for db_name in db_names)
+
+
+def _get_partitioned_queryset(db_name, model_class, q_expression, values=None, annotate=None):
+    qs = model_class.objects.using(db_name)
+    if annotate:
+        qs = qs.annotate(**annotate)
+
+    qs = qs.filter(q_expression)
+    if values:
+        if len(values) == 1:
+            qs = qs.values_list(*values, flat=True)
+        else:
+            qs = qs.values_list(*values)
+    return qs
+
+
+def _get_order_key(order_by, values):
+    if not values:
+        return attrgetter(*order_by)
+    if len(values) == 1:
+        return lambda result: result
+    return itemgetter(*[values.index(field) for field in order_by])
+
+
+def _merge_sorted(iterables, key):
+    """Merge iterables that are each sorted by `key` into one sorted iterable
+
+    Same as `heapq.merge(*iterables, key=key)` which is not available on Python 2.
+    """
+    heap = []
+    for index, iterable in enumerate(iterables):
+        iterator = iter(iterable)
+        for item in iterator:
+            heap.append((key(item), index, item, iterator))
+            break
+    heapq.heapify(heap)
+    while heap:
+        _, index, item, iterator = heap[0]
+        yield item
+        for item in iterator:
+            heapq.heapreplace(heap, (key(item), index, item, iterator))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+class _ConcurrentQueryRunner(object):
+    """Run a query on several databases in worker threads
+
+    Workers pass results back in chunks through bounded queues so that
+    a slow consumer does not cause results to pile up in memory.
+    """
+    chunk_size = 100
+    queue_size = 10  # chunks per database
+    poll_interval = 0.1  # seconds
+
+    def __init__(self, get_queryset, db_names, timeout=None):
+        self.get_queryset = get_queryset
+        self.db_names = db_names
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self.connections = {}
+
+    def iter_results(self, max_workers):
+        """Yield results from all databases in the order they arrive"""
+        results = Queue(self.queue_size * len(self.db_names))
+        with self._run({db_name: results for db_name in self.db_names}, max_workers):
+            remaining = len(self.db_names)
+            while remaining:
+                chunk = results.get()
+                if chunk is _DONE:
+                    remaining -= 1
+                else:
+                    for result in self._get_chunk_results(chunk):
+                        yield result
+
+    def iter_merged(self, key):
+        """Yield results from all databases merged in order of `key`"""
+        queues = {db_name: Queue(self.queue_size) for db_name in self.db_names}
+        with self._run(queues, len(self.db_names)):
+            for result in _merge_sorted([self._iter_queue(queues[db_name]) for db_name in self.db_names], key):
+                yield result
+
+    def _iter_queue(self, results):
+        while True:
+            chunk = results.get()
+            if chunk is _DONE:
+                break
+            for result in self._get_chunk_results(chunk):
+                yield result
+
+    @staticmethod
+    def _get_chunk_results(chunk):
+        if isinstance(chunk, _QueryError):
+            six.reraise(*chunk.exc_info)
+        return chunk
+
+    @contextmanager
+    def _run(self, queues, max_workers):
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(self.db_names))))
+        try:
+            for db_name in self.db_names:
+                executor.submit(self._run_query, db_name, queues[db_name])
+            yield
+        finally:
+            self._cancel()
+            # do not wait for queries that are being cancelled
+            executor.shutdown(wait=False)
+
+    def _cancel(self):
+        self.cancelled.set()
+        for connection in list(self.connections.values()):
+            if connection.connection is not None:
+                try:
+                    connection.connection.cancel()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _get_connection(db_name):
+        # connections are local to the calling thread
+        return db.connections[db_name]
+
+    def _run_query(self, db_name, results):
+        connection = self._get_connection(db_name)
+        self.connections[db_name] = connection
+        try:
+            if self.cancelled.is_set():
+                return
+            if self.timeout:
+                with connection.cursor() as cursor:
+                    cursor.execute("SET statement_timeout = %s", [int(self.timeout * 1000)])
+            chunk = []
+            for result in self.get_queryset(db_name).iterator():
+                chunk.append(result)
+                if len(chunk) >= self.chunk_size:
+                    if not self._put(results, chunk):
+                        return
+                    chunk = []
+            if chunk:
+                self._put(results, chunk)
+        except Exception:
+            if not self.cancelled.is_set():
+                self._put(results, _QueryError(sys.exc_info()))
+        finally:
+            del self.connections[db_name]
+            # worker threads are reused so close the connection rather than
+            # leave it open with the statement timeout set
+            connection.close()
+            self._put(results, _DONE)
+
+    def _put(self, results, item):
+        """Put item on the queue unless the query has been cancelled
+
+        :returns: True if the item was put on the queue.
+        """
+        while not self.cancelled.is_set():
+            try:
+                results.put(item, timeout=self.poll_interval)
+                return True
+            except Full:
+                pass
+        return False
+
+
+_DONE = object()
+_QueryError = namedtuple('_QueryError', 'exc_info')
+
+
 def split_list_by_db_partition(partition_values):
     """
     :param partition_values: Iterable of partition values (e.g. case IDs)
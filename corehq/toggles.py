@@ -1286,6 +1286,20 @@ EMWF_WORKER_ACTIVITY_REPORT = StaticToggle(
     ),
 )
 
+WORKER_ACTIVITY_ROLLUPS = StaticToggle(
+    'worker_activity_rollups',
+    'Read form and case counts in worker monitoring reports from daily rollups',
+    TAG_INTERNAL,
+    namespaces=[NAMESPACE_DOMAIN],
+    description=(
+        "Keeps daily counts of forms submitted and completed and cases opened "
+        "and closed by each user, and uses them in the Worker Activity and Daily "
+        "Form Activity reports instead of querying all forms and cases. Run the "
+        "backfill_activity_rollups management command for the domain before "
+        "enabling this."
+    ),
+)
+
 ICDS = StaticToggle(
     'icds',
     "ICDS: Enable ICDS features (necessary since features are on Softlayer and ICDS envs)",
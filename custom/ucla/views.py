@@ -12,7 +12,7 @@ from corehq.apps.app_manager.models import(
     OpenSubCaseAction,
 )
 from corehq.apps.app_manager.util import save_xform
-from corehq.apps.app_manager.xform import namespaces, _make_elem
+from corehq.apps.app_manager.xform import _make_elem
 from corehq.apps.reports.formdetails.readable import FormQuestion
 from custom.ucla.forms import TaskCreationForm
 
@@ -84,7 +84,7 @@ def _ucla_form_modifier(form, question_ids):
 
                 # Add data element
                 tag = "{x}%s" % hidden_value_tag
-                element = etree.Element(tag.format(**namespaces))
+                element = etree.Element(tag.format(**xform.namespaces))
                 xform.data_node.append(element)
 
                 # Add bind
@@ -1692,6 +1692,11 @@ PILLOWTOPS = {
             'class': 'pillowtop.pillow.interface.ConstructedPillow',
             'instance': 'corehq.pillows.synclog.get_user_sync_history_pillow',
         },
+        {
+            'name': 'ActivityRollupPillow',
+            'class': 'pillowtop.pillow.interface.ConstructedPillow',
+            'instance': 'corehq.pillows.activity_rollups.get_activity_rollup_pillow',
+        },
     ],
     'core_ext': [
         {